@@ -0,0 +1,429 @@
+"""Banc d'essai des chemins critiques sur des corpus de notes synthétiques
+
+Exemples:
+    python benchmark.py --sizes 10,1000 --output avant.json
+    python benchmark.py --sizes 10,1000 --output apres.json --compare avant.json
+
+Les corpus sont générés de façon déterministe (graine fixe) puis conservés dans le dossier
+de travail pour les exécutions suivantes. Les mesures de l'interface utilisent une fenêtre
+Tk masquée; sans affichage disponible (ou avec --headless), seule la logique sans
+interface est mesurée. L'exécution échoue si une frappe de l'ouverture rapide dépasse
+son budget (--keystroke-budget), ou si --compare relève une régression.
+"""
+import os
+import sys
+import json
+import time
+import random
+import string
+import shutil
+import platform
+import argparse
+import datetime
+import tempfile
+import statistics
+
+from note_index import NoteMetadataIndex
+from note_catalog import NoteCatalog
+from name_index import NameIndex
+from note_store import NoteStore, STORAGE_DIRECTORY
+from note_layout import LAYOUT_FLAT
+from preview_cache import PreviewCache
+from search_index import SearchIndex
+from text_stats import TextStatistics
+from save_worker import write_atomic, FSYNC_FILE
+
+DEFAULT_SIZES = [10, 1000, 10000, 100000]
+DEFAULT_REPEAT = 20
+DEFAULT_SEED = 1
+DEFAULT_WORKDIR = os.path.join(tempfile.gettempdir(), "terminal-notes-bench")
+
+# Tailles des notes: loi log-normale (médiane ~400 octets), bornée sous le seuil des notes volumineuses
+NOTE_SIZE_MU = 6.0
+NOTE_SIZE_SIGMA = 1.0
+NOTE_SIZE_MAX = 512 * 1024
+# Dates de modification: plus denses récemment, sur deux ans au plus
+MTIME_MEAN_DAYS = 120
+MTIME_MAX_DAYS = 730
+VOCABULARY_SIZE = 5000
+WORDS_PER_LINE = 12
+
+# Note ouverte, sauvegardée et mise en favori par les mesures de l'éditeur
+BENCH_NOTE = "bench_open.txt"
+BENCH_NOTE_WORDS = 3000
+
+SEARCH_QUERIES = ["lorem", "projet reunion", "zzzz"]
+SEARCH_INDEX_TIMEOUT = 1800
+# Ouverture rapide: début de nom, début de mot, lettres dans l'ordre, aucun résultat
+NAME_QUERIES = ["note_01", "reunion", "prjt", "zzzz"]
+# Budget d'une frappe dans l'ouverture rapide (une image à 60 Hz): les mesures
+# name_keystroke[...] qui le dépassent sont signalées et font échouer l'exécution
+KEYSTROKE_BUDGET_MS = 16
+# Écart relatif des médianes au-delà duquel --compare signale une régression
+REGRESSION_THRESHOLD = 0.2
+
+
+def make_vocabulary(rng):
+    """Mots pseudo-aléatoires, plus quelques mots fréquents pour les requêtes"""
+    words = ["lorem", "projet", "reunion", "note", "idee", "liste", "demain", "terminal"]
+    while len(words) < VOCABULARY_SIZE:
+        words.append("".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10))))
+    # Fréquences de Zipf, comme dans un texte réel
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    return words, weights
+
+
+def make_text(rng, words, weights, word_count):
+    chosen = rng.choices(words, weights, k=word_count)
+    lines = [" ".join(chosen[i:i + WORDS_PER_LINE]) for i in range(0, len(chosen), WORDS_PER_LINE)]
+    return "\n".join(lines) + "\n"
+
+
+def generate_corpus(directory, count, seed):
+    """Crée (ou réutilise) un dossier de `count` notes aux tailles et dates réalistes"""
+    notes_dir = os.path.join(directory, "notes")
+    marker = os.path.join(directory, "corpus.json")
+    params = {"count": count, "seed": seed}
+    try:
+        with open(marker, "r", encoding="utf-8") as f:
+            if json.load(f) == params:
+                return notes_dir
+    except Exception as e:
+        pass  # Corpus absent ou incomplet: le régénérer
+
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+    os.makedirs(notes_dir)
+
+    rng = random.Random(seed)
+    words, weights = make_vocabulary(rng)
+    now = time.time()
+    used = set()
+    for i in range(count):
+        mtime = now - min(rng.expovariate(1 / MTIME_MEAN_DAYS), MTIME_MAX_DAYS) * 86400
+        if rng.random() < 0.7:
+            # Nom donné par l'application à la création
+            stamp = datetime.datetime.fromtimestamp(mtime).strftime("%m%d_%H%M%S")
+            name = f"note_{stamp}"
+        else:
+            name = " ".join(rng.choices(words[:200], k=rng.randint(1, 4)))
+        filename = f"{name}.txt"
+        counter = 1
+        while filename in used:
+            filename = f"{name}_{counter}.txt"
+            counter += 1
+        used.add(filename)
+
+        size = min(int(rng.lognormvariate(NOTE_SIZE_MU, NOTE_SIZE_SIGMA)), NOTE_SIZE_MAX)
+        path = os.path.join(notes_dir, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(make_text(rng, words, weights, max(1, size // 6)))
+        os.utime(path, (mtime, mtime))
+
+        if count >= 1000 and (i + 1) % (count // 10) == 0:
+            print(f"  corpus {count}: {i + 1} notes", file=sys.stderr)
+
+    with open(os.path.join(notes_dir, BENCH_NOTE), "w", encoding="utf-8") as f:
+        f.write(make_text(rng, words, weights, BENCH_NOTE_WORDS))
+
+    with open(marker, "w", encoding="utf-8") as f:
+        json.dump(params, f)
+    return notes_dir
+
+
+def summarize(samples):
+    """Statistiques d'une série de mesures, en millisecondes"""
+    return {
+        "runs": len(samples),
+        "min_ms": round(min(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "mean_ms": round(statistics.mean(samples), 4),
+        "max_ms": round(max(samples), 4),
+    }
+
+
+def measure(func, repeat, setup=None):
+    """Chronomètre `func` `repeat` fois (la préparation n'est pas mesurée)"""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def wait_for_search_index(search_index, timeout):
+    """Attend la fin de l'indexation plein texte (les mesures seraient faussées sinon)"""
+    deadline = time.monotonic() + timeout
+    while search_index.is_building() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return not search_index.is_building()
+
+
+def run_core_benchmarks(notes_dir, state_dir, search_db, repeat):
+    """Logique sans interface: index des métadonnées, ordre du menu, statistiques, écriture, recherche"""
+    results = {}
+    index_file = os.path.join(state_dir, "notes_index.json")
+    bench_path = os.path.join(notes_dir, BENCH_NOTE)
+
+    def cold_refresh():
+        NoteMetadataIndex(notes_dir, index_file).refresh()
+    results["index_refresh_cold"] = measure(cold_refresh, max(1, repeat // 4))
+
+    note_index = NoteMetadataIndex(notes_dir, index_file)
+    note_index.refresh()
+    note_index.save()
+    results["index_refresh_warm"] = measure(note_index.refresh, max(1, repeat // 4))
+
+    def load_index():
+        NoteMetadataIndex(notes_dir, index_file).load()
+    results["index_load"] = measure(load_index, max(1, repeat // 4))
+
+    catalog = NoteCatalog(note_index)
+
+    def arrange_full():
+        note_index.reordered = True
+        catalog.arrange(set())
+    results["catalog_arrange"] = measure(arrange_full, repeat)
+
+    # Sauvegarde d'une note: elle passe en tête de l'ordre par date
+    bench_record = note_index.get(BENCH_NOTE)
+    def save_one():
+        note_index.update(BENCH_NOTE, os.stat_result((0, 0, 0, 0, 0, 0, bench_record.size, 0, time.time(), 0)))
+        catalog.arrange(set())
+    results["catalog_update"] = measure(save_one, repeat)
+
+    # Construction complète (première ouverture rapide), puis mise à jour après la sauvegarde
+    # d'une note du milieu de la liste
+    results["name_index_build"] = measure(lambda: NameIndex().build(catalog.visual), max(1, repeat // 4))
+    name_index = NameIndex()
+    name_index.build(catalog.visual)
+
+    def save_middle():
+        record = catalog.visual[len(catalog.visual) // 2]
+        note_index.update(record.filename, os.stat_result((0, 0, 0, 0, 0, 0, record.size, 0, time.time(), 0)))
+        catalog.arrange(set())
+    results["name_index_update"] = measure(lambda: name_index.build(catalog.visual), repeat, save_middle)
+    for query in NAME_QUERIES:
+        results[f"name_search[{query}]"] = measure(lambda: name_index.search(query, 10), repeat)
+
+    # Frappe par frappe dans un index qui vient d'être construit: chaque mesure est la
+    # recherche d'un préfixe de plus de la requête (max_ms: la frappe la plus lente)
+    for query in NAME_QUERIES:
+        keystroke_index = NameIndex()
+        keystroke_index.build(catalog.visual)
+        prefixes = iter([query[:length] for length in range(1, len(query) + 1)])
+        results[f"name_keystroke[{query}]"] = measure(lambda: keystroke_index.search(next(prefixes), 10), len(query))
+
+    with open(bench_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    text_statistics = TextStatistics()
+    results["text_statistics_reset"] = measure(lambda: text_statistics.reset(content), repeat)
+
+    scratch_path = os.path.join(state_dir, BENCH_NOTE)
+    results["write_atomic"] = measure(lambda: write_atomic(scratch_path, content, FSYNC_FILE), repeat)
+
+    store = NoteStore(notes_dir, index_file, os.path.join(state_dir, "favorites.json"), os.path.join(state_dir, "journal"))
+    preview_cache = PreviewCache(store)
+    results["preview_read"] = measure(lambda: preview_cache.read_preview(BENCH_NOTE), repeat)
+
+    search_index = SearchIndex(store, search_db)
+    search_index.sync({record.filename: record.mtime for record in catalog})
+    if wait_for_search_index(search_index, SEARCH_INDEX_TIMEOUT):
+        for query in SEARCH_QUERIES:
+            results[f"search[{query}]"] = measure(lambda: search_index.search(query, 10), repeat)
+    return results
+
+
+def run_gui_benchmarks(notes_dir, state_dir, search_db, repeat):
+    """Chemins critiques de l'application, dans une fenêtre Tk masquée"""
+    import tkinter as tk
+    import main
+
+    # Rediriger l'application vers le corpus et un état propre à ce banc d'essai
+    main.NOTES_DIR = notes_dir
+    main.FAVORITES_FILE = os.path.join(state_dir, "favorites.json")
+    main.ICON_CACHE_FILE = os.path.join(state_dir, "window_icon_64.png")
+    main.INDEX_FILE = os.path.join(state_dir, "notes_index.json")
+    main.SEARCH_INDEX_FILE = search_db
+    main.JOURNAL_DIR = os.path.join(state_dir, "journal")
+    main.HISTORY_FILE = os.path.join(state_dir, "history.db")
+    main.DEDUP_CACHE_FILE = os.path.join(state_dir, "dedup_cache.db")
+    main.PERF_EXPORT_FILE = os.path.join(state_dir, "perf.json")
+    # Le corpus généré est à plat et en texte brut, quels que soient les réglages de config.py
+    main.STORAGE_BACKEND = STORAGE_DIRECTORY
+    main.NOTES_LAYOUT = LAYOUT_FLAT
+    main.NOTE_COMPRESSION = None
+
+    bench_path = os.path.join(notes_dir, BENCH_NOTE)
+    bench_mtime = os.stat(bench_path).st_mtime
+
+    root = tk.Tk()
+    root.withdraw()
+    results = {}
+    try:
+        start = time.perf_counter()
+        app = main.TerminalNotesApp(root)
+        results["startup_first_menu"] = summarize([(time.perf_counter() - start) * 1000])
+        start = time.perf_counter()
+        app.finish_startup()
+        results["startup_scan"] = summarize([(time.perf_counter() - start) * 1000])
+        wait_for_search_index(app.search_index, SEARCH_INDEX_TIMEOUT)
+        root.update()
+
+        def idle(func):
+            def run():
+                func()
+                root.update_idletasks()
+            return run
+
+        def select_bench_note():
+            if app.mode != "menu":
+                app.back_to_menu()
+                app.save_worker.flush()
+                root.update()
+            app.current_note = app.catalog.get(BENCH_NOTE)
+
+        results["build_menu_rows"] = measure(app.build_menu_rows, repeat)
+        results["load_menu"] = measure(idle(app.load_menu), repeat)
+
+        def top_of_list():
+            if app.get_visual_position() >= len(app.catalog.visual) - 1:
+                app.select_visual_position(0)
+        results["move_down"] = measure(idle(lambda: app.move_down(None)), repeat, top_of_list)
+
+        # Nombre pair de bascules: les favoris reviennent à leur état initial
+        results["toggle_favorite"] = measure(
+            idle(lambda: app.toggle_favorite(None)), repeat + repeat % 2, select_bench_note
+        )
+
+        results["open_note"] = measure(idle(lambda: app.open_note(None)), repeat, select_bench_note)
+
+        results["calculate_statistics"] = measure(app.calculate_statistics, repeat)
+
+        def drift():
+            app.text_statistics.mark_drifted()
+        results["calculate_statistics_full"] = measure(app.calculate_statistics, repeat, drift)
+
+        results["save_now"] = measure(app.save_now, repeat, app.save_worker.flush)
+        results["save_now_flushed"] = measure(
+            lambda: (app.save_now(), app.save_worker.flush()), repeat
+        )
+
+        app.back_to_menu()
+        app.quit_app()
+    finally:
+        try:
+            root.destroy()
+        except tk.TclError:
+            pass
+        # Rendre au corpus son état d'origine pour les exécutions suivantes
+        os.utime(bench_path, (bench_mtime, bench_mtime))
+    return results
+
+
+def gui_available():
+    try:
+        import tkinter as tk
+        tk.Tk().destroy()
+        return True
+    except Exception as e:
+        return False
+
+
+def compare(results, baseline_file, threshold):
+    """Affiche l'écart des médianes avec une exécution précédente; retourne les régressions"""
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+    for size, benchmarks in results.items():
+        for name, result in benchmarks.items():
+            previous = baseline.get(size, {}).get(name)
+            if not previous:
+                continue
+            before, after = previous["median_ms"], result["median_ms"]
+            ratio = (after - before) / before if before else 0.0
+            flag = ""
+            if ratio > threshold:
+                flag = "  << RÉGRESSION"
+                regressions.append((size, name, ratio))
+            print(f"{size:>7} {name:<28} {before:>10.3f} -> {after:>10.3f} ms ({ratio:+.0%}){flag}")
+    return regressions
+
+
+def over_budget(results, budget):
+    """Affiche les frappes de l'ouverture rapide plus lentes que le budget; retourne leur liste"""
+    slow = []
+    for size, benchmarks in results.items():
+        for name, result in benchmarks.items():
+            if name.startswith("name_keystroke[") and result["max_ms"] > budget:
+                slow.append((size, name, result["max_ms"]))
+                print(f"{size:>7} {name:<28} {result['max_ms']:>10.3f} ms  << BUDGET ({budget} ms)", file=sys.stderr)
+    return slow
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai sur des corpus de notes synthétiques")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="tailles des corpus, séparées par des virgules")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="mesures par chemin")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="graine de génération des corpus")
+    parser.add_argument("--workdir", default=DEFAULT_WORKDIR, help="dossier des corpus générés")
+    parser.add_argument("--output", help="fichier JSON des résultats (sortie standard sinon)")
+    parser.add_argument("--compare", help="résultats JSON d'une exécution précédente")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="écart relatif des médianes signalé comme régression")
+    parser.add_argument("--headless", action="store_true", help="ne mesurer que la logique sans interface")
+    parser.add_argument("--keystroke-budget", type=float, default=KEYSTROKE_BUDGET_MS,
+                        help="durée maximale d'une frappe dans l'ouverture rapide, en millisecondes")
+    args = parser.parse_args()
+
+    gui = not args.headless and gui_available()
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "gui": gui,
+        },
+        "results": {},
+    }
+
+    for size in (int(size) for size in args.sizes.split(",") if size):
+        directory = os.path.join(args.workdir, f"corpus-{size}-{args.seed}")
+        print(f"Corpus de {size} notes...", file=sys.stderr)
+        notes_dir = generate_corpus(directory, size, args.seed)
+        # État (index, favoris, journaux) recréé à chaque exécution; l'index plein texte,
+        # long à construire, est conservé avec le corpus et mis à jour incrémentalement
+        state_dir = os.path.join(directory, "state")
+        shutil.rmtree(state_dir, ignore_errors=True)
+        os.makedirs(state_dir)
+        search_db = os.path.join(directory, "search_index.db")
+
+        results = run_core_benchmarks(notes_dir, state_dir, search_db, args.repeat)
+        if gui:
+            results.update(run_gui_benchmarks(notes_dir, state_dir, search_db, args.repeat))
+        report["results"][str(size)] = results
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    failed = bool(over_budget(report["results"], args.keystroke_budget))
+    if args.compare:
+        regressions = compare(report["results"], args.compare, args.threshold)
+        failed = failed or bool(regressions)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import os
+import sys
+
+from storage_options import FSYNC_FILE, STORAGE_DIRECTORY, LAYOUT_FLAT
+
+if getattr(sys, 'frozen', False):
+    # Si l'app est packagée avec PyInstaller
+    application_path = os.path.dirname(sys.executable)
+else:
+    # Si l'app est exécutée comme script Python
+    application_path = os.path.dirname(os.path.abspath(__file__))
+
+# Utiliser des chemins absolus basés sur l'emplacement de l'application
+# (partagés par l'interface et la ligne de commande)
+NOTES_DIR = os.path.join(application_path, "notes")
+FAVORITES_FILE = os.path.join(application_path, "favorites.json")
+ICON_CACHE_FILE = os.path.join(application_path, "window_icon_64.png")
+INDEX_FILE = os.path.join(application_path, "notes_index.json")
+SEARCH_INDEX_FILE = os.path.join(application_path, "search_index.db")
+JOURNAL_DIR = os.path.join(application_path, "journal")
+NOTES_DB_FILE = os.path.join(application_path, "notes.db")
+PERF_EXPORT_FILE = os.path.join(application_path, "perf.json")
+HISTORY_FILE = os.path.join(application_path, "history.db")
+DEDUP_CACHE_FILE = os.path.join(application_path, "dedup_cache.db")
+
+# Stockage des notes: STORAGE_DIRECTORY (un fichier .txt par note dans NOTES_DIR) ou
+# "sqlite" (toutes les notes et leurs favoris dans NOTES_DB_FILE). Pour changer de stockage,
+# exporter les notes (`notes_cli.py export`) puis les importer après le changement
+STORAGE_BACKEND = STORAGE_DIRECTORY
+
+# Organisation de NOTES_DIR: LAYOUT_FLAT (tout à la racine) ou "sharded" (256 sous-dossiers,
+# pour les très grands dossiers). `notes_cli.py layout sharded` déplace les notes existantes
+NOTES_LAYOUT = LAYOUT_FLAT
+
+# Politique fsync des écritures de notes ("never", "file" ou "full")
+SAVE_FSYNC_POLICY = FSYNC_FILE
+
+# Compression des notes écrites: None (texte brut), "zlib" ou "lzma". Les notes existantes
+# restent lisibles dans les deux formats; `notes_cli.py migrate` les convertit toutes
+NOTE_COMPRESSION = None
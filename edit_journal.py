@@ -0,0 +1,183 @@
+import os
+import json
+import hashlib
+
+from save_worker import FSYNC_FILE, FSYNC_NEVER
+
+JOURNAL_SUFFIX = ".journal"
+
+
+def content_hash(content):
+    """Empreinte du contenu d'une note sur disque, base d'un journal"""
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def widget_text(content):
+    """Texte affiché dans l'éditeur pour un contenu de fichier (sans le saut de ligne final)"""
+    return content[:-1] if content.endswith("\n") else content
+
+
+def apply_records(content, records):
+    """Rejoue des modifications (lignes/colonnes de l'éditeur) sur le contenu d'une note"""
+    lines = widget_text(content).split("\n")
+    for record in records:
+        if record[0] == "i":
+            _, line, col, text = record
+            current = lines[line - 1]
+            inserted = (current[:col] + text + current[col:]).split("\n")
+            lines[line - 1:line] = inserted
+        elif record[0] == "d":
+            _, line1, col1, line2, col2 = record
+            lines[line1 - 1:line2] = [lines[line1 - 1][:col1] + lines[line2 - 1][col2:]]
+    # Même forme que le contenu écrit par l'éditeur
+    return "\n".join(lines) + "\n"
+
+
+def read_journal(path):
+    """Retourne (empreinte de base, modifications); une dernière ligne tronquée est ignorée"""
+    base = None
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break  # Écriture interrompue par un arrêt brutal
+            if base is None:
+                base = record.get("base")
+            else:
+                records.append(record)
+    return base, records
+
+
+def journal_generations(journal_dir, note_filename):
+    """Retourne la liste triée des (génération, chemin) des journaux d'une note"""
+    prefix = note_filename + JOURNAL_SUFFIX + "."
+    generations = []
+    if os.path.isdir(journal_dir):
+        for name in os.listdir(journal_dir):
+            if name.startswith(prefix) and name[len(prefix):].isdigit():
+                generations.append((int(name[len(prefix):]), os.path.join(journal_dir, name)))
+    return sorted(generations)
+
+
+def remove_journals(journal_dir, note_filename, before=None):
+    """Supprime les journaux d'une note (ceux des générations antérieures à `before` si précisé)"""
+    for generation, path in journal_generations(journal_dir, note_filename):
+        if before is None or generation < before:
+            os.remove(path)
+
+
+class EditJournal:
+    """Journal des modifications d'une note, ajoutées au fil de la frappe
+
+    Chaque compaction (réécriture complète de la note) commence une nouvelle génération
+    basée sur le contenu écrit; les générations précédentes sont conservées jusqu'à ce
+    que l'écriture soit confirmée, pour pouvoir être rejouées en chaîne après un arrêt brutal.
+    """
+
+    def __init__(self, journal_dir, note_filename, fsync_policy=FSYNC_FILE):
+        if not os.path.exists(journal_dir):
+            os.makedirs(journal_dir)
+        self.journal_dir = journal_dir
+        self.note_filename = note_filename
+        self.fsync_policy = fsync_policy
+        self.file = None
+        self.path = None
+        # Continuer après les générations encore sur disque (compactions non confirmées)
+        self.generation = max(
+            (generation for generation, _ in journal_generations(journal_dir, note_filename)),
+            default=-1
+        )
+        self.size = 0  # Octets de modifications depuis le début de la génération
+        self.records = 0
+
+    def start(self, base_hash):
+        """Commence une génération vide basée sur le contenu sur disque (ou en cours d'écriture)
+
+        base_hash est l'empreinte content_hash() de ce contenu.
+        """
+        if self.file:
+            self.file.close()
+        self.generation += 1
+        self.path = os.path.join(
+            self.journal_dir,
+            f"{self.note_filename}{JOURNAL_SUFFIX}.{self.generation}"
+        )
+        self.file = open(self.path, "w", encoding="utf-8")
+        self.file.write(json.dumps({"base": base_hash}) + "\n")
+        self.file.flush()
+        self.size = 0
+        self.records = 0
+        return self.generation
+
+    def confirm(self, generation):
+        """La compaction de cette génération est sur disque: les précédentes sont inutiles"""
+        remove_journals(self.journal_dir, self.note_filename, before=generation)
+
+    def append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self.file.write(line)
+        self.file.flush()
+        self.size += len(line)
+        self.records += 1
+
+    def record_insert(self, line, col, text):
+        self.append(["i", line, col, text])
+
+    def record_delete(self, line1, col1, line2, col2):
+        self.append(["d", line1, col1, line2, col2])
+
+    def sync(self):
+        """Rend les modifications journalisées durables selon la politique fsync"""
+        if self.file and self.records and self.fsync_policy != FSYNC_NEVER:
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        """Ferme le journal; une génération sans modification est supprimée"""
+        if self.file:
+            self.file.close()
+            self.file = None
+            if not self.records:
+                os.remove(self.path)
+
+
+def recover_journals(store):
+    """Rejoue les journaux restants après un arrêt brutal; retourne les notes récupérées
+
+    Les notes sont lues et réécrites par le stockage (NoteStore ou DatabaseNoteStore).
+    """
+    journal_dir = store.journal_dir
+    if not os.path.isdir(journal_dir):
+        return []
+
+    notes = {
+        name[:name.rindex(JOURNAL_SUFFIX)]
+        for name in os.listdir(journal_dir)
+        if JOURNAL_SUFFIX + "." in name
+    }
+
+    recovered = []
+    for note in sorted(notes):
+        try:
+            if store.exists(note):
+                content = store.read(note)
+
+                # Chaque génération s'applique au résultat de la précédente: on rejoue
+                # à partir de la première dont la base correspond au contenu sur disque
+                changed = False
+                for generation, path in journal_generations(journal_dir, note):
+                    base, records = read_journal(path)
+                    if base == content_hash(content) and records:
+                        content = apply_records(content, records)
+                        changed = True
+
+                if changed:
+                    store.write_content(note, content)
+                    recovered.append(note)
+        except Exception as e:
+            continue  # Journaux conservés pour une nouvelle tentative au prochain lancement
+
+        remove_journals(journal_dir, note)
+
+    return recovered
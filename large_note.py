@@ -0,0 +1,40 @@
+import io
+import os
+import mmap
+import codecs
+
+from note_codec import open_note_text, file_compression
+
+
+def iter_note_chunks(path, chunk_size, first_chunk_size=None, use_mmap=False):
+    """Génère le contenu d'une note par morceaux de texte (sauts de ligne normalisés)
+
+    Le premier morceau peut être plus petit pour afficher rapidement le début de la note.
+    Avec use_mmap, le fichier est projeté en mémoire et décodé au fil de la lecture
+    (sauf pour une note compressée, décompressée bloc par bloc).
+    """
+    size = first_chunk_size or chunk_size
+
+    if not use_mmap or file_compression(path):
+        with open_note_text(path) as f:
+            while True:
+                text = f.read(size)
+                if not text:
+                    return
+                yield text
+                size = chunk_size
+
+    with open(path, "rb") as f:
+        length = os.fstat(f.fileno()).st_size
+        if length == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(), translate=True)
+            offset = 0
+            while offset < length:
+                end = min(length, offset + size)
+                text = decoder.decode(mm[offset:end], final=end >= length)
+                offset = end
+                size = chunk_size
+                if text:
+                    yield text
@@ -1,24 +1,29 @@
+import time
+STARTUP_T0 = time.perf_counter()  # Référence de --startup-timing, avant les autres imports
 import tkinter as tk
+import tkinter.font as tkfont
 import os
 import sys
-import time
 import datetime
-import json
-from collections import defaultdict
-from PIL import Image, ImageDraw, ImageTk
-
-# Déterminer le chemin de base de l'application
-if getattr(sys, 'frozen', False):
-    # Si l'app est packagée avec PyInstaller
-    application_path = os.path.dirname(sys.executable)
-else:
-    # Si l'app est exécutée comme script Python
-    application_path = os.path.dirname(os.path.abspath(__file__))
-
-# Utiliser des chemins absolus basés sur l'emplacement de l'application
-NOTES_DIR = os.path.join(application_path, "notes")
+import hashlib
+import threading
+from config import (
+    NOTES_DIR, FAVORITES_FILE, ICON_CACHE_FILE, INDEX_FILE, SEARCH_INDEX_FILE, JOURNAL_DIR, NOTES_DB_FILE,
+    STORAGE_BACKEND, SAVE_FSYNC_POLICY, NOTE_COMPRESSION, NOTES_LAYOUT, PERF_EXPORT_FILE, HISTORY_FILE,
+    DEDUP_CACHE_FILE
+)
+from note_store import open_note_store
+from preview_cache import PreviewCache
+from search_index import SearchIndex, make_snippet, query_terms
+from text_stats import TextStatistics
+from save_worker import SaveWorker
+from edit_journal import EditJournal, recover_journals, remove_journals, widget_text, content_hash
+from note_watcher import RESCAN
+from perf_monitor import PerfMonitor, timed
+from name_index import NameIndex
+from note_catalog import MenuSection
+
 VERSION = "1.0"
-FAVORITES_FILE = os.path.join(application_path, "favorites.json")
 
 # Couleurs Fallout authentiques
 TERMINAL_BG = "#0F0F0F"  # Noir légèrement adouci
@@ -34,11 +39,69 @@ FONT_SIZE_NORMAL = 13
 FONT_SIZE_HEADER = 15
 PADDING = 10
 
-if not os.path.exists(NOTES_DIR):
-    os.makedirs(NOTES_DIR)
+# Navigation: ne retoucher que les lignes de l'ancienne et de la nouvelle sélection
+INCREMENTAL_SELECTION = True
+
+# Liste virtualisée: seules les lignes visibles du menu (plus cette marge) sont dans le widget
+MENU_OVERSCAN = 5
+MENU_WHEEL_ROWS = 3
+
+# Aperçus: taille lue, capacité du cache LRU et nombre de voisins préchargés
+PREVIEW_SIZE = 800
+PREVIEW_CACHE_SIZE = 256
+PREVIEW_PREFETCH_RADIUS = 1
+PREVIEW_POLL_MS = 15
+# Navigation: l'aperçu n'est chargé que lorsque la sélection ne bouge plus depuis ce délai
+# (plus long que l'intervalle de répétition du clavier)
+PREVIEW_SETTLE_MS = 60
+
+# Recherche plein texte: délai après la dernière frappe et nombre de résultats affichés
+SEARCH_DELAY_MS = 120
+SEARCH_RESULTS = 10
+
+# Ouverture rapide (Ctrl+P): filtrage des noms à chaque frappe, sans délai
+QUICK_OPEN_RESULTS = 10
+QUICK_OPEN_NAME_WIDTH = 44
+
+# Sauvegarde en arrière-plan: relève des résultats (politique fsync dans config.py)
+SAVE_POLL_MS = 100
+
+# Historique des versions: lignes de la liste affichées autour de la sélection et taille
+# maximale du texte affiché pour une version (rétention dans note_history.py)
+HISTORY_LIST_ROWS = 8
+HISTORY_VIEW_SIZE = 64 * 1024
+
+# Doublons: relève de l'analyse en arrière-plan et lignes affichées autour de la sélection
+DEDUP_POLL_MS = 100
+DEDUP_VIEW_ROWS = 30
+
+# Journal des modifications: la note n'est réécrite entièrement (compaction) qu'au-delà
+# de cette taille de journal ou de cet intervalle, et en quittant l'éditeur
+JOURNAL_COMPACT_BYTES = 256 * 1024
+JOURNAL_COMPACT_SECONDS = 60
+
+# Notes volumineuses: chargement par morceaux au-delà de ce seuil (en octets), le premier
+# morceau couvrant un écran; avec LARGE_NOTE_MMAP_VIEW elles s'ouvrent en lecture seule via mmap
+LARGE_NOTE_THRESHOLD = 2 * 1024 * 1024
+LARGE_NOTE_FIRST_CHUNK = 16 * 1024
+LARGE_NOTE_CHUNK = 256 * 1024
+LARGE_NOTE_MMAP_VIEW = False
+
+# Surveillance du dossier des notes: regroupement des changements et intervalle du mode de repli
+WATCH_BATCH_MS = 250
+WATCH_POLL_SECONDS = 2.0
+
+# Démarrage: délai maximal avant le parcours du dossier si la fenêtre n'est pas dessinée (réduite)
+STARTUP_SCAN_FALLBACK_MS = 500
+
+# Mesures de performance (touches cachées: F12 affiche/masque, Maj+F12 exporte en JSON)
+PERF_OVERLAY_MS = 500
 
 def create_window_icon(size=32, color="#4CFF4C", bg_color="#0F0F0F"):
     """Crée une icône de terminal pour l'en-tête de la fenêtre"""
+    # PIL n'est importé que lorsque l'icône doit être dessinée (absente du cache)
+    from PIL import Image, ImageDraw
+
     # Créer une image avec un fond transparent
     img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
@@ -117,20 +180,31 @@ def create_window_icon(size=32, color="#4CFF4C", bg_color="#0F0F0F"):
     return img
 
 
+def load_window_icon():
+    """Charge l'icône de la fenêtre depuis le cache PNG, en la générant au premier lancement"""
+    if not os.path.exists(ICON_CACHE_FILE):
+        try:
+            window_icon = create_window_icon(size=64, color=TERMINAL_FG, bg_color=TERMINAL_BG)
+            window_icon.save(ICON_CACHE_FILE, "PNG")
+        except Exception as e:
+            return None  # PIL absent ou dossier en lecture seule: pas d'icône
+    # Tk 8.6 lit le PNG directement, sans PIL
+    return tk.PhotoImage(file=ICON_CACHE_FILE)
+
+
 class TerminalNotesApp:
-    def __init__(self, master):
+    def __init__(self, master, startup_timing=False):
         self.master = master
         self.master.title("Simple Terminal Note System")
         self.master.configure(bg=TERMINAL_BG)
+        self.startup_timing = startup_timing
 
-        # Création et définition de l'icône de la fenêtre
-        window_icon = create_window_icon(size=64, color=TERMINAL_FG, bg_color=TERMINAL_BG)
-        # Convertir l'image en format PhotoImage pour Tkinter
-        icon_data = ImageTk.PhotoImage(window_icon)
-        # Conserver une référence à l'icône pour éviter le garbage collection
-        self.icon_ref = icon_data
-        # Définir l'icône de la fenêtre
-        self.master.iconphoto(True, icon_data)
+        # Définition de l'icône de la fenêtre
+        icon_data = load_window_icon()
+        if icon_data:
+            # Conserver une référence à l'icône pour éviter le garbage collection
+            self.icon_ref = icon_data
+            self.master.iconphoto(True, icon_data)
 
         # Dimensionnement avec taille minimale
         self.master.geometry("800x600")
@@ -138,14 +212,92 @@ class TerminalNotesApp:
 
         # Variables d'état
         self.mode = "menu"
-        self.notes = [f for f in os.listdir(NOTES_DIR) if f.endswith(".txt")]
-        self.current_index = 0 if self.notes else -1
+
+        # Durées des chemins critiques (tampons circulaires) et sauvegardes échouées
+        self.perf = PerfMonitor()
+        self.perf_overlay = None
+        self.perf_job = None
+        self.perf_status = ""
+
+        # Notes sur disque, favoris et index des métadonnées (logique partagée avec notes_cli.py),
+        # dans un dossier ou une base SQLite selon STORAGE_BACKEND; chaque sauvegarde est
+        # gardée dans l'historique des versions
+        self.store = open_note_store(
+            STORAGE_BACKEND, NOTES_DIR, NOTES_DB_FILE, INDEX_FILE, FAVORITES_FILE, JOURNAL_DIR,
+            SAVE_FSYNC_POLICY, NOTE_COMPRESSION, NOTES_LAYOUT, HISTORY_FILE
+        )
+
+        # Rejouer les journaux laissés par un arrêt brutal avant de lister les notes
+        self.recovered_notes = recover_journals(self.store)
+        # Index des métadonnées (mtime, taille, date) pour éviter un stat par note à chaque affichage.
+        # Le premier affichage utilise l'index enregistré; le dossier est parcouru une fois la fenêtre affichée
+        self.store.load_index(refresh=False)
+        self.note_index = self.store.note_index
+        # Notes dans l'ordre du menu; la note sélectionnée est désignée par son enregistrement
+        self.catalog = self.store.catalog
+        self.current_note = None
         self.save_job = None
-        self.favorites = set()  # Ensemble pour stocker les notes favorites
-        self.visual_to_index = []  # Mapping de l'ordre visuel vers les indices dans self.notes
+        self.menu_head = []  # Lignes fixes en haut du menu (titre, ou message sans notes)
+        self.menu_rows = []  # Lignes des notes: catalog.rows (en-têtes, notes, lignes vides)
+        self.menu_top = 0  # Première ligne du menu visible
+        self.menu_window = (0, 0)  # Lignes du menu présentes dans le widget [début, fin)
+        self.menu_version = None  # Version de catalog.arrange() affichée dans le menu
+        # Fenêtres ouvertes par-dessus le menu (renommage, confirmation, aide, ouverture rapide):
+        # elles gardent le focus et leurs touches, le menu n'est rechargé qu'à leur fermeture
+        self.open_popups = 0
+        self.menu_refresh_pending = False
+        self.drawn_note = None  # Note affichée comme sélectionnée dans le widget
+        self.redraw_job = None  # Mise à jour de la sélection à l'écran, une par image
+        self.preview_cache = PreviewCache(self.store, PREVIEW_CACHE_SIZE, PREVIEW_SIZE, self.perf)
+        self.preview_job = None
+
+        # Index plein texte, construit en arrière-plan puis mis à jour note par note
+        self.search_index = SearchIndex(self.store, SEARCH_INDEX_FILE)
+        self.search_job = None
+
+        # Noms des notes pour l'ouverture rapide, réindexés quand l'ordre du menu change
+        self.name_index = NameIndex()
+
+        # Statistiques du texte, tenues à jour à partir des modifications de l'éditeur
+        self.text_statistics = TextStatistics()
+        self.track_edits = False
+
+        # Historique de la note sélectionnée (mode "history")
+        self.history_note = None
+        self.history_revisions = []
+        self.history_selected = 0
+
+        # Doublons (mode "duplicates"): signatures calculées par un pool de processus
+        self.duplicate_finder = None  # Créé à la première analyse (show_duplicates)
+        self.duplicate_thread = None
+        self.duplicate_result = None  # (groupes, erreur) déposé par le thread d'analyse
+        self.duplicate_progress = (0, None)
+        self.duplicate_error = None
+        self.duplicate_groups = None  # None tant que l'analyse n'est pas terminée
+        self.duplicate_entries = []  # (groupe, nom de fichier) dans l'ordre affiché
+        self.duplicate_selected = 0
+        self.duplicate_marked = set()
+        self.duplicate_job = None
+
+        # Écritures des notes dans un thread dédié
+        self.save_worker = SaveWorker(self.perf.wrap("save_write", self.store.write_content))
+        self.save_poll_job = None
+        self.save_status = "Sauvegarde automatique activée"
+        self.save_failed = False
+        self.journal = None
+        self.last_compaction = 0
+
+        # Chargement progressif des notes volumineuses
+        self.note_read_only = False
+        self.load_chunks = None
+        self.load_job = None
+
+        # Notes ajoutées ou modifiées par d'autres programmes (scripts, synchronisation)
+        self.note_watcher = self.store.make_watcher(WATCH_POLL_SECONDS)
+        self.watch_job = None
 
         # Charger les favoris
-        self.load_favorites()
+        self.store.load_favorites()
 
         # Création de la structure de l'interface
         self.create_layout()
@@ -153,10 +305,47 @@ class TerminalNotesApp:
         # Configuration initiale
         self.load_menu()
         self.bind_menu_keys()
+        self.master.bind("<F12>", self.toggle_perf_overlay)
+        self.master.bind("<Shift-F12>", self.export_perf)
 
         # Lier l'événement de redimensionnement pour mettre à jour l'interface d'aide
         self.master.bind("<Configure>", self.update_help_display)
 
+        # Parcours du dossier différé après le premier affichage de la fenêtre
+        self.startup_done = False
+        self.left.bind("<Expose>", self.on_first_frame)
+        self.master.after(STARTUP_SCAN_FALLBACK_MS, self.finish_startup)
+
+    def on_first_frame(self, event=None):
+        """Premier affichage de la liste: lancer le parcours du dossier une fois la fenêtre dessinée"""
+        self.left.unbind("<Expose>")
+        self.first_frame_time = time.perf_counter()
+        self.master.after_idle(self.finish_startup)
+
+    def finish_startup(self):
+        """Synchronise l'index avec le dossier et démarre les tâches de fond"""
+        if self.startup_done:
+            return
+        self.startup_done = True
+
+        # Les enregistrements sont mis à jour sur place: la sélection est conservée
+        self.note_index.refresh()
+        self.note_index.save()
+
+        self.search_index.sync({record.filename: record.mtime for record in self.catalog})
+        self.note_watcher.start()
+        self.watch_job = self.master.after(WATCH_BATCH_MS, self.apply_watch_events)
+
+        if self.mode == "menu":
+            self.refresh_menu()
+
+        if self.startup_timing:
+            first_frame = getattr(self, "first_frame_time", None)
+            ready = time.perf_counter()
+            if first_frame is not None:
+                print(f"Premier affichage: {(first_frame - STARTUP_T0) * 1000:.1f} ms")
+            print(f"Notes prêtes: {(ready - STARTUP_T0) * 1000:.1f} ms ({len(self.catalog)} notes)")
+
     def create_layout(self):
         """Crée la structure de l'interface utilisateur"""
         # Création d'un frame pour l'en-tête
@@ -221,6 +410,13 @@ class TerminalNotesApp:
         )
         self.left.pack(fill="both", expand=True)
         self.left.configure(state="disabled")
+        self.menu_linespace = tkfont.Font(font=self.left.cget("font")).metrics("linespace")
+
+        # Défilement de la liste virtualisée (le widget ne contient que les lignes visibles)
+        self.left.bind("<Configure>", self.on_menu_resize)
+        self.left.bind("<MouseWheel>", self.on_menu_wheel)
+        self.left.bind("<Button-4>", self.on_menu_wheel)
+        self.left.bind("<Button-5>", self.on_menu_wheel)
 
         # Séparateur vertical
         self.separator = tk.Frame(self.main_frame, width=2, bg=TERMINAL_FG)
@@ -244,6 +440,7 @@ class TerminalNotesApp:
             pady=PADDING//2
         )
         self.right.pack(fill="both", expand=True)
+        self.install_statistics_proxy()
 
         # Barre d'aide
         self.status_frame = tk.Frame(self.master, bg=TERMINAL_BG, height=30)
@@ -281,40 +478,79 @@ class TerminalNotesApp:
             self.compact_help = False
             self.update_status_bar()
 
+    def install_statistics_proxy(self):
+        """Intercepte les commandes insert/delete du panneau de droite (statistiques et journal)"""
+        widget = self.right._w
+        self.right_command = widget + "_orig"
+        self.master.tk.call("rename", widget, self.right_command)
+        self.master.tk.createcommand(widget, self.on_right_command)
+
+    def right_call(self, *args):
+        """Appelle la commande Tcl d'origine du panneau de droite"""
+        return self.master.tk.call((self.right_command,) + args)
+
+    def on_right_command(self, *args):
+        """Met à jour les statistiques et le journal en fonction de chaque modification"""
+        if not self.track_edits or args[0] not in ("insert", "delete", "replace"):
+            return self.right_call(*args)
+
+        if args[0] == "replace":
+            # Équivalent à une suppression suivie d'une insertion au même endroit
+            start = str(self.right_call("index", args[1]))
+            self.on_right_command("delete", start, args[2])
+            return self.on_right_command("insert", start, *args[3:])
+
+        if args[0] == "insert":
+            # Tk insère toujours avant le saut de ligne final
+            index = str(self.right_call("index", args[1]))
+            if self.right_call("compare", index, ">", "end-1c"):
+                index = str(self.right_call("index", "end-1c"))
+            text = "".join(args[2::2])
+            before = self.right_call("get", f"{index}-1c") if index != "1.0" else ""
+            after = self.right_call("get", index)
+            result = self.right_call(*args)
+            self.text_statistics.inserted(text, before, after)
+            if self.journal:
+                line, col = map(int, index.split("."))
+                self.journal.record_insert(line, col, text)
+            return result
+
+        if args[0] == "delete":
+            start = str(self.right_call("index", args[1]))
+            end = str(self.right_call("index", args[2] if len(args) > 2 else f"{start}+1c"))
+            # Le saut de ligne final n'est jamais supprimé
+            if self.right_call("compare", end, ">", "end-1c"):
+                end = str(self.right_call("index", "end-1c"))
+            if not self.right_call("compare", start, "<", end):
+                return self.right_call(*args)
+            text = self.right_call("get", start, end)
+            before = self.right_call("get", f"{start}-1c") if start != "1.0" else ""
+            after = self.right_call("get", end)
+            result = self.right_call(*args)
+            self.text_statistics.deleted(text, before, after)
+            if self.journal:
+                line1, col1 = map(int, start.split("."))
+                line2, col2 = map(int, end.split("."))
+                self.journal.record_delete(line1, col1, line2, col2)
+            return result
+
     def calculate_statistics(self):
         """Calcule les statistiques du texte (nombre de mots, caractères et temps de lecture)"""
         if self.mode != "editor":
             return None
 
-        # Récupérer le contenu du texte
-        content = self.right.get("1.0", tk.END)
-
-        # Calculer le nombre de caractères (sans compter les espaces de fin)
-        char_count = len(content.rstrip())
-
-        # Calculer le nombre de mots (en divisant par les espaces)
-        words = content.split()
-        word_count = len(words)
+        # Recomptage complet uniquement si les compteurs ont pu dériver
+        if self.text_statistics.drifted:
+            self.text_statistics.reset(self.right.get("1.0", tk.END))
 
-        # Estimer le temps de lecture (basé sur 200 mots par minute)
-        reading_time_minutes = word_count / 200
-
-        # Formater le temps de lecture
-        if reading_time_minutes < 1:
-            reading_time_text = f"{int(reading_time_minutes * 60)} sec"
+        # Les espaces de fin ne comptent pas comme caractères
+        last_char = self.right.search(r"\S", "end", backwards=True, regexp=True)
+        if last_char:
+            trailing_whitespace = len(self.right.get(f"{last_char}+1c", tk.END))
         else:
-            minutes = int(reading_time_minutes)
-            seconds = int((reading_time_minutes - minutes) * 60)
-            if seconds > 0:
-                reading_time_text = f"{minutes} min {seconds} sec"
-            else:
-                reading_time_text = f"{minutes} min"
+            trailing_whitespace = self.text_statistics.length
 
-        return {
-            "word_count": word_count,
-            "char_count": char_count,
-            "reading_time": reading_time_text
-        }
+        return self.text_statistics.summary(trailing_whitespace)
 
     def update_status_bar(self):
         """Met à jour la barre d'état en fonction du mode et de l'espace disponible"""
@@ -324,15 +560,38 @@ class TerminalNotesApp:
         else:
             # Mode normal: toutes les commandes
             if self.mode == "menu":
-                self.help_label.config(text="↑/↓: Navigation | Entrée: Sélectionner | n: Nouveau | r: Renommer | f: Favoris | d: Supprimer | q: Quitter | h: Aide")
+                help_text = "↑/↓: Navigation | Entrée: Sélectionner | n: Nouveau | r: Renommer | f: Favoris | d: Supprimer | /: Rechercher | Ctrl+P: Ouvrir | v: Versions | D: Doublons | q: Quitter | h: Aide"
+                if self.recovered_notes:
+                    help_text = f"RÉCUPÉRÉ APRÈS INTERRUPTION: {len(self.recovered_notes)} note(s) | {help_text}"
+                # Une sauvegarde qui échoue après le retour au menu doit rester visible
+                if self.save_failed:
+                    help_text = f"{self.save_status} | {help_text}"
+                self.help_label.config(text=help_text)
+            elif self.mode == "search":
+                self.help_label.config(text="↑/↓: Résultats | Entrée: Ouvrir | ESC: Retour au menu")
+            elif self.mode == "history":
+                self.help_label.config(text="↑/↓: Versions | Entrée: Restaurer | ESC: Retour au menu")
+            elif self.mode == "duplicates":
+                self.help_label.config(
+                    text="↑/↓: Notes | Espace: Marquer | a: Marquer les copies | Entrée: Supprimer | m: Fusionner | ESC: Retour au menu"
+                )
             else:  # mode editor
+                # Indicateur de chargement ou de lecture seule à la place de l'état de sauvegarde
+                if self.load_chunks is not None:
+                    progress = min(99, self.loaded_chars * 100 // max(1, self.load_size))
+                    save_text = f"CHARGEMENT DE LA NOTE: {progress}%"
+                elif self.note_read_only:
+                    save_text = "LECTURE SEULE (note volumineuse)"
+                else:
+                    save_text = self.save_status
+
                 # Calculer les statistiques
                 stats = self.calculate_statistics()
                 if stats:
                     stats_text = f"Mots: {stats['word_count']} | Caractères: {stats['char_count']} | Temps de lecture: {stats['reading_time']}"
-                    self.help_label.config(text=f"ESC: Retour au menu | {stats_text} | Sauvegarde automatique activée")
+                    self.help_label.config(text=f"ESC: Retour au menu | {stats_text} | {save_text}")
                 else:
-                    self.help_label.config(text="ESC: Retour au menu | Sauvegarde automatique activée")
+                    self.help_label.config(text=f"ESC: Retour au menu | {save_text}")
 
     def bind_menu_keys(self):
         self.master.bind("<Up>", self.move_up)
@@ -342,6 +601,10 @@ class TerminalNotesApp:
         self.master.bind("d", self.delete_note)
         self.master.bind("r", self.rename_note)
         self.master.bind("f", self.toggle_favorite)
+        self.master.bind("<slash>", self.start_search)
+        self.master.bind("<Control-p>", self.quick_open)
+        self.master.bind("v", self.show_history)
+        self.master.bind("D", self.show_duplicates)
         self.master.bind("q", self.quit_app)
         self.master.bind("h", self.show_help_popup)
 
@@ -353,6 +616,10 @@ class TerminalNotesApp:
         self.master.unbind("d")
         self.master.unbind("r")
         self.master.unbind("f")
+        self.master.unbind("<slash>")
+        self.master.unbind("<Control-p>")
+        self.master.unbind("v")
+        self.master.unbind("D")
         self.master.unbind("q")
         self.master.unbind("h")
 
@@ -365,107 +632,114 @@ class TerminalNotesApp:
         self.master.unbind("<Escape>")
         # 'h' unbinding removed as it's no longer bound in editor mode
 
-    def get_note_mtime(self, note_filename):
-        """Retourne la date de dernière modification d'une note"""
-        note_path = os.path.join(NOTES_DIR, note_filename)
-        mtime = os.path.getmtime(note_path)
-        return datetime.datetime.fromtimestamp(mtime)
-
-    def get_menu_text(self):
-        """Génère le contenu du menu principal avec notes regroupées par date"""
-        lines = []
-        lines.append("** NOTES DISPONIBLES **")
-        lines.append("")
-
-        # Réinitialiser le mapping visuel
-        self.visual_to_index = []
-        visual_position = 0  # Position visuelle courante
-
-        if self.notes:
-            # Grouper les notes par date de modification
-            notes_by_date = defaultdict(list)
-            note_indices = {}  # Pour conserver les indices originaux
-
-            # Trier les notes par date de dernière modification (plus récente d'abord)
-            sorted_notes = sorted(
-                enumerate(self.notes),
-                key=lambda x: self.get_note_mtime(x[1]),
-                reverse=True
-            )
-
-            # Réorganiser la liste des notes et les indices
-            sorted_indices = []
-            self.notes = [note for _, note in sorted_notes]
+    @timed("build_menu_rows")
+    def build_menu_rows(self):
+        """Met à jour les lignes du menu principal avec notes regroupées par date
 
-            # Mise à jour de l'index courant si nécessaire
-            if self.current_index >= 0:
-                # Trouver la nouvelle position de la note sélectionnée
-                selected_note = sorted_notes[self.current_index][1] if self.current_index < len(sorted_notes) else None
-                if selected_note:
-                    self.current_index = self.notes.index(selected_note)
-
-            # Afficher d'abord les favoris
-            if self.favorites:
-                lines.append("-- FAVORIS --")
-
-                # Filtrer les notes favorites qui existent encore
-                valid_favorites = [note for note in self.favorites if note in self.notes]
-
-                # Afficher les notes favorites
-                for note in valid_favorites:
-                    i = self.notes.index(note)
-                    name = note.replace(".txt", "")
-
-                    # Ajouter au mapping visuel
-                    self.visual_to_index.append(i)
-
-                    if i == self.current_index:
-                        lines.append(f"[ ★ {name} ]")  # Note favorite sélectionnée
-                    else:
-                        lines.append(f"  ★ {name}  ")  # Note favorite non sélectionnée
-
-                    visual_position += 1
-
-                lines.append("")  # Espace après les favoris
-
-            # Grouper par date
-            for i, note in enumerate(self.notes):
-                note_date = self.get_note_mtime(note)
-                date_str = note_date.strftime("%d/%m/%Y")
-                notes_by_date[date_str].append((i, note))
-
-            # Afficher les notes par groupe de date
-            for date_str, note_list in notes_by_date.items():
-                # Ajouter l'en-tête de date
-                lines.append(f"-- {date_str} --")
-
-                # Ajouter les notes de cette date
-                for i, note in note_list:
-                    # Ne pas afficher à nouveau les favoris
-                    if note in self.favorites:
-                        continue
+        Les lignes des notes sont celles du catalogue, tenues à jour par arrange(): après une
+        sauvegarde, seule la note enregistrée change de ligne. Seules les lignes visibles sont
+        ensuite écrites dans le widget (render_menu_window).
+        """
+        version = self.catalog.arrange(self.store.favorites) if len(self.catalog) else None
+        if version is not None and version == self.menu_version:
+            return
+        self.menu_version = version
 
-                    # Ajouter au mapping visuel
-                    self.visual_to_index.append(i)
+        if len(self.catalog):
+            # Position de la sélection avant réorganisation (la note a pu être supprimée)
+            previous_position = self.current_note.visual if self.current_note else 0
 
-                    name = note.replace(".txt", "")
-                    if i == self.current_index:
-                        lines.append(f"[ {name} ]")  # Note sélectionnée entre crochets
-                    else:
-                        lines.append(f"  {name}  ")  # Note non sélectionnée avec espaces
+            # Favoris puis notes groupées par date de modification (plus récentes d'abord)
+            self.menu_head = ["** NOTES DISPONIBLES **", ""]
+            self.menu_rows = self.catalog.rows
 
-                    visual_position += 1
+            # Garder la sélection sur la même note, ou sur sa voisine si elle a disparu
+            if not self.catalog.is_current(self.current_note):
+                visual = self.catalog.visual
+                self.current_note = visual[min(max(previous_position, 0), len(visual) - 1)]
+        else:
+            self.current_note = None
+            self.menu_head = [
+                "** NOTES DISPONIBLES **",
+                "",
+                "> AUCUNE NOTE DISPONIBLE",
+                "",
+                "Utilisez 'n' pour créer une nouvelle note",
+            ]
+            self.menu_rows = []
+
+    def menu_length(self):
+        return len(self.menu_head) + len(self.menu_rows)
+
+    def menu_lines(self, start, end):
+        """Lignes du menu de start à end (exclu): lignes fixes, puis celles des notes"""
+        head = len(self.menu_head)
+        return self.menu_head[start:end] + self.menu_rows[max(0, start - head):max(0, end - head)]
+
+    def menu_line(self, record):
+        """Ligne d'une note dans le menu (à partir de 1, comme celles du widget Text)"""
+        return len(self.menu_head) + record.row + 1
+
+    def menu_row_text(self, row):
+        """Texte d'une ligne du menu (notes entre crochets si sélectionnées)"""
+        if isinstance(row, str):
+            return row
+        if isinstance(row, MenuSection):
+            return f"-- {row.date} --" if row.date else "-- FAVORIS --"
+        name = row.name
+        if row.filename in self.store.favorites:
+            name = f"★ {name}"
+        if row is self.current_note:
+            return f"[ {name} ]"  # Note sélectionnée entre crochets
+        return f"  {name}  "  # Note non sélectionnée avec espaces
+
+    def menu_visible_rows(self):
+        """Nombre de lignes du menu visibles dans le panneau gauche"""
+        height = self.left.winfo_height()
+        if height <= 1:
+            # Fenêtre pas encore affichée: hauteur demandée à la création
+            return int(self.left.cget("height"))
+        margins = 2 * (int(self.left.cget("borderwidth")) + int(self.left.cget("pady"))
+                       + int(self.left.cget("highlightthickness")))
+        return max(1, (height - margins) // self.menu_linespace)
+
+    @timed("render_menu")
+    def render_menu_window(self):
+        """Écrit dans le panneau gauche les lignes visibles du menu, plus une marge de chaque côté
+
+        Le coût ne dépend que de la hauteur du panneau, pas du nombre de notes.
+        """
+        visible = self.menu_visible_rows()
+        self.menu_top = max(0, min(self.menu_top, self.menu_length() - visible))
+        start = max(0, self.menu_top - MENU_OVERSCAN)
+        end = min(self.menu_length(), self.menu_top + visible + MENU_OVERSCAN)
+        self.menu_window = (start, end)
 
-                # Ajouter un espace entre les groupes de dates
-                lines.append("")
+        self.left.configure(state="normal")
+        self.left.delete("1.0", "end")
+        self.left.insert("1.0", "\n".join(self.menu_row_text(row) for row in self.menu_lines(start, end)))
+        self.left.configure(state="disabled")
+        self.drawn_note = self.current_note
+        self.left.yview(f"{self.menu_top - start + 1}.0")
+
+    def on_menu_resize(self, event=None):
+        """Le nombre de lignes visibles a pu changer: réécrire la fenêtre du menu"""
+        if self.menu_head:
+            self.render_menu_window()
+            self.scroll_to_selection()
+
+    def on_menu_wheel(self, event):
+        """Fait défiler la liste virtualisée à la molette"""
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self.menu_top -= MENU_WHEEL_ROWS
         else:
-            lines.append("> AUCUNE NOTE DISPONIBLE")
-            lines.append("")
-            lines.append("Utilisez 'n' pour créer une nouvelle note")
+            self.menu_top += MENU_WHEEL_ROWS
+        self.render_menu_window()
+        return "break"
 
-        return "\n".join(lines)
 
 
+    @timed("load_menu")
     def load_menu(self):
         """Charge l'interface du menu principal"""
         self.mode = "menu"
@@ -478,39 +752,87 @@ class TerminalNotesApp:
         self.update_status_bar()
 
         # Mise à jour du contenu du menu
-        self.left.configure(state="normal")
-        self.left.delete("1.0", "end")
-        self.left.insert("1.0", self.get_menu_text())
-        self.left.configure(state="disabled")
+        self.build_menu_rows()
+        self.render_menu_window()
+        self.scroll_to_selection()
 
         # Mise à jour de l'aperçu
+        self.load_preview()
+
+        # Remettre le focus sur la fenêtre principale pour permettre les raccourcis
+        self.master.focus_set()
+
+        self.bind_menu_keys()
+
+    def refresh_menu(self):
+        """Met à jour le menu après un changement en arrière-plan (sauvegarde, autre programme)
+
+        Sous une fenêtre ouverte par-dessus le menu, seules les lignes sont réécrites:
+        load_menu lui prendrait le focus et remettrait les touches du menu.
+        """
+        if self.open_popups:
+            self.build_menu_rows()
+            self.render_menu_window()
+            self.scroll_to_selection()
+            self.menu_refresh_pending = True
+        else:
+            self.load_menu()
+
+    def popup_opened(self):
+        self.open_popups += 1
+
+    def popup_closed(self, reload=True):
+        """Une fenêtre surgissante est fermée: recharge le menu si une mise à jour a été différée"""
+        self.open_popups = max(0, self.open_popups - 1)
+        if not self.open_popups and self.menu_refresh_pending:
+            self.menu_refresh_pending = False
+            if reload and self.mode == "menu":
+                self.load_menu()
+
+    @timed("load_preview")
+    def load_preview(self):
+        """Affiche l'aperçu de la note sélectionnée dans le panneau de droite"""
+        self.cancel_preview_job()
+
+        # L'aperçu vient du cache: le disque n'est lu que par le thread de l'aperçu
+        preview_result = None
+        if self.catalog.is_current(self.current_note):
+            note = self.current_note.filename
+            mtime = self.current_note.mtime
+            preview_result = self.preview_cache.get(note, mtime)
+            # Voisins empilés avant la note courante: la file LIFO sert la sélection d'abord
+            self.prefetch_neighbour_previews()
+            if preview_result is None:
+                self.preview_cache.request(note, mtime)
+                self.preview_job = self.master.after(PREVIEW_POLL_MS, self.poll_preview)
+
         self.right.configure(state="normal")  # Temporairement activé pour mise à jour
         self.right.delete("1.0", "end")
 
-        if self.notes and self.current_index >= 0:
-            try:
-                with open(os.path.join(NOTES_DIR, self.notes[self.current_index]), "r", encoding="utf-8") as f:
-                    preview = f.read(800)  # Un peu plus long pour plus de contexte
-
-                    # Formater l'en-tête de l'aperçu
-                    note_name = self.notes[self.current_index].replace(".txt", "")
-                    self.right.insert("1.0", f">> APERÇU: {note_name} <<\n\n")
-                    self.right.tag_add("header", "1.0", "2.0")
-                    self.right.tag_config("header", foreground=TERMINAL_HEADER)
-
-                    # Contenu
-                    if preview:
-                        self.right.insert("end", preview)
-                    else:
-                        self.right.insert("end", "[ Note vide ]")
+        if self.catalog.is_current(self.current_note):
+            preview, error = preview_result or ("", None)
+            if error:
+                self.right.insert("1.0", f"ERREUR: Impossible de lire la note.\n{error}")
+            else:
+                # Formater l'en-tête de l'aperçu
+                note_name = self.current_note.name
+                self.right.insert("1.0", f">> APERÇU: {note_name} <<\n\n")
+                self.right.tag_add("header", "1.0", "2.0")
+                self.right.tag_config("header", foreground=TERMINAL_HEADER)
+
+                # Contenu
+                if preview_result is None:
+                    self.right.insert("end", "[ Chargement... ]")
+                elif preview:
+                    self.right.insert("end", preview)
+                else:
+                    self.right.insert("end", "[ Note vide ]")
 
-                    # Ajoute un indicateur si le contenu est tronqué
-                    if len(preview) >= 800:
-                        self.right.insert("end", "\n\n[...] Note tronquée, appuyez sur Entrée pour voir tout")
-                        self.right.tag_add("truncated", "end-2l", "end")
-                        self.right.tag_config("truncated", foreground=TERMINAL_SELECTED)
-            except Exception as e:
-                self.right.insert("1.0", f"ERREUR: Impossible de lire la note.\n{str(e)}")
+                # Ajoute un indicateur si le contenu est tronqué
+                if len(preview) >= PREVIEW_SIZE:
+                    self.right.insert("end", "\n\n[...] Note tronquée, appuyez sur Entrée pour voir tout")
+                    self.right.tag_add("truncated", "end-2l", "end")
+                    self.right.tag_config("truncated", foreground=TERMINAL_SELECTED)
         else:
             self.right.insert("1.0", "Créez une note avec la touche 'n' ou sélectionnez une note existante.")
 
@@ -519,26 +841,117 @@ class TerminalNotesApp:
         # Ajouter un gestionnaire pour empêcher la modification du texte
         self.right.bind("<Key>", lambda e: "break")
 
-        # Remettre le focus sur la fenêtre principale pour permettre les raccourcis
-        self.master.focus_set()
+    def poll_preview(self):
+        """Réaffiche l'aperçu une fois chargé par le thread de l'aperçu (ou la sélection arrêtée)"""
+        self.preview_job = None
+        if self.mode == "menu":
+            self.load_preview()
 
-        self.bind_menu_keys()
+    def cancel_preview_job(self):
+        """Annule l'attente d'un aperçu en cours de chargement"""
+        if self.preview_job:
+            self.master.after_cancel(self.preview_job)
+            self.preview_job = None
+
+    def prefetch_neighbour_previews(self):
+        """Précharge en arrière-plan les aperçus des notes voisines dans l'ordre visuel"""
+        visual_pos = self.get_visual_position()
+        if visual_pos < 0:
+            return
+
+        neighbours = []
+        for offset in range(1, PREVIEW_PREFETCH_RADIUS + 1):
+            for pos in (visual_pos + offset, visual_pos - offset):
+                if 0 <= pos < len(self.catalog.visual):
+                    record = self.catalog.visual[pos]
+                    neighbours.append((record.filename, record.mtime))
+        self.preview_cache.prefetch(neighbours)
+
+    def scroll_to_selection(self):
+        """Fait défiler la liste pour garder la sélection visible"""
+        visual_pos = self.get_visual_position()
+        if visual_pos < 0:
+            return
+
+        row = self.menu_line(self.current_note) - 1
+        visible = self.menu_visible_rows()
+        top = self.menu_top
+        if visual_pos == 0:
+            top = 0  # Revenir tout en haut pour revoir les en-têtes
+        elif row < top:
+            top = row
+        elif row >= top + visible:
+            top = row - visible + 1
+        if top != self.menu_top:
+            self.menu_top = top
+            self.render_menu_window()
+
+        # Les noms trop longs occupent plusieurs lignes à l'écran: laisser le widget ajuster
+        start, end = self.menu_window
+        if start <= row < end:
+            self.left.see(f"{row - start + 1}.0")
+
+    def set_line_selected(self, line, selected):
+        """Remplace les marqueurs [ ] d'une ligne du menu sans reconstruire le texte"""
+        # Ligne hors de la fenêtre écrite dans le widget: elle sera rendue à jour au défilement
+        start, end = self.menu_window
+        if not start < line <= end:
+            return
+        line -= start
+
+        # Les lignes sélectionnées et non sélectionnées ont la même longueur:
+        # seuls le premier et le dernier caractère changent
+        self.left.delete(f"{line}.0", f"{line}.1")
+        self.left.insert(f"{line}.0", "[" if selected else " ")
+        self.left.delete(f"{line}.end -1c", f"{line}.end")
+        self.left.insert(f"{line}.end", "]" if selected else " ")
+
+    def select_visual_position(self, new_visual_pos):
+        """Change la sélection logique; l'écran et l'aperçu suivent de façon différée
+
+        Avec la répétition du clavier, plusieurs déplacements peuvent précéder un seul
+        affichage (redraw_selection), et l'aperçu attend que la sélection s'arrête.
+        """
+        self.current_note = self.catalog.visual[new_visual_pos]
+
+        if self.redraw_job is None:
+            self.redraw_job = self.master.after_idle(self.redraw_selection)
+
+        self.cancel_preview_job()
+        self.preview_job = self.master.after(PREVIEW_SETTLE_MS, self.poll_preview)
+
+    @timed("redraw_selection")
+    def redraw_selection(self):
+        """Reporte la sélection courante à l'écran, en ne mettant à jour que les lignes concernées"""
+        self.redraw_job = None
+        if self.mode != "menu" or not self.catalog.is_current(self.current_note):
+            return
+
+        if not INCREMENTAL_SELECTION:
+            self.build_menu_rows()
+            self.render_menu_window()
+            self.scroll_to_selection()
+            return
 
+        self.left.configure(state="normal")
+        if self.catalog.is_current(self.drawn_note) and self.drawn_note is not self.current_note:
+            self.set_line_selected(self.menu_line(self.drawn_note), False)
+        self.set_line_selected(self.menu_line(self.current_note), True)
+        self.left.configure(state="disabled")
+        self.drawn_note = self.current_note
+        self.scroll_to_selection()
 
     def get_visual_position(self):
         """Retourne la position visuelle de la note actuellement sélectionnée"""
-        if not self.notes or self.current_index < 0:
-            return -1
-
-        try:
-            return self.visual_to_index.index(self.current_index)
-        except ValueError:
-            # Si la note n'est pas dans le mapping visuel, retourner -1
+        if not self.catalog.is_current(self.current_note):
             return -1
+        # -1 si la note n'est pas encore placée dans le menu
+        return self.current_note.visual
 
+    @timed("move")
     def move_up(self, event):
         """Déplace la sélection vers le haut dans la liste des notes"""
-        if not self.notes or not self.visual_to_index:
+        if not self.catalog.visual:
             return
 
         # Trouver la position visuelle actuelle
@@ -549,86 +962,45 @@ class TerminalNotesApp:
             return
 
         # Déplacer vers le haut dans l'ordre visuel
-        new_visual_pos = visual_pos - 1
-        self.current_index = self.visual_to_index[new_visual_pos]
-        self.load_menu()
+        self.select_visual_position(visual_pos - 1)
 
+    @timed("move")
     def move_down(self, event):
         """Déplace la sélection vers le bas dans la liste des notes"""
-        if not self.notes or not self.visual_to_index:
+        if not self.catalog.visual:
             return
 
         # Trouver la position visuelle actuelle
         visual_pos = self.get_visual_position()
 
         # Si la note n'est pas dans le mapping visuel ou est déjà en bas
-        if visual_pos < 0 or visual_pos >= len(self.visual_to_index) - 1:
+        if visual_pos < 0 or visual_pos >= len(self.catalog.visual) - 1:
             return
 
         # Déplacer vers le bas dans l'ordre visuel
-        new_visual_pos = visual_pos + 1
-        self.current_index = self.visual_to_index[new_visual_pos]
-        self.load_menu()
-
-    def load_favorites(self):
-        """Charge la liste des notes favorites depuis le fichier"""
-        try:
-            if os.path.exists(FAVORITES_FILE):
-                with open(FAVORITES_FILE, "r", encoding="utf-8") as f:
-                    favorites_list = json.load(f)
-                    self.favorites = set(favorites_list)
-        except Exception as e:
-            # En cas d'erreur, on commence avec une liste vide
-            self.favorites = set()
-
-    def save_favorites(self):
-        """Enregistre la liste des notes favorites dans le fichier"""
-        try:
-            with open(FAVORITES_FILE, "w", encoding="utf-8") as f:
-                json.dump(list(self.favorites), f)
-        except Exception as e:
-            pass  # Ignorer les erreurs d'écriture
+        self.select_visual_position(visual_pos + 1)
 
     def toggle_favorite(self, event):
         """Marque ou démarque une note comme favorite"""
-        if not self.notes or self.current_index < 0:
+        if not self.catalog.is_current(self.current_note):
             return
 
-        note = self.notes[self.current_index]
-
-        # Ajouter ou retirer de l'ensemble des favoris
-        if note in self.favorites:
-            self.favorites.remove(note)
-        else:
-            self.favorites.add(note)
+        note = self.current_note.filename
 
-        # Sauvegarder les favoris
-        self.save_favorites()
+        # Ajouter ou retirer de l'ensemble des favoris (enregistré aussitôt)
+        self.store.toggle_favorite(note)
 
         # Mettre à jour l'affichage
         self.load_menu()
 
     def create_new_note(self, event):
         """Crée une nouvelle note avec un nom basé sur la date et l'heure"""
-        # Format plus court mais toujours unique avec secondes pour éviter les doublons
-        timestamp = time.strftime("%m%d_%H%M%S")
-        name = f"note_{timestamp}.txt"
-
-        # Vérifier si le fichier existe déjà et ajouter un suffixe si nécessaire
-        base_path = os.path.join(NOTES_DIR, name)
-        counter = 1
-        while os.path.exists(base_path):
-            name = f"note_{timestamp}_{counter}.txt"
-            base_path = os.path.join(NOTES_DIR, name)
-            counter += 1
-
-        # Création du fichier vide
-        with open(base_path, "w", encoding="utf-8") as f:
-            f.write("")
+        # Création du fichier vide (suffixe ajouté si le nom existe déjà)
+        name = self.store.create()
+        self.search_index.update(name, self.note_index.mtime(name))
 
         # Mise à jour de la liste et sélection de la nouvelle note
-        self.notes.insert(0, name)  # Ajout au début car c'est la plus récente
-        self.current_index = 0
+        self.current_note = self.catalog.get(name)
 
         # Ouvre directement la note pour édition
         self.open_note(None)
@@ -642,6 +1014,7 @@ class TerminalNotesApp:
         for key in ["<Return>", "<Escape>"]:
             self.prev_bindings[key] = self.master.bind(key)
             self.master.unbind(key)
+        self.popup_opened()
 
         # Créer un conteneur pour le popup d'aide
         help_container = tk.Frame(
@@ -664,7 +1037,7 @@ class TerminalNotesApp:
         window_width = self.master.winfo_width()
         window_height = self.master.winfo_height()
         popup_width = 500
-        popup_height = 300
+        popup_height = 430
 
         x_pos = (window_width - popup_width) // 2
         y_pos = (window_height - popup_height) // 2
@@ -700,6 +1073,10 @@ class TerminalNotesApp:
                 ("r", "Renommer la note sélectionnée"),
                 ("f", "Marquer/Démarquer comme favori"),
                 ("d", "Supprimer la note sélectionnée"),
+                ("/", "Rechercher dans le contenu des notes"),
+                ("Ctrl+P", "Ouvrir une note par son nom"),
+                ("v", "Versions enregistrées de la note"),
+                ("D", "Doublons: fusionner ou supprimer les copies"),
                 ("q", "Quitter l'application"),
                 ("h", "Afficher cette aide")
             ]
@@ -763,6 +1140,7 @@ class TerminalNotesApp:
 
             # Détruire le popup
             help_container.destroy()
+            self.popup_closed()
 
         # Liaison des touches pour fermer le popup
         self.master.bind("<Return>", lambda e: close_help())
@@ -775,6 +1153,7 @@ class TerminalNotesApp:
         self.confirmation_result = None
 
         # Stocker l'état des liaisons clavier actuelles
+        self.popup_opened()
         for key in ["<Left>", "<Right>", "<Tab>", "<Return>", "<Escape>", "n", "d", "q"]:
             self.prev_bindings[key] = self.master.bind(key)
             self.master.unbind(key)
@@ -845,6 +1224,7 @@ class TerminalNotesApp:
 
             # Détruire le panneau de confirmation
             confirmation_container.destroy()
+            self.popup_closed()
 
             # Exécuter le callback si confirmé
             if result:
@@ -895,21 +1275,23 @@ class TerminalNotesApp:
 
     def rename_note(self, event):
         """Renomme la note sélectionnée"""
-        if not self.notes or self.current_index < 0:
+        if not self.catalog.is_current(self.current_note):
             return
 
-        note = self.notes[self.current_index]
+        note = self.current_note.filename
         old_name = note.replace(".txt", "")
 
         # Variables pour le dialogue de renommage
         self.rename_dialog_active = True
         self.rename_result = None
 
-        # Stocker les liaisons clavier actuelles
+        # Stocker les liaisons clavier actuelles (aucune touche du menu ne doit réagir à la saisie)
         prev_bindings = {}
-        for key in ["<Up>", "<Down>", "<Return>", "<Escape>", "n", "r", "d", "q"]:
+        for key in ["<Up>", "<Down>", "<Return>", "<Escape>", "n", "r", "d", "q",
+                    "f", "h", "<slash>", "v", "D", "<Control-p>"]:
             prev_bindings[key] = self.master.bind(key)
             self.master.unbind(key)
+        self.popup_opened()
 
         # Créer un conteneur externe pour le cadre du dialogue qui ne changera pas de couleur
         outer_container = tk.Frame(
@@ -1006,44 +1388,14 @@ class TerminalNotesApp:
 
         # Fonction pour valider le renommage
         def process_rename():
-            new_name = entry.get().strip()
-
-            # Vérification du nom vide
-            if not new_name:
-                error_label.config(text="ERREUR: Le nom ne peut pas être vide")
-                return
-
-            # Vérification des caractères invalides pour un nom de fichier
-            invalid_chars = ['/', '\\', ':', '*', '?', '"', '<', '>', '|']
-            if any(char in new_name for char in invalid_chars):
-                error_label.config(text="ERREUR: Nom contient des caractères invalides")
-                return
-
-            # Vérification si le nom existe déjà
-            new_filename = f"{new_name}.txt"
-            if new_filename in self.notes and new_filename != note:
-                error_label.config(text="ERREUR: Ce nom de note existe déjà")
-                return
-
-            # Tentative de renommage
+            # Tentative de renommage (nom vide, invalide ou déjà pris: NoteStoreError)
             try:
-                old_path = os.path.join(NOTES_DIR, note)
-                new_path = os.path.join(NOTES_DIR, new_filename)
-
-                # Renommer le fichier sur le disque
-                os.rename(old_path, new_path)
-
-                # Mettre à jour la liste des notes
-                old_index = self.notes.index(note)
-                self.notes[old_index] = new_filename
-                # Ne pas trier pour conserver l'ordre par date
-                self.current_index = old_index
-
-                # Mettre à jour les favoris si nécessaire
-                if note in self.favorites:
-                    self.favorites.remove(note)
-                    self.favorites.add(new_filename)
-                    self.save_favorites()
+                self.save_worker.flush()
+                new_filename = self.store.rename(note, entry.get())
+                if new_filename != note:
+                    self.preview_cache.invalidate(note)
+                    self.search_index.rename(note, new_filename)
+                # L'enregistrement renommé reste celui de la note sélectionnée
 
                 # Fermer le dialogue
                 close_dialog()
@@ -1064,6 +1416,7 @@ class TerminalNotesApp:
             # Détruire le cadre du dialogue
             outer_container.destroy()
             self.rename_dialog_active = False
+            self.popup_closed()
 
         # Liaison des touches pour le dialogue
         entry.bind("<Return>", lambda e: process_rename())
@@ -1101,29 +1454,23 @@ class TerminalNotesApp:
 
     def delete_note(self, event):
         """Supprime la note sélectionnée"""
-        if not self.notes or self.current_index < 0:
+        if not self.catalog.is_current(self.current_note):
             return
 
-        note = self.notes[self.current_index]
+        note = self.current_note.filename
         note_name = note.replace(".txt", "")
 
         # Fonction à exécuter si l'utilisateur confirme la suppression
         def do_delete():
             try:
-                os.remove(os.path.join(NOTES_DIR, note))
-                self.notes.remove(note)
-
-                # Retirer des favoris si présent
-                if note in self.favorites:
-                    self.favorites.remove(note)
-                    self.save_favorites()
-
-                # Ajuste l'index de sélection
-                if not self.notes:
-                    self.current_index = -1
-                elif self.current_index >= len(self.notes):
-                    self.current_index = len(self.notes) - 1
-
+                # Une écriture en attente recréerait la note après sa suppression
+                self.save_worker.flush()
+                # Fichier, journaux, index et favori
+                self.store.delete(note)
+                self.preview_cache.invalidate(note)
+                self.search_index.remove(note)
+
+                # La sélection passe à la note suivante dans le menu
                 self.load_menu()
             except Exception as e:
                 pass
@@ -1134,17 +1481,661 @@ class TerminalNotesApp:
             do_delete
         )
 
+    def start_search(self, event=None):
+        """Passe en mode recherche plein texte"""
+        self.unbind_menu_keys()
+        self.cancel_preview_job()
+        self.mode = "search"
+        self.search_results = []
+        self.search_selected = 0
+        self.update_status_bar()
+
+        # Barre de saisie au-dessus de la liste des notes
+        self.search_frame = tk.Frame(self.left_frame, bg=TERMINAL_BG)
+        self.search_frame.pack(side="top", fill="x", pady=(0, PADDING//2), before=self.left)
+
+        tk.Label(
+            self.search_frame,
+            text="/ ",
+            bg=TERMINAL_BG,
+            fg=TERMINAL_FG,
+            font=(FONT_FAMILY, FONT_SIZE_NORMAL)
+        ).pack(side="left")
+
+        self.search_entry = tk.Entry(
+            self.search_frame,
+            bg=TERMINAL_BG,
+            fg=TERMINAL_FG,
+            insertbackground=TERMINAL_FG,
+            font=(FONT_FAMILY, FONT_SIZE_NORMAL),
+            relief="flat",
+            highlightthickness=0,
+            borderwidth=0
+        )
+        self.search_entry.pack(side="left", fill="x", expand=True)
+        self.search_entry.focus_set()
+
+        self.search_entry.bind("<KeyRelease>", self.defer_search)
+        self.search_entry.bind("<Up>", lambda e: self.move_search_selection(-1))
+        self.search_entry.bind("<Down>", lambda e: self.move_search_selection(1))
+        self.search_entry.bind("<Return>", self.open_search_result)
+        self.search_entry.bind("<Escape>", self.close_search)
+
+        self.show_search_results("")
+
+    def defer_search(self, event=None):
+        """Diffère la requête pour ne pas interroger l'index à chaque frappe"""
+        if event is not None and event.keysym in ("Up", "Down", "Return", "Escape"):
+            return
+        if self.search_job:
+            self.master.after_cancel(self.search_job)
+        self.search_job = self.master.after(SEARCH_DELAY_MS, self.run_search)
+
+    @timed("search")
+    def run_search(self):
+        """Interroge l'index et affiche les résultats"""
+        self.search_job = None
+        if self.mode != "search":
+            return
+        query = self.search_entry.get()
+        self.search_results = self.search_index.search(query, limit=SEARCH_RESULTS)
+        self.search_selected = 0
+        self.show_search_results(query)
+
+    def move_search_selection(self, direction):
+        """Déplace la sélection dans la liste des résultats"""
+        if self.search_results:
+            self.search_selected = (self.search_selected + direction) % len(self.search_results)
+            self.show_search_results(self.search_entry.get())
+        return "break"
+
+    def show_search_results(self, query):
+        """Affiche les résultats classés et leurs extraits surlignés dans le panneau de droite"""
+        self.right.configure(state="normal")
+        self.right.delete("1.0", "end")
+
+        header = f">> RECHERCHE: {query} <<" if query else ">> RECHERCHE <<"
+        if self.search_index.is_building():
+            header += "  (indexation en cours...)"
+        self.right.insert("1.0", header + "\n\n")
+        self.right.tag_add("header", "1.0", "2.0")
+        self.right.tag_config("header", foreground=TERMINAL_HEADER)
+        self.right.tag_config("match", foreground=TERMINAL_BG, background=TERMINAL_FG)
+
+        if not query.strip():
+            self.right.insert("end", "Tapez des mots à rechercher dans le contenu des notes.")
+        elif not self.search_results:
+            self.right.insert("end", "> AUCUN RÉSULTAT")
+
+        terms = set(query_terms(query))
+        for i, result in enumerate(self.search_results):
+            name = result.filename.replace(".txt", "")
+            if i == self.search_selected:
+                self.right.insert("end", f"[ {name} ]\n")
+            else:
+                self.right.insert("end", f"  {name}  \n")
+
+            try:
+                snippet, spans = make_snippet(self.store, result.filename, result.positions, terms)
+            except Exception as e:
+                snippet, spans = f"ERREUR: {str(e)}", []
+
+            # Surligner les termes trouvés dans l'extrait
+            line_start = self.right.index("end-1c")
+            self.right.insert("end", f"{snippet}\n\n")
+            for start, end in spans:
+                self.right.tag_add("match", f"{line_start}+{start}c", f"{line_start}+{end}c")
+
+        self.right.configure(insertwidth=0)
+        self.right.bind("<Key>", lambda e: "break")
+
+    def open_search_result(self, event=None):
+        """Ouvre la note du résultat sélectionné"""
+        if not self.search_results:
+            return "break"
+        record = self.catalog.get(self.search_results[self.search_selected].filename)
+        if record:
+            self.close_search()
+            self.current_note = record
+            self.open_note(None)
+        return "break"
+
+    def close_search(self, event=None):
+        """Quitte le mode recherche et revient au menu"""
+        if self.search_job:
+            self.master.after_cancel(self.search_job)
+            self.search_job = None
+        self.search_frame.destroy()
+        self.load_menu()
+        return "break"
+
+    def quick_open(self, event=None):
+        """Ouverture rapide: filtre les noms des notes à chaque frappe et ouvre la note choisie"""
+        if not len(self.catalog):
+            return
+
+        # Index des noms dans l'ordre du menu (favoris d'abord), reconstruit si cet ordre a changé
+        version = self.catalog.arrange(self.store.favorites)
+        if self.name_index.version != version:
+            self.name_index.build(self.catalog.visual, version)
+
+        self.unbind_menu_keys()
+        self.cancel_preview_job()
+        self.popup_opened()
+        results = []
+        selected = [0]
+
+        # Conteneur externe et cadre du dialogue, comme pour le renommage
+        outer_container = tk.Frame(
+            self.master,
+            bg=TERMINAL_BG,
+            highlightbackground=TERMINAL_FG,
+            highlightcolor=TERMINAL_FG,
+            highlightthickness=2
+        )
+
+        quick_frame = tk.Frame(
+            outer_container,
+            bg=TERMINAL_BG,
+            borderwidth=3,
+            relief="raised"
+        )
+        quick_frame.pack(fill="both", expand=True)
+
+        # Positionner le cadre au centre
+        window_width = self.master.winfo_width()
+        window_height = self.master.winfo_height()
+        popup_width = 500
+        popup_height = 380
+
+        x_pos = (window_width - popup_width) // 2
+        y_pos = (window_height - popup_height) // 2
+
+        outer_container.place(
+            x=x_pos, y=y_pos,
+            width=popup_width, height=popup_height
+        )
+
+        # Titre du dialogue
+        tk.Label(
+            quick_frame,
+            text="Ouvrir une note",
+            bg=TERMINAL_BG,
+            fg=TERMINAL_HEADER,
+            font=(FONT_FAMILY, FONT_SIZE_NORMAL, "bold"),
+            pady=10
+        ).pack(fill="x")
+
+        # Champ de saisie
+        input_frame = tk.Frame(quick_frame, bg=TERMINAL_BG)
+        input_frame.pack(fill="x", padx=PADDING, pady=5)
+
+        # Préfixe pour le style terminal
+        tk.Label(
+            input_frame,
+            text="> ",
+            bg=TERMINAL_BG,
+            fg=TERMINAL_FG,
+            font=(FONT_FAMILY, FONT_SIZE_NORMAL)
+        ).pack(side="left")
+
+        entry = tk.Entry(
+            input_frame,
+            bg=TERMINAL_BG,
+            fg=TERMINAL_FG,
+            insertbackground=TERMINAL_FG,
+            font=(FONT_FAMILY, FONT_SIZE_NORMAL),
+            relief="flat",
+            highlightthickness=0,
+            borderwidth=0
+        )
+        entry.pack(side="left", fill="x", expand=True)
+        entry.focus_set()
+
+        # Lignes des résultats, créées une fois et réécrites à chaque frappe
+        result_labels = []
+        for i in range(QUICK_OPEN_RESULTS):
+            label = tk.Label(
+                quick_frame,
+                text="",
+                bg=TERMINAL_BG,
+                fg=TERMINAL_FG,
+                font=(FONT_FAMILY, FONT_SIZE_NORMAL),
+                anchor="w",
+                cursor="hand2"
+            )
+            label.pack(fill="x", padx=PADDING)
+            label.bind("<Button-1>", lambda e, i=i: open_result(i))
+            result_labels.append(label)
+
+        # Nombre de résultats ou absence de résultat
+        info_label = tk.Label(
+            quick_frame,
+            text="",
+            bg=TERMINAL_BG,
+            fg=TERMINAL_FG,
+            font=(FONT_FAMILY, 11),
+            pady=5
+        )
+        info_label.pack(fill="x")
+
+        def show_results():
+            for i, label in enumerate(result_labels):
+                if i < len(results):
+                    record = results[i]
+                    name = record.name
+                    if len(name) > QUICK_OPEN_NAME_WIDTH:
+                        name = name[:QUICK_OPEN_NAME_WIDTH - 3] + "..."
+                    star = "*" if record.filename in self.store.favorites else " "
+                    text = f"{star} {name:<{QUICK_OPEN_NAME_WIDTH}} {record.date}"
+                    if i == selected[0]:
+                        label.config(text=f"[{text}]", fg=TERMINAL_SELECTED)
+                    else:
+                        label.config(text=f" {text} ", fg=TERMINAL_FG)
+                else:
+                    label.config(text="", fg=TERMINAL_FG)
+            if not results:
+                info_label.config(text="> AUCUNE NOTE")
+            else:
+                info_label.config(text="↑/↓: Choisir | Entrée: Ouvrir | ESC: Annuler")
+
+        def filter_names(event=None):
+            # Les touches de déplacement et de validation ne changent pas la requête
+            if event is not None and event.keysym in ("Up", "Down", "Return", "Escape"):
+                return
+            start = time.perf_counter()
+            results[:] = self.name_index.search(entry.get(), QUICK_OPEN_RESULTS)
+            selected[0] = 0
+            show_results()
+            self.perf.record("quick_open", (time.perf_counter() - start) * 1000)
+
+        def move_selection(direction):
+            if results:
+                selected[0] = (selected[0] + direction) % len(results)
+                show_results()
+            return "break"
+
+        def open_result(i=None):
+            i = selected[0] if i is None else i
+            if i >= len(results):
+                return "break"
+            record = self.catalog.get(results[i].filename)
+            if not record:
+                return close_dialog()
+            outer_container.destroy()
+            self.popup_closed(reload=False)  # L'éditeur remplace le menu
+            self.current_note = record
+            self.open_note(None)
+            return "break"
+
+        def close_dialog():
+            outer_container.destroy()
+            self.popup_closed()
+            self.load_menu()
+            return "break"
+
+        # Liaison des touches pour le dialogue
+        entry.bind("<KeyRelease>", filter_names)
+        entry.bind("<Up>", lambda e: move_selection(-1))
+        entry.bind("<Down>", lambda e: move_selection(1))
+        entry.bind("<Return>", lambda e: open_result())
+        entry.bind("<Escape>", lambda e: close_dialog())
+
+        filter_names()
+        return "break"
+
+    def show_history(self, event=None):
+        """Passe en mode historique: versions enregistrées de la note sélectionnée"""
+        if not self.catalog.is_current(self.current_note) or self.store.history is None:
+            return
+
+        # Les sauvegardes encore en attente font partie de l'historique
+        self.save_worker.flush()
+        self.process_save_results()
+
+        self.unbind_menu_keys()
+        self.cancel_preview_job()
+        self.mode = "history"
+        self.history_note = self.current_note.filename
+        self.history_revisions = self.store.history.revisions(self.history_note)
+        self.history_selected = 0
+        self.update_status_bar()
+
+        self.master.bind("<Up>", lambda e: self.move_history_selection(-1))
+        self.master.bind("<Down>", lambda e: self.move_history_selection(1))
+        self.master.bind("<Return>", self.restore_revision)
+        self.master.bind("<Escape>", self.close_history)
+
+        self.show_history_revision()
+
+    def move_history_selection(self, direction):
+        """Déplace la sélection dans la liste des versions"""
+        if self.history_revisions:
+            self.history_selected = (self.history_selected + direction) % len(self.history_revisions)
+            self.show_history_revision()
+        return "break"
+
+    def show_history_revision(self):
+        """Affiche la liste des versions autour de la sélection, puis le texte de la version sélectionnée"""
+        self.right.configure(state="normal")
+        self.right.delete("1.0", "end")
+
+        note_name = self.history_note.replace(".txt", "")
+        self.right.insert("1.0", f">> VERSIONS: {note_name} ({len(self.history_revisions)}) <<\n\n")
+        self.right.tag_add("header", "1.0", "2.0")
+        self.right.tag_config("header", foreground=TERMINAL_HEADER)
+
+        if not self.history_revisions:
+            self.right.insert("end", "> AUCUNE VERSION ENREGISTRÉE")
+        else:
+            # Liste des versions (la plus récente d'abord), fenêtre centrée sur la sélection
+            start = max(0, min(self.history_selected - HISTORY_LIST_ROWS // 2,
+                               len(self.history_revisions) - HISTORY_LIST_ROWS))
+            for i in range(start, min(start + HISTORY_LIST_ROWS, len(self.history_revisions))):
+                revision = self.history_revisions[i]
+                saved = datetime.datetime.fromtimestamp(revision.saved).strftime("%d/%m/%Y %H:%M:%S")
+                label = f"{saved}  {revision.size:>8} octets{'  (actuelle)' if i == 0 else ''}"
+                if i == self.history_selected:
+                    self.right.insert("end", f"[ {label} ]\n")
+                else:
+                    self.right.insert("end", f"  {label}  \n")
+            self.right.insert("end", "\n")
+
+            # Texte de la version: dernier point de reprise et deltas suivants
+            revision = self.history_revisions[self.history_selected]
+            try:
+                content = self.store.history.content(self.history_note, revision.id)
+            except Exception as e:
+                content = f"ERREUR: Impossible de lire cette version.\n{str(e)}"
+            if len(content) > HISTORY_VIEW_SIZE:
+                content = content[:HISTORY_VIEW_SIZE] + "\n\n[...] Version tronquée"
+            self.right.insert("end", content or "[ Note vide ]")
+
+        self.right.configure(insertwidth=0)
+        self.right.bind("<Key>", lambda e: "break")
+
+    def restore_revision(self, event=None):
+        """Remplace le contenu de la note par la version sélectionnée (après confirmation)"""
+        if self.history_selected == 0 or not self.history_revisions:
+            return "break"  # La version la plus récente est le contenu actuel
+
+        note = self.history_note
+        revision = self.history_revisions[self.history_selected]
+        saved = datetime.datetime.fromtimestamp(revision.saved).strftime("%d/%m/%Y %H:%M:%S")
+
+        def do_restore():
+            try:
+                content = self.store.history.content(note, revision.id)
+            except Exception as e:
+                return
+            # Écrite comme une sauvegarde: le contenu remplacé reste lui aussi dans l'historique
+            self.save_worker.submit(note, content)
+            if not self.save_poll_job:
+                self.save_poll_job = self.master.after(SAVE_POLL_MS, self.process_save_results)
+            self.close_history()
+
+        self.show_confirmation_popup(
+            f"Restaurer la version du {saved} de la note '{note.replace('.txt', '')}' ?",
+            do_restore
+        )
+        return "break"
+
+    def close_history(self, event=None):
+        """Quitte le mode historique et revient au menu"""
+        self.master.unbind("<Escape>")
+        self.history_revisions = []
+        self.load_menu()
+        return "break"
+
+    def show_duplicates(self, event=None):
+        """Passe en mode doublons: analyse des notes en arrière-plan, puis groupes de copies"""
+        if not len(self.catalog):
+            return
+
+        # Les sauvegardes en attente changent les dates (et le contenu) à analyser
+        self.save_worker.flush()
+        self.process_save_results()
+
+        self.unbind_menu_keys()
+        self.cancel_preview_job()
+        self.mode = "duplicates"
+        self.duplicate_groups = None
+        self.duplicate_entries = []
+        self.duplicate_selected = 0
+        self.duplicate_marked = set()
+        self.update_status_bar()
+
+        self.master.bind("<Up>", lambda e: self.move_duplicate_selection(-1))
+        self.master.bind("<Down>", lambda e: self.move_duplicate_selection(1))
+        self.master.bind("<space>", self.toggle_duplicate_mark)
+        self.master.bind("a", self.mark_duplicate_copies)
+        self.master.bind("<Return>", self.delete_marked_duplicates)
+        self.master.bind("m", self.merge_duplicate_group)
+        self.master.bind("<Escape>", self.close_duplicates)
+
+        # Une analyse encore en cours (mode quitté puis rouvert) est reprise telle quelle
+        if self.duplicate_thread is None or not self.duplicate_thread.is_alive():
+            if self.duplicate_finder is None:
+                # Import différé: note_dedup (et son pool de processus) n'est pas chargé au démarrage
+                from note_dedup import DuplicateFinder
+                self.duplicate_finder = DuplicateFinder(self.store, DEDUP_CACHE_FILE)
+            notes = {record.filename: (record.mtime, record.size) for record in self.catalog}
+            self.duplicate_result = None
+            self.duplicate_progress = (0, None)
+            self.duplicate_thread = threading.Thread(target=self.find_duplicates, args=(notes,), daemon=True)
+            self.duplicate_thread.start()
+        self.poll_duplicates()
+
+    def find_duplicates(self, notes):
+        """Thread d'analyse: seules les notes modifiées depuis la dernière analyse sont relues"""
+        def progress(done, total):
+            self.duplicate_progress = (done, total)
+        try:
+            self.duplicate_result = (self.duplicate_finder.find(notes, progress), None)
+        except Exception as e:
+            self.duplicate_result = (None, e)
+
+    def poll_duplicates(self):
+        """Affiche l'avancement de l'analyse, puis les groupes trouvés"""
+        self.duplicate_job = None
+        if self.mode != "duplicates":
+            return
+        if self.duplicate_thread.is_alive():
+            self.duplicate_job = self.master.after(DEDUP_POLL_MS, self.poll_duplicates)
+        else:
+            groups, error = self.duplicate_result
+            self.duplicate_error = error
+            self.set_duplicate_groups(groups or [])
+        self.show_duplicates_view()
+
+    def set_duplicate_groups(self, groups):
+        self.duplicate_groups = groups
+        self.duplicate_entries = [(group, filename) for group in groups for filename in group.filenames]
+        self.duplicate_marked &= {filename for _, filename in self.duplicate_entries}
+        self.duplicate_selected = min(self.duplicate_selected, max(0, len(self.duplicate_entries) - 1))
+
+    def move_duplicate_selection(self, direction):
+        if self.duplicate_entries:
+            self.duplicate_selected = (self.duplicate_selected + direction) % len(self.duplicate_entries)
+            self.show_duplicates_view()
+        return "break"
+
+    def show_duplicates_view(self):
+        """Groupes de doublons (la note gardée en premier), fenêtre centrée sur la sélection"""
+        self.right.configure(state="normal")
+        self.right.delete("1.0", "end")
+
+        if self.duplicate_groups is None:
+            done, total = self.duplicate_progress
+            count = f"{done}/{total}" if total is not None else "..."
+            self.right.insert("1.0", f">> DOUBLONS <<\n\nAnalyse des notes en cours: {count}")
+        elif not self.duplicate_groups:
+            self.right.insert("1.0", ">> DOUBLONS <<\n\n")
+            if self.duplicate_error:
+                self.right.insert("end", f"ERREUR: {str(self.duplicate_error)}")
+            else:
+                self.right.insert("end", "> AUCUN DOUBLON TROUVÉ")
+        else:
+            copies = len(self.duplicate_entries) - len(self.duplicate_groups)
+            self.right.insert("1.0", f">> DOUBLONS: {len(self.duplicate_groups)} groupe(s), {copies} copie(s) <<\n\n")
+
+            lines = []
+            selected_line = 0
+            previous_group = None
+            for i, (group, filename) in enumerate(self.duplicate_entries):
+                if group is not previous_group:
+                    if previous_group is not None:
+                        lines.append("")
+                    kind = "IDENTIQUES" if group.exact else "SIMILAIRES"
+                    lines.append(f"-- {kind} ({len(group.filenames)}) --")
+                    previous_group = group
+                record = self.catalog.get(filename)
+                date = record.date if record else ""
+                mark = "✗ " if filename in self.duplicate_marked else ""
+                if group.exact:
+                    similar = ""
+                elif filename in group.copies:
+                    similar = f"  = {group.copies[filename].replace('.txt', '')}"
+                else:
+                    similar = f"  {group.similarities[filename]:.0%}"
+                label = f"{mark}{filename.replace('.txt', '')}  {date}{similar}"
+                if i == self.duplicate_selected:
+                    selected_line = len(lines)
+                    lines.append(f"[ {label} ]")
+                else:
+                    lines.append(f"  {label}  ")
+
+            start = max(0, min(selected_line - DEDUP_VIEW_ROWS // 2, len(lines) - DEDUP_VIEW_ROWS))
+            self.right.insert("end", "\n".join(lines[start:start + DEDUP_VIEW_ROWS]))
+
+        self.right.tag_add("header", "1.0", "2.0")
+        self.right.tag_config("header", foreground=TERMINAL_HEADER)
+        self.right.configure(insertwidth=0)
+        self.right.bind("<Key>", lambda e: "break")
+
+    def toggle_duplicate_mark(self, event=None):
+        """Marque (ou démarque) la note sélectionnée pour la suppression"""
+        if self.duplicate_entries:
+            filename = self.duplicate_entries[self.duplicate_selected][1]
+            self.duplicate_marked ^= {filename}
+            self.show_duplicates_view()
+        return "break"
+
+    def mark_duplicate_copies(self, event=None):
+        """Marque toutes les notes de chaque groupe sauf la plus récente"""
+        if self.duplicate_groups:
+            self.duplicate_marked = {
+                filename for group in self.duplicate_groups for filename in group.filenames[1:]
+            }
+            self.show_duplicates_view()
+        return "break"
+
+    def remove_duplicate_notes(self, filenames):
+        """Supprime des notes (fichier, journaux, historique, favori, index) et les retire des groupes"""
+        self.save_worker.flush()
+        removed = set()
+        for note in filenames:
+            try:
+                self.store.delete(note)
+            except Exception as e:
+                continue
+            self.preview_cache.invalidate(note)
+            self.search_index.remove(note)
+            removed.add(note)
+
+        groups = []
+        for group in self.duplicate_groups:
+            group.filenames = [filename for filename in group.filenames if filename not in removed]
+            # Copies exactes rattachées à la plus récente copie restante
+            kept = {}
+            copies = {}
+            for filename in group.filenames:
+                original = group.copies.get(filename, filename)
+                if original in kept:
+                    copies[filename] = kept[original]
+                else:
+                    kept[original] = filename
+            group.copies = copies
+            group.exact = len(kept) == 1
+            if len(group.filenames) >= 2:
+                groups.append(group)
+        self.set_duplicate_groups(groups)
+
+    def delete_marked_duplicates(self, event=None):
+        """Supprime en une fois toutes les notes marquées (après confirmation)"""
+        if not self.duplicate_marked:
+            return "break"
+        marked = sorted(self.duplicate_marked)
+
+        def do_delete():
+            self.remove_duplicate_notes(marked)
+            self.show_duplicates_view()
+
+        self.show_confirmation_popup(
+            f"Supprimer {len(marked)} note(s) marquée(s) ?\nCette action est irréversible.",
+            do_delete
+        )
+        return "break"
+
+    def merge_duplicate_group(self, event=None):
+        """Fusionne le groupe de la note sélectionnée dans sa note la plus récente (après confirmation)
+
+        Les lignes des autres notes absentes de la note gardée y sont ajoutées; la note gardée
+        devient favorite si l'une des notes fusionnées l'était. Son ancien contenu reste dans l'historique.
+        """
+        if not self.duplicate_entries:
+            return "break"
+        group = self.duplicate_entries[self.duplicate_selected][0]
+        keep, others = group.filenames[0], group.filenames[1:]
+
+        def do_merge():
+            from note_dedup import merge_texts
+            try:
+                self.save_worker.flush()
+                contents = [self.store.read(filename) for filename in group.filenames]
+                merged = merge_texts(contents)
+                if merged != contents[0]:
+                    st = self.store.write(keep, merged)
+                    self.preview_cache.invalidate(keep)
+                    self.search_index.update(keep, st.st_mtime)
+                if any(filename in self.store.favorites for filename in others):
+                    self.store.set_favorite(keep, True)
+            except Exception as e:
+                return
+            self.remove_duplicate_notes(others)
+            self.show_duplicates_view()
+
+        self.show_confirmation_popup(
+            f"Fusionner {len(group.filenames)} notes dans '{keep.replace('.txt', '')}' ?\n"
+            f"Les autres notes du groupe seront supprimées.",
+            do_merge
+        )
+        return "break"
+
+    def close_duplicates(self, event=None):
+        """Quitte le mode doublons et revient au menu"""
+        if self.duplicate_job:
+            self.master.after_cancel(self.duplicate_job)
+            self.duplicate_job = None
+        for key in ("<space>", "a", "m", "<Escape>"):
+            self.master.unbind(key)
+        self.load_menu()
+        return "break"
+
+    @timed("open_note")
     def open_note(self, event):
         """Ouvre une note pour édition"""
-        if not self.notes or self.current_index < 0:
+        if not self.catalog.is_current(self.current_note):
             return
 
         self.unbind_menu_keys()
+        self.cancel_preview_job()
+        self.recovered_notes = []
         self.mode = "editor"
         self.bind_editor_keys()
 
-        # Chemin de la note
-        self.note_path = os.path.join(NOTES_DIR, self.notes[self.current_index])
+        # Note éditée (les sauvegardes la désignent par son nom de fichier)
+        self.note_filename = self.current_note.filename
 
         # Masque le panneau de gauche et le séparateur
         self.left_frame.pack_forget()
@@ -1155,7 +2146,7 @@ class TerminalNotesApp:
         self.right_frame.pack(side="left", fill="both", expand=True, padx=0)
 
         # Mise à jour de l'en-tête
-        note_name = os.path.basename(self.note_path).replace(".txt", "")
+        note_name = self.note_filename.replace(".txt", "")
         self.header.config(text=f"ÉDITION DE NOTE - {note_name}")
         self.subtitle.config(text="APPUYEZ SUR ÉCHAP POUR REVENIR AU MENU - SAUVEGARDE AUTOMATIQUE")
 
@@ -1167,14 +2158,38 @@ class TerminalNotesApp:
         self.right.configure(insertwidth=1)  # Restaurer le curseur d'insertion
         self.right.unbind("<Key>")  # Supprimer le gestionnaire qui empêche la saisie
 
-        # Chargement du contenu
+        # Chargement du contenu (après les écritures encore en attente pour cette note,
+        # dont les résultats nettoient les anciens journaux)
+        self.save_worker.flush()
+        self.process_save_results()
         self.right.delete("1.0", "end")
+        self.journal = None
+        self.note_read_only = False
+
         try:
-            with open(self.note_path, "r", encoding="utf-8") as f:
-                content = f.read()
-                self.right.insert("1.0", content)
-        except Exception as e:
-            self.right.insert("1.0", f"ERREUR: Impossible de lire la note.\n{str(e)}")
+            # Taille du texte (et non de la note compressée sur disque)
+            note_size = self.store.content_size(self.current_note.filename)
+        except OSError:
+            note_size = 0
+
+        if note_size >= LARGE_NOTE_THRESHOLD:
+            self.start_chunked_load(note_size)
+        else:
+            try:
+                content = self.store.read(self.current_note.filename)
+                # Le widget ajoute toujours un saut de ligne final: ne pas le doubler à chaque sauvegarde
+                self.right.insert("1.0", widget_text(content))
+
+                # Les modifications sont journalisées au fil de la frappe
+                self.journal = EditJournal(JOURNAL_DIR, self.note_filename, SAVE_FSYNC_POLICY)
+                self.journal.start(content_hash(content))
+                self.last_compaction = time.monotonic()
+            except Exception as e:
+                self.right.insert("1.0", f"ERREUR: Impossible de lire la note.\n{str(e)}")
+
+            # Statistiques et journal suivis modification par modification à partir d'ici
+            self.text_statistics.mark_drifted()
+            self.track_edits = True
 
         # Configuration de la sauvegarde auto
         self.right.bind("<KeyRelease>", self.defer_save)
@@ -1186,9 +2201,90 @@ class TerminalNotesApp:
         # Mettre à jour les statistiques
         self.update_status_bar()
 
+    def start_chunked_load(self, note_size):
+        """Charge une note volumineuse par morceaux, le début s'affichant immédiatement"""
+        # Pas de modification ni de sauvegarde tant que la note n'est pas entièrement chargée
+        self.note_read_only = True
+        self.load_read_only = LARGE_NOTE_MMAP_VIEW
+        self.load_size = note_size
+        self.loaded_chars = 0
+        self.load_hash = hashlib.sha1()
+        self.load_last_char = ""
+        self.load_pending_newline = False
+
+        # Statistiques calculées au fil des morceaux (le widget vide contient un saut de ligne)
+        self.text_statistics.reset("\n")
+
+        if self.load_read_only:
+            self.subtitle.config(text="LECTURE SEULE - NOTE VOLUMINEUSE - APPUYEZ SUR ÉCHAP POUR REVENIR AU MENU")
+
+        self.load_chunks = self.store.iter_chunks(
+            self.note_filename, LARGE_NOTE_CHUNK, LARGE_NOTE_FIRST_CHUNK, use_mmap=self.load_read_only
+        )
+        self.right.configure(state="disabled")
+        self.load_next_chunk()
+
+    def load_next_chunk(self):
+        """Ajoute le morceau suivant de la note puis rend la main à la boucle Tk"""
+        self.load_job = None
+        try:
+            chunk = next(self.load_chunks, None)
+        except Exception as e:
+            self.load_chunks = None
+            self.right.configure(state="normal")
+            self.right.insert("end", f"\n\nERREUR: Impossible de lire la note.\n{str(e)}")
+            self.right.configure(state="disabled")
+            self.update_status_bar()
+            return
+
+        if chunk is None:
+            self.finish_chunked_load()
+            return
+
+        self.load_hash.update(chunk.encode("utf-8"))
+        self.loaded_chars += len(chunk)
+
+        # Le saut de ligne final du fichier est retenu: le widget en ajoute déjà un
+        text = ("\n" if self.load_pending_newline else "") + chunk
+        self.load_pending_newline = text.endswith("\n")
+        if self.load_pending_newline:
+            text = text[:-1]
+
+        self.right.configure(state="normal")
+        self.right.insert("end", text)
+        self.right.configure(state="disabled")
+        self.text_statistics.inserted(text, self.load_last_char, "")
+        if text:
+            self.load_last_char = text[-1]
+
+        self.update_status_bar()
+        self.load_job = self.master.after(1, self.load_next_chunk)
+
+    def finish_chunked_load(self):
+        """Termine le chargement: active l'édition et le journal (sauf en lecture seule)"""
+        self.load_chunks = None
+        if not self.load_read_only:
+            self.right.configure(state="normal")
+            self.note_read_only = False
+            self.journal = EditJournal(JOURNAL_DIR, self.note_filename, SAVE_FSYNC_POLICY)
+            self.journal.start(self.load_hash.hexdigest())
+            self.last_compaction = time.monotonic()
+            self.track_edits = True
+        self.update_status_bar()
+
+    def cancel_chunked_load(self):
+        """Interrompt un chargement en cours (fermeture du fichier comprise)"""
+        if self.load_job:
+            self.master.after_cancel(self.load_job)
+            self.load_job = None
+        if self.load_chunks is not None:
+            self.load_chunks.close()
+            self.load_chunks = None
+
     def back_to_menu(self, event=None):
         """Retourne au menu principal"""
         self.unbind_editor_keys()
+        self.cancel_chunked_load()
 
         # Sauvegarde avant de quitter l'éditeur
         if self.save_job:
@@ -1200,6 +2296,8 @@ class TerminalNotesApp:
 
         # Désactive la liaison d'événements de sauvegarde
         self.right.unbind("<KeyRelease>")
+        self.track_edits = False
+        self.close_journal()
 
         # Reconstruction complète de la disposition
         # Détacher temporairement le panneau droit
@@ -1211,6 +2309,7 @@ class TerminalNotesApp:
 
         # Réafficher le panneau droit
         self.right_frame.pack(side="right", fill="both", expand=True, padx=(PADDING, 0))
+        self.note_read_only = False
 
         # Revient à l'interface du menu
         self.load_menu()
@@ -1222,38 +2321,220 @@ class TerminalNotesApp:
         """Diffère la sauvegarde pour ne pas sauvegarder à chaque frappe"""
         if self.save_job:
             self.right.after_cancel(self.save_job)
-        self.save_job = self.right.after(500, self.save_now)  # 500ms après la dernière frappe
+        self.save_job = self.right.after(500, self.checkpoint)  # 500ms après la dernière frappe
 
         # Mettre à jour les statistiques
         self.update_status_bar()
 
+    def checkpoint(self):
+        """Rend le journal durable et ne réécrit la note que lorsque le journal est assez gros"""
+        self.save_job = None
+        if not self.journal:
+            self.save_now()
+            return
+
+        try:
+            self.journal.sync()
+        except Exception as e:
+            # Journal inutilisable: revenir à la réécriture complète
+            self.save_now()
+            return
+
+        if (self.journal.size >= JOURNAL_COMPACT_BYTES
+                or time.monotonic() - self.last_compaction >= JOURNAL_COMPACT_SECONDS):
+            self.save_now()
+
+    @timed("save_now")
     def save_now(self):
-        """Enregistre immédiatement le contenu de la note"""
+        """Transmet le contenu de la note au thread d'écriture (compaction du journal)"""
+        self.save_job = None
+        if self.note_read_only:
+            return  # Note partiellement chargée ou ouverte en lecture seule
+        content = self.right.get("1.0", tk.END)
+
+        # Nouvelle génération de journal basée sur le contenu en cours d'écriture
+        generation = None
+        if self.journal and self.journal.records:
+            generation = self.journal.start(content_hash(content))
+            self.last_compaction = time.monotonic()
+
+        self.save_worker.submit(self.note_filename, content, generation)
+
+        # Relever les résultats tant que des écritures sont en cours
+        if not self.save_poll_job:
+            self.save_poll_job = self.master.after(SAVE_POLL_MS, self.process_save_results)
+
+    @timed("save_results")
+    def process_save_results(self):
+        """Applique les résultats des écritures terminées (index, aperçus, barre d'état)"""
+        self.save_poll_job = None
+        saved_notes = 0
+
+        while not self.save_worker.results.empty():
+            note, st, error, generation = self.save_worker.results.get()
+            if error:
+                self.perf.count("save_failed")
+                self.save_failed = True
+                self.save_status = f"ERREUR DE SAUVEGARDE ({note.replace('.txt', '')}): {error}"
+                continue
+
+            # Les générations de journal antérieures à cette compaction ne servent plus
+            if generation is not None:
+                remove_journals(JOURNAL_DIR, note, before=generation)
+
+            self.save_failed = False
+            self.save_status = f"Sauvegardé à {time.strftime('%H:%M:%S')}"
+            self.store.note_written(note, st)
+            self.preview_cache.invalidate(note)
+            self.search_index.update(note, st.st_mtime)
+            saved_notes += 1
+
+        if self.save_worker.is_busy() or not self.save_worker.results.empty():
+            self.save_poll_job = self.master.after(SAVE_POLL_MS, self.process_save_results)
+
+        # Le menu affiché peut dépendre des dates de modification qui viennent de changer
+        if self.mode == "menu" and saved_notes:
+            self.refresh_menu()
+        elif self.mode != "search":
+            self.update_status_bar()
+
+    @timed("watch_events")
+    def apply_watch_events(self):
+        """Applique par lots les changements du dossier des notes à la liste et aux index"""
+        self.watch_job = self.master.after(WATCH_BATCH_MS, self.apply_watch_events)
+        changed = self.note_watcher.drain()
+        if not changed:
+            return
+        # Note déposée à la racine d'un dossier en sous-dossiers: rangée puis prise en compte
+        changed.update(self.store.adopt_stray_notes())
+
+        stats = None
+        if RESCAN in changed:
+            # File d'événements débordée (ou base modifiée): réexamen complet en un seul passage
+            stats = self.store.scan()
+            changed = set(self.note_index.filenames())
+            changed.update(stats)
+
+        notes_changed = False
+        for note in changed:
+            if stats is not None:
+                st = stats.get(note)
+            else:
+                try:
+                    st = self.store.stat(note)
+                except OSError:
+                    st = None
+
+            record = self.catalog.get(note)
+            if st is None:
+                # Note supprimée ou renommée par un autre programme
+                if record is not None:
+                    self.note_index.remove(note)
+                    self.preview_cache.invalidate(note)
+                    self.search_index.remove(note)
+                    notes_changed = True
+            elif record is None or record.mtime != st.st_mtime or record.size != st.st_size:
+                # Note ajoutée ou modifiée (nos propres sauvegardes sont déjà à jour dans l'index)
+                self.store.note_written(note, st)
+                self.preview_cache.invalidate(note)
+                self.search_index.update(note, st.st_mtime)
+                notes_changed = True
+
+        # Favori renommé (retrouvé par son inode) ou supprimé par un autre programme
+        if notes_changed:
+            self.store.relink_favorites()
+
+        # La sélection reste sur la même note (ou sa voisine) au prochain affichage du menu
+        if notes_changed and self.mode == "menu":
+            self.refresh_menu()
+
+    def toggle_perf_overlay(self, event=None):
+        """Affiche ou masque les mesures de performance par-dessus l'interface"""
+        if self.perf_overlay is not None:
+            self.master.after_cancel(self.perf_job)
+            self.perf_overlay.destroy()
+            self.perf_overlay = None
+            self.perf_job = None
+            return
+
+        self.perf_overlay = tk.Label(
+            self.master,
+            bg=TERMINAL_BG,
+            fg=TERMINAL_SELECTED,
+            font=(FONT_FAMILY, 10),
+            justify="left",
+            borderwidth=2,
+            relief="groove",
+            padx=PADDING//2,
+            pady=PADDING//2
+        )
+        self.perf_overlay.place(relx=1.0, x=-PADDING, y=PADDING, anchor="ne")
+        self.poll_perf_overlay()
+
+    def poll_perf_overlay(self):
+        self.render_perf_overlay()
+        self.perf_job = self.master.after(PERF_OVERLAY_MS, self.poll_perf_overlay)
+
+    def render_perf_overlay(self):
+        """p50/p95/max (ms) des dernières mesures de chaque opération"""
+        lines = [f"{'OPÉRATION':<16}{'N':>5}{'P50':>9}{'P95':>9}{'MAX':>9}"]
+        for name, stats in self.perf.summary().items():
+            lines.append(
+                f"{name:<16}{stats['count']:>5}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['max_ms']:>9.2f}"
+            )
+        lines.append(f"Sauvegardes échouées: {self.perf.counters.get('save_failed', 0)}")
+        if self.perf_status:
+            lines.append(self.perf_status)
+        self.perf_overlay.config(text="\n".join(lines))
+
+    def export_perf(self, event=None):
+        """Enregistre les mesures dans PERF_EXPORT_FILE pour une analyse hors de l'application"""
         try:
-            with open(self.note_path, "w", encoding="utf-8") as f:
-                f.write(self.right.get("1.0", tk.END))
+            self.perf.export(PERF_EXPORT_FILE)
+            self.perf_status = f"Exporté: {PERF_EXPORT_FILE}"
         except Exception as e:
-            pass
-        finally:
-            self.save_job = None
+            self.perf_status = f"ERREUR D'EXPORT: {str(e)}"
+
+        if self.perf_overlay is None:
+            self.toggle_perf_overlay()
+        else:
+            self.render_perf_overlay()
+
+    def close_journal(self):
+        """Ferme le journal de la note éditée (les générations non confirmées restent sur disque)"""
+        if self.journal:
+            self.journal.close()
+            self.journal = None
 
     def quit_app(self, event=None):
         """Quitte l'application proprement"""
-        # Sauvegarde si en mode édition
-        if self.mode == "editor" and self.save_job:
-            self.right.after_cancel(self.save_job)
+        # Sauvegarde si en mode édition (le journal peut contenir des modifications non compactées)
+        if self.mode == "editor":
+            self.cancel_chunked_load()
+            if self.save_job:
+                self.right.after_cancel(self.save_job)
             self.save_now()
+            self.close_journal()
+
+        # Attendre la fin des écritures en cours avant de fermer, puis nettoyer les journaux
+        self.save_worker.flush()
+        self.process_save_results()
+
+        self.note_watcher.stop()
 
-        # Sauvegarder les favoris
-        self.save_favorites()
+        # Attendre l'enregistrement des favoris et sauvegarder l'index des métadonnées
+        self.store.close()
+        self.note_index.save()
 
         self.master.destroy()
 
 
 # Lancement de l'application
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()  # Pool de processus des doublons dans l'application packagée
     root = tk.Tk()
     root.configure(bg=TERMINAL_BG)  # Assure que le fond est correct même pendant le chargement
-    app = TerminalNotesApp(root)
+    app = TerminalNotesApp(root, startup_timing="--startup-timing" in sys.argv[1:])
     root.protocol("WM_DELETE_WINDOW", app.quit_app)  # Gestion propre de la fermeture
     root.mainloop()
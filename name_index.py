@@ -0,0 +1,289 @@
+import re
+import operator
+from bisect import bisect_right
+from itertools import accumulate, repeat
+
+# Correspondances par sous-séquence (lettres dans l'ordre, non contiguës) classées par
+# compacité; au-delà de ce nombre, les suivantes (notes plus anciennes) sont ignorées
+SUBSEQUENCE_CANDIDATES = 500
+
+# Caractères après lesquels commence un mot dans un nom de note: remplacés par des sauts
+# de ligne dans une copie de la liste, un début de mot s'y cherche comme un début de nom
+WORD_SEPARATORS = " _-.,;:'()[]"
+WORD_BREAKS = str.maketrans({separator: "\n" for separator in WORD_SEPARATORS})
+
+# Caractères dont les masques de présence sont calculés à la construction de l'index:
+# ASCII imprimable et Latin-1 (lettres accentuées); les autres le sont à leur première frappe
+PRESENCE_CHARS = "".join(map(chr, [*range(32, 127), *range(160, 256)]))
+# Dernière étape du calcul des masques: un octet par nom, 1 (nom marqué) ou 0
+PRESENCE_FLAGS = bytes.maketrans(b"\n\x01", b"\x00\x01")
+
+
+def presence_masks(text):
+    """Masques de présence des caractères de PRESENCE_CHARS dans les noms de text ("\n"
+    devant chaque nom)
+
+    Retourne un dict: caractère -> bytearray (un octet par nom, 1 si le nom le contient), et
+    caractère doublé -> bytearray (1 si le nom le contient au moins deux fois), pour les
+    caractères présents dans au moins un nom. Tout passe par bytes.translate et bytes.replace
+    (en C): l'alphabet est coupé en deux à chaque niveau et chaque moitié ne garde que ses
+    caractères et les sauts de ligne, si bien que le texte n'est parcouru qu'une fois par
+    niveau. Quand il ne reste qu'un caractère c, les noms qui le contiennent commencent
+    par "\n" + c.
+    """
+    # Un octet par caractère; les caractères hors Latin-1 n'ont pas de masque précalculé
+    data = text.encode("latin-1", "ignore")
+    # Une partie qui n'a plus que les sauts de ligne (un par nom) n'a aucun de ses caractères
+    name_count = data.count(b"\n")
+    masks = {}
+    pending = [(data, PRESENCE_CHARS.encode("latin-1"))]
+    while pending:
+        data, codes = pending.pop()
+        if len(data) == name_count:
+            continue
+        if len(codes) == 1:
+            key = codes.decode("latin-1")
+            masks[key] = bytearray(data.replace(b"\n" + codes, b"\x01").translate(PRESENCE_FLAGS, codes))
+            masks[key * 2] = bytearray(data.replace(b"\n" + codes * 2, b"\x01").translate(PRESENCE_FLAGS, codes))
+        else:
+            half = len(codes) // 2
+            for part in (codes[:half], codes[half:]):
+                kept = part + b"\n"
+                removed = bytes(code for code in range(256) if code not in kept)
+                pending.append((data.translate(None, removed), part))
+    return masks
+
+
+def common_prefix(first, second):
+    """Nombre d'éléments identiques au début de deux listes (tranches comparées en C)"""
+    low, high = 0, min(len(first), len(second))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if first[low:middle] == second[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class NameIndex:
+    """Noms des notes dans l'ordre du menu, réunis en une seule chaîne en minuscules
+
+    Les recherches parcourent cette chaîne avec str.find (en C) et s'arrêtent dès que les
+    meilleurs résultats sont trouvés: une frappe ne coûte pas une boucle Python sur tous
+    les noms. Classement: début d'un mot (ou du nom), n'importe où dans le nom, puis
+    lettres dans l'ordre (recherche approchée); à rang égal, l'ordre du menu. Un masque par
+    caractère (les noms qui le contiennent, ou qui le contiennent deux fois) écarte d'emblée
+    les requêtes sans résultat et limite la recherche approchée aux noms qui contiennent
+    toutes les lettres.
+
+    Les masques sont calculés dans build(), à l'ouverture de la fenêtre d'ouverture rapide,
+    et non à la première frappe; quand la liste n'a changé que d'une note (une sauvegarde la
+    remonte en tête, une création, une suppression, un renommage), ils sont mis à jour en
+    place au lieu d'être recalculés.
+    """
+
+    def __init__(self):
+        self.records = []  # NoteRecord dans l'ordre du menu
+        self.filenames = []  # Noms de fichiers indexés (pour repérer les changements de la liste)
+        self.names = []
+        self.text = ""  # "\n" devant chaque nom
+        self.words_text = ""  # text, séparateurs de mots remplacés par des sauts de ligne
+        self.starts = []  # Position de chaque nom dans text
+        self.version = None  # Version de la liste indexée (retournée par catalog.arrange() dans main.py)
+        self.presence = {}  # Caractère (ou caractère doublé) -> bytearray, un octet par nom
+
+    def build(self, records, version=None):
+        records = list(records)
+        filenames = [record.filename for record in records]
+        if not self.update(records, filenames):
+            # Tout recalculer; noms et minuscules sur la chaîne entière (en C), pas nom par nom
+            text = ("\n" + "\n".join(filenames)).replace(".txt", "").lower()
+            self.names = text[1:].split("\n") if records else []
+            self.starts = self.name_starts(0, len(self.names), 1)[:-1]
+            self.set_text()
+            self.presence = presence_masks(self.text)
+        self.records = records
+        self.filenames = filenames
+        self.version = version
+
+    def update(self, records, filenames):
+        """Applique aux noms et aux masques un changement d'une seule note; retourne False si
+        la liste diffère autrement de celle déjà indexée (tout est alors recalculé)
+
+        La note retirée à un rang et insérée à un autre garde ses octets dans les masques si
+        son nom n'a pas changé; sinon (renommage, création), ils sont calculés pour ce nom.
+        """
+        old = self.filenames
+        if not old or abs(len(filenames) - len(old)) > 1:
+            return False
+        first = common_prefix(old, filenames)
+        if len(filenames) > len(old):
+            if filenames[first + 1:] != old[first:]:
+                return False
+            removed, inserted = None, first
+        elif len(filenames) < len(old):
+            if filenames[first:] != old[first + 1:]:
+                return False
+            removed, inserted = first, None
+        elif first == len(old):
+            return True
+        else:
+            last = len(old) - 1 - common_prefix(old[::-1], filenames[::-1])
+            if filenames[first + 1:last + 1] == old[first:last]:
+                # Note remontée (sauvegarde): du rang last au rang first
+                removed, inserted = last, first
+            elif filenames[first:last] == old[first + 1:last + 1]:
+                removed, inserted = first, last
+            else:
+                return False
+
+        kept = removed is not None and inserted is not None and filenames[inserted] == old[removed]
+        if removed is not None:
+            name = self.names.pop(removed)
+        if inserted is not None:
+            if not kept:
+                name = records[inserted].name.lower()
+            self.names.insert(inserted, name)
+        for key, flags in self.presence.items():
+            if removed is not None:
+                flag = flags.pop(removed)
+            if inserted is not None:
+                if not kept:
+                    flag = key in name if len(key) == 1 else name.count(key[0]) >= 2
+                flags.insert(inserted, flag)
+        if inserted is not None and not kept:
+            # Caractère qu'aucun autre nom ne contenait: masques à créer
+            for char in set(name):
+                if char in PRESENCE_CHARS and char not in self.presence:
+                    self.presence[char] = self.presence_flags(char)
+                    self.presence[char * 2] = self.presence_flags(char * 2)
+
+        # Positions: recalculées entre les deux rangs, décalées après
+        if inserted is None:
+            low = high = removed
+        elif removed is None:
+            low, high = inserted, inserted + 1
+        else:
+            low, high = min(removed, inserted), max(removed, inserted) + 1
+        start = self.starts[low] if low < len(self.starts) else len(self.text) + 1
+        region = self.name_starts(low, high, start)
+        following = self.starts[high + len(old) - len(filenames):]
+        shift = region.pop() - following[0] if following else 0
+        if shift:
+            following = list(map(operator.add, following, repeat(shift)))
+        self.starts[low:] = region + following
+        self.set_text()
+        return True
+
+    def name_starts(self, first, last, start):
+        """Positions dans text des noms de rang first à last (exclu), le premier commençant à
+        start, suivies de celle du nom de rang last
+        """
+        return list(accumulate(map(operator.add, map(len, self.names[first:last]), repeat(1)), initial=start))
+
+    def set_text(self):
+        """Recalcule text et words_text d'après self.names (en C)"""
+        self.text = "\n" + "\n".join(self.names)
+        self.words_text = self.text.translate(WORD_BREAKS)
+
+    def position(self, offset):
+        """Rang du nom contenant cette position de text"""
+        return bisect_right(self.starts, offset) - 1
+
+    def search(self, query, limit=10):
+        """Retourne au plus limit enregistrements correspondant à query, les meilleurs d'abord"""
+        query = query.strip().lower()
+        if not query:
+            return self.records[:limit]
+
+        # Aucun nom ne contient toutes les lettres de la requête: inutile de parcourir la liste
+        mask = -1
+        for char in set(query):
+            if not char.isspace():
+                mask &= self.char_presence(char)
+                if query.count(char) > 1:
+                    mask &= self.char_presence(char * 2)
+        if not mask:
+            return []
+
+        found = []
+        seen = set()
+
+        # Début d'un mot ou du nom; une correspondance qui déborde sur le nom suivant est écartée
+        words_query = "\n" + query.translate(WORD_BREAKS)
+        offset = self.words_text.find(words_query)
+        while offset >= 0:
+            i = self.position(offset + 1)
+            if i not in seen and offset + len(words_query) <= self.starts[i] + len(self.names[i]):
+                seen.add(i)
+                found.append(i)
+                if len(found) >= limit:
+                    return [self.records[i] for i in found]
+            offset = self.words_text.find(words_query, offset + 1)
+
+        # N'importe où dans le nom
+        offset = self.text.find(query)
+        while offset >= 0:
+            i = self.position(offset)
+            end = self.starts[i] + len(self.names[i])
+            if i not in seen and offset + len(query) <= end:
+                seen.add(i)
+                found.append(i)
+                if len(found) >= limit:
+                    return [self.records[i] for i in found]
+            # Nom suivant (une correspondance plus loin dans ce nom ne changerait rien)
+            offset = self.text.find(query, end)
+
+        for i in self.subsequence(query, mask):
+            if i not in seen:
+                found.append(i)
+                if len(found) >= limit:
+                    break
+        return [self.records[i] for i in found]
+
+    def subsequence(self, query, mask):
+        """Rangs des noms contenant les lettres de query dans l'ordre, les plus compacts d'abord
+
+        Seuls les noms du masque (ceux qui contiennent toutes les lettres de la requête,
+        intersection des masques de présence) sont examinés, dans l'ordre du menu.
+        """
+        chars = [char for char in query if not char.isspace()]
+        pattern = re.compile("".join(
+            f"[^{re.escape(char)}]*({re.escape(char)})" if k == 0 else f"[^{re.escape(char)}]*{re.escape(char)}"
+            for k, char in enumerate(chars)
+        ))
+
+        candidates = mask.to_bytes(len(self.names), "little")
+
+        matches = []
+        i = candidates.find(1)
+        while i >= 0:
+            match = pattern.match(self.names[i])
+            if match:
+                matches.append((match.end() - match.start(1), i))
+                if len(matches) >= SUBSEQUENCE_CANDIDATES:
+                    break
+            i = candidates.find(1, i + 1)
+        matches.sort()
+        return [i for _, i in matches]
+
+    def char_presence(self, key):
+        """Masque des noms contenant key (un caractère, ou un caractère doublé: au moins deux fois),
+        converti en entier pour l'intersection
+
+        Un caractère de PRESENCE_CHARS sans masque n'est dans aucun nom; celui d'un autre
+        caractère est calculé à sa première frappe.
+        """
+        flags = self.presence.get(key)
+        if flags is None:
+            if key[0] in PRESENCE_CHARS:
+                return 0
+            flags = self.presence[key] = self.presence_flags(key)
+        return int.from_bytes(flags, "little")
+
+    def presence_flags(self, key):
+        """Octets du masque de key calculés nom par nom (map en C)"""
+        if len(key) == 1:
+            return bytearray(map(operator.contains, self.names, repeat(key)))
+        return bytearray(map(operator.le, repeat(2), map(str.count, self.names, repeat(key[0]))))
@@ -0,0 +1,181 @@
+import io
+import os
+import json
+import gzip
+import time
+import tarfile
+
+from note_store import NoteStoreError
+
+ARCHIVE_TAR = "tar"
+ARCHIVE_JSONL = "jsonl"
+
+# En-tête pax portant le statut de favori d'une note dans une archive tar
+FAVORITE_PAX_HEADER = "TERMINALNOTES.favorite"
+
+
+def archive_format(path):
+    """Format déduit du nom de l'archive (tar par défaut, y compris pour un flux)"""
+    name = path.lower()
+    if name.endswith(".jsonl") or name.endswith(".jsonl.gz"):
+        return ARCHIVE_JSONL
+    return ARCHIVE_TAR
+
+
+def is_compressed(path):
+    return path.lower().endswith((".gz", ".tgz"))
+
+
+def export_notes(store, fileobj, archive=ARCHIVE_TAR, compress=False, progress=None):
+    """Écrit toutes les notes (nom, mtime, favori, contenu) dans un flux binaire
+
+    Les notes sont copiées une à une, par blocs pour le format tar: la mémoire utilisée
+    ne dépend pas du nombre de notes. progress(fait, total) est appelé après chaque note.
+    Retourne le nombre de notes exportées.
+    """
+    store.load_index()
+    store.load_favorites()
+    records = list(store.catalog)
+    total = len(records)
+    exported = 0
+
+    if archive == ARCHIVE_JSONL:
+        stream = gzip.GzipFile(fileobj=fileobj, mode="wb") if compress else fileobj
+        writer = io.TextIOWrapper(stream, encoding="utf-8", newline="\n")
+        for record in records:
+            try:
+                content = store.read(record.filename)
+            except FileNotFoundError:
+                continue  # Supprimée depuis le parcours du dossier
+            writer.write(json.dumps({
+                "name": record.name,
+                "mtime": record.mtime,
+                "favorite": record.filename in store.favorites,
+                "content": content,
+            }, ensure_ascii=False) + "\n")
+            exported += 1
+            if progress:
+                progress(exported, total)
+        writer.flush()
+        writer.detach()
+        if compress:
+            stream.close()
+        return exported
+
+    with tarfile.open(fileobj=fileobj, mode="w|gz" if compress else "w|", format=tarfile.PAX_FORMAT) as tar:
+        for record in records:
+            try:
+                source = store.open_binary(record.filename)
+            except FileNotFoundError:
+                continue
+            with source:
+                # Taille du texte (la note fût-elle compressée) et date de la note ouverte
+                size, mtime = store.source_stat(source)
+                info = tarfile.TarInfo(record.filename)
+                info.size = size
+                info.mtime = mtime  # Flottant: conservé exactement par les en-têtes pax
+                info.mode = 0o644
+                if record.filename in store.favorites:
+                    info.pax_headers = {FAVORITE_PAX_HEADER: "1"}
+                tar.addfile(info, source)
+            # Le flux tar garde sinon la liste de tous ses membres en mémoire
+            tar.members = []
+            exported += 1
+            if progress:
+                progress(exported, total)
+    return exported
+
+
+def import_notes(store, fileobj, archive=ARCHIVE_TAR, overwrite=False, progress=None):
+    """Lit les notes d'un flux produit par export_notes, en conservant leurs dates
+
+    Une note déjà présente n'est remplacée qu'avec overwrite. progress(fait, None) est
+    appelé après chaque note. Retourne (notes importées, notes ignorées).
+    """
+    store.load_favorites()
+    imported = skipped = 0
+
+    def accept(name):
+        """Nom de fichier d'une note à importer, ou None (nom inutilisable ou note existante)"""
+        name = os.path.basename(name.replace("\\", "/"))
+        if not name.endswith(".txt") or name.startswith("."):
+            return None
+        try:
+            filename = store.validate_name(name[:-4])
+        except NoteStoreError:
+            return None
+        if store.exists(filename) and not overwrite:
+            return None
+        return filename
+
+    if archive == ARCHIVE_JSONL:
+        stream = gzip.GzipFile(fileobj=fileobj, mode="rb") if is_gzip(fileobj) else fileobj
+        for line in io.TextIOWrapper(stream, encoding="utf-8"):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            filename = accept(entry["name"] + ".txt")
+            if filename is None:
+                skipped += 1
+                continue
+            store.write(filename, entry["content"], entry.get("mtime"))
+            if entry.get("favorite"):
+                store.favorites.add(filename)
+            imported += 1
+            if progress:
+                progress(imported, None)
+    else:
+        with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+            while True:
+                member = tar.next()
+                if member is None:
+                    break
+                filename = accept(member.name) if member.isfile() else None
+                if filename is None:
+                    skipped += 1
+                else:
+                    store.write_from(filename, tar.extractfile(member), member.mtime)
+                    if member.pax_headers.get(FAVORITE_PAX_HEADER) == "1":
+                        store.favorites.add(filename)
+                    imported += 1
+                    if progress:
+                        progress(imported, None)
+                tar.members = []
+
+    store.save_favorites()
+    # Index à jour pour le prochain lancement de l'interface
+    store.load_index()
+    return imported, skipped
+
+
+def is_gzip(fileobj):
+    """Vrai si le flux commence par la signature gzip (sans consommer de données)"""
+    peek = getattr(fileobj, "peek", None)
+    return peek is not None and peek(2)[:2] == b"\x1f\x8b"
+
+
+class ProgressReporter:
+    """Affiche l'avancement sur la sortie d'erreur, au plus quelques fois par seconde"""
+
+    def __init__(self, label, stream, interval=0.2):
+        self.label = label
+        self.stream = stream
+        self.interval = interval
+        self.last = 0.0
+        self.done = 0
+        self.total = None
+
+    def __call__(self, done, total):
+        self.done, self.total = done, total
+        now = time.monotonic()
+        if now - self.last >= self.interval:
+            self.last = now
+            self.show("\r")
+
+    def show(self, end):
+        count = f"{self.done}/{self.total}" if self.total is not None else str(self.done)
+        self.stream.write(f"{self.label}: {count} notes{end}")
+        self.stream.flush()
+
+    def finish(self):
+        self.show("\n")
@@ -0,0 +1,335 @@
+import sys
+import bisect
+import datetime
+
+
+def date_label(mtime):
+    """Date affichée d'une note; la chaîne est partagée entre toutes les notes du même jour"""
+    return sys.intern(datetime.datetime.fromtimestamp(mtime).strftime("%d/%m/%Y"))
+
+
+class NoteRecord:
+    """Métadonnées d'une note (enregistrement compact, sans dictionnaire par instance)
+
+    visual et row sont la position de la note dans l'ordre du menu et dans les lignes du menu
+    (NoteCatalog.rows), -1 tant que la note n'y figure pas.
+    """
+
+    __slots__ = ("filename", "mtime", "size", "date", "visual", "row")
+
+    def __init__(self, filename, mtime, size, date=None):
+        self.filename = filename
+        self.visual = -1
+        self.row = -1
+        self.set_stat(mtime, size, date)
+
+    def set_stat(self, mtime, size, date=None):
+        # La date déjà calculée (index enregistré) évite un strftime par note au chargement
+        self.mtime = mtime
+        self.size = size
+        self.date = sys.intern(date) if date else date_label(mtime)
+
+    @property
+    def name(self):
+        return self.filename.replace(".txt", "")
+
+
+class MenuSection:
+    """Section du menu: les favoris (date None) ou les notes d'un jour
+
+    L'objet est aussi la ligne d'en-tête de la section dans NoteCatalog.rows (row: sa position).
+    records: notes affichées dans la section, dans l'ordre du menu (un favori n'est pas répété
+    sous son jour); size: notes du jour, favoris compris (l'en-tête reste tant qu'il en reste).
+    """
+
+    __slots__ = ("date", "records", "size", "row")
+
+    def __init__(self, date):
+        self.date = date
+        self.records = []
+        self.size = 0
+        self.row = -1
+
+
+def splice(items, changes, attribute):
+    """Applique à une liste des remplacements (position, nombre d'éléments retirés, éléments
+    insérés), positions d'avant tout changement, puis renumérote les éléments décalés
+
+    Les éléments qui portent leur position (attribute) et qui ne sont ni avant le premier
+    changement, ni après le dernier quand la longueur ne change pas, sont les seuls renumérotés.
+    """
+    # De la fin vers le début: les positions restantes restent valides. À position égale,
+    # le retrait d'abord (l'insertion se place devant l'élément qui suivait les retirés)
+    changes.sort(key=lambda change: (-change[0], bool(change[2])))
+    for position, count, inserted in changes:
+        items[position:position + count] = inserted
+
+    start = min(position for position, _, _ in changes)
+    if sum(len(inserted) - count for _, count, inserted in changes):
+        end = len(items)
+    else:
+        end = max(position + count + len(inserted) for position, count, inserted in changes)
+    for position in range(start, min(end, len(items))):
+        item = items[position]
+        if not isinstance(item, str):
+            setattr(item, attribute, position)
+
+
+class NoteCatalog:
+    """Notes dans l'ordre du menu, avec accès direct par nom et par position visuelle
+
+    Les enregistrements sont ceux de l'index des métadonnées (par nom de fichier);
+    arrange() calcule l'ordre visuel, les lignes du menu (en-têtes des favoris et des jours,
+    notes, lignes vides) et la position de chaque note dans les deux.
+
+    L'ordre par date est une liste triée tenue à jour par bisect à partir des changements
+    relevés par l'index, et les sections par jour sont gardées d'un appel à l'autre: une
+    sauvegarde déplace une seule note au lieu de tout retrier et de tout regrouper.
+    """
+
+    def __init__(self, note_index):
+        self.note_index = note_index
+        self.visual = []  # NoteRecord dans l'ordre visuel du menu
+        self.order = []  # NoteRecord triés par date de modification (plus récentes d'abord)
+        self.keys = []  # Clés de tri (-mtime, nom de fichier) de self.order, pour bisect
+        self.sort_keys = {}  # nom de fichier -> clé de tri utilisée dans self.keys
+        self.version = 0  # Incrémenté à chaque changement de l'ordre ou de la disposition
+        self.favorites = None  # Favoris de la disposition (copie), None avant le premier arrange()
+        self.favorite_section = None  # MenuSection des favoris, None sans favoris
+        self.sections = []  # MenuSection des jours, dans l'ordre du menu
+        self.days = {}  # date -> MenuSection
+        self.placements = {}  # nom de fichier -> MenuSection du jour de la note
+        self.rows = []  # Lignes du menu: MenuSection (en-tête), NoteRecord, "" (ligne vide)
+
+    def __len__(self):
+        return len(self.note_index.entries)
+
+    def __contains__(self, filename):
+        return filename in self.note_index.entries
+
+    def __iter__(self):
+        return iter(self.note_index.entries.values())
+
+    def get(self, filename):
+        """Retourne l'enregistrement d'une note, ou None si elle n'existe pas"""
+        return self.note_index.entries.get(filename)
+
+    def is_current(self, record):
+        """Vrai si l'enregistrement correspond toujours à une note du catalogue"""
+        return record is not None and self.note_index.entries.get(record.filename) is record
+
+    def update_order(self):
+        """Applique à l'ordre trié les changements de l'index; retourne True si l'ordre a changé"""
+        index = self.note_index
+        if index.reordered:
+            # Liste remplacée: tri complet
+            self.order = sorted(index.entries.values(), key=lambda record: (-record.mtime, record.filename))
+            self.keys = [(-record.mtime, record.filename) for record in self.order]
+            self.sort_keys = {record.filename: key for record, key in zip(self.order, self.keys)}
+            index.reordered = False
+            index.changes.clear()
+            self.version += 1
+            return True
+        if not index.changes:
+            return False
+
+        for filename in index.changes:
+            # Retirer l'ancienne position (note modifiée, renommée ou supprimée)...
+            key = self.sort_keys.pop(filename, None)
+            if key is not None:
+                position = bisect.bisect_left(self.keys, key)
+                del self.keys[position]
+                del self.order[position]
+            # ...et insérer la nouvelle
+            record = index.entries.get(filename)
+            if record is not None:
+                key = (-record.mtime, filename)
+                position = bisect.bisect_left(self.keys, key)
+                self.keys.insert(position, key)
+                self.order.insert(position, record)
+                self.sort_keys[filename] = key
+        index.changes.clear()
+        self.version += 1
+        return True
+
+    @property
+    def favorite_records(self):
+        """Notes favorites dans l'ordre du menu"""
+        return self.favorite_section.records if self.favorite_section else []
+
+    def arrange(self, favorites):
+        """Met à jour l'ordre visuel et les lignes du menu: favoris, puis notes regroupées par
+        jour (plus récentes d'abord); retourne la version de la disposition
+
+        Après une sauvegarde, un renommage, une création ou une suppression isolés, seule la
+        note concernée change de place (move). La disposition est recalculée entièrement
+        après un chargement ou un parcours du dossier, un changement des favoris ou plusieurs
+        changements à la fois.
+        """
+        index = self.note_index
+        if self.favorites == favorites and not index.reordered:
+            if not index.changes:
+                return self.version
+            if self.move():
+                return self.version
+        self.update_order()
+        self.layout(favorites)
+        self.version += 1
+        return self.version
+
+    def layout(self, favorites):
+        """Recalcule toute la disposition en un passage sur l'ordre trié
+
+        Les notes d'un même jour y sont contiguës. Un jour dont toutes les notes sont
+        favorites garde son en-tête.
+        """
+        self.favorites = set(favorites)
+        self.favorite_section = MenuSection(None) if favorites else None
+        self.sections = []
+        self.days = {}
+        self.placements = {}
+        section = None
+        for record in self.order:
+            if section is None or record.date != section.date:
+                section = MenuSection(record.date)
+                self.sections.append(section)
+                self.days[record.date] = section
+            section.size += 1
+            self.placements[record.filename] = section
+            if record.filename in favorites:
+                self.favorite_section.records.append(record)
+            else:
+                section.records.append(record)
+
+        visual = []
+        rows = []
+        for section in ([self.favorite_section] if self.favorite_section else []) + self.sections:
+            visual.extend(section.records)
+            rows.append(section)
+            rows.extend(section.records)
+            rows.append("")
+        for position, record in enumerate(visual):
+            record.visual = position
+        for position, row in enumerate(rows):
+            if not isinstance(row, str):
+                row.row = position
+        self.visual = visual
+        self.rows = rows
+
+    def move(self):
+        """Déplace dans l'ordre et la disposition la seule note changée
+
+        Les positions des notes (et des en-têtes) situées entre l'ancienne et la nouvelle place
+        sont les seules renumérotées: la note modifiée déjà en tête ne décale rien. Retourne
+        False, sans rien changer, si les changements concernent plus d'une note.
+        """
+        index = self.note_index
+        removed = [filename for filename in index.changes if filename in self.sort_keys]
+        added = [filename for filename in index.changes if filename in index.entries]
+        if len(removed) > 1 or len(added) > 1:
+            return False
+
+        # Changements des listes exprimés en positions d'avant le déplacement (voir splice);
+        # les listes des sections, petites, sont modifiées directement
+        favorite_count = len(self.favorite_records)
+        visual_changes = []
+        row_changes = []
+        for filename in removed:
+            key = self.sort_keys.pop(filename)
+            position = bisect.bisect_left(self.keys, key)
+            record = self.order[position]
+            del self.keys[position]
+            del self.order[position]
+
+            section = self.placements.pop(filename)
+            section.size -= 1
+            visual_changes.append((record.visual, 1, []))
+            if filename in self.favorites:
+                self.favorite_section.records.remove(record)
+                row_changes.append((record.row, 1, []))
+                if not section.size:
+                    row_changes.append((section.row, 2, []))  # En-tête et ligne vide
+            else:
+                section.records.remove(record)
+                if section.size:
+                    row_changes.append((record.row, 1, []))
+                else:
+                    row_changes.append((section.row, 3, []))
+            if not section.size:
+                self.sections.remove(section)
+                del self.days[section.date]
+
+        for filename in added:
+            record = index.entries[filename]
+            key = (-record.mtime, filename)
+            position = bisect.bisect_left(self.keys, key)
+            self.keys.insert(position, key)
+            self.order.insert(position, record)
+            self.sort_keys[filename] = key
+
+            favorite = filename in self.favorites
+            section = self.days.get(record.date)
+            if section is None:
+                # Nouveau jour: sa section se place devant celle de la note suivante
+                section = MenuSection(record.date)
+                self.days[record.date] = section
+                if position + 1 < len(self.order):
+                    following = self.placements[self.order[position + 1].filename]
+                    section_row = following.row
+                    self.sections.insert(self.sections.index(following), section)
+                else:
+                    section_row = len(self.rows)
+                    self.sections.append(section)
+                row_changes.append((section_row, 0, [section, ""] if favorite else [section, record, ""]))
+            else:
+                section_row = None
+            section.size += 1
+            self.placements[filename] = section
+
+            place = 0
+            if favorite:
+                records = self.favorite_section.records
+                while place < len(records) and (-records[place].mtime, records[place].filename) < key:
+                    place += 1
+            else:
+                # Après la note non favorite qui la précède dans l'ordre, si elle est du même jour
+                records = section.records
+                previous = position - 1
+                while previous >= 0 and self.placements[self.order[previous].filename] is section:
+                    if self.order[previous].filename not in self.favorites:
+                        place = records.index(self.order[previous]) + 1
+                        break
+                    previous -= 1
+            records.insert(place, record)
+
+            if place > 0:
+                visual_position = records[place - 1].visual + 1
+            elif len(records) > 1:
+                visual_position = records[1].visual
+            elif favorite:
+                visual_position = 0
+            else:
+                visual_position = self.section_start(section, favorite_count)
+            visual_changes.append((visual_position, 0, [record]))
+
+            if favorite:
+                row_changes.append((visual_position + 1, 0, [record]))  # Après l'en-tête des favoris
+            elif section_row is None:
+                row = records[place - 1].row + 1 if place > 0 else section.row + 1
+                row_changes.append((row, 0, [record]))
+
+        if visual_changes:
+            splice(self.visual, visual_changes, "visual")
+        if row_changes:
+            splice(self.rows, row_changes, "row")
+        index.changes.clear()
+        self.version += 1
+        return True
+
+    def section_start(self, section, favorite_count):
+        """Position visuelle (d'avant le déplacement) de la première note d'une section vide:
+        après la dernière note des jours précédents, ou après les favoris"""
+        for previous in reversed(self.sections[:self.sections.index(section)]):
+            if previous.records:
+                return previous.records[-1].visual + 1
+        return favorite_count
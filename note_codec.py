@@ -0,0 +1,136 @@
+import io
+import os
+import zlib
+import lzma
+import struct
+
+# Format des notes compressées: en-tête (signature, version, algorithme, taille du texte),
+# puis des blocs compressés indépendamment, chacun précédé de sa longueur. Les notes en
+# clair ne commencent jamais par un octet nul: les deux formats coexistent dans le dossier.
+MAGIC = b"\x00TNZ"
+VERSION = 1
+HEADER = struct.Struct("<4sBBQ")
+BLOCK_LENGTH = struct.Struct("<I")
+# Texte (en octets UTF-8) par bloc: un aperçu ne décompresse que le premier
+BLOCK_SIZE = 64 * 1024
+
+COMPRESSION_ZLIB = "zlib"
+COMPRESSION_LZMA = "lzma"
+CODECS = {
+    COMPRESSION_ZLIB: (1, zlib.compress, zlib.decompress),
+    COMPRESSION_LZMA: (2, lzma.compress, lzma.decompress),
+}
+CODEC_NAMES = {codec_id: name for name, (codec_id, _, _) in CODECS.items()}
+
+
+class BlockReader(io.RawIOBase):
+    """Lecture du texte d'une note compressée, bloc par bloc à la demande"""
+
+    def __init__(self, raw, compression, plain_size):
+        self.raw = raw
+        self.decompress = CODECS[compression][2]
+        self.plain_size = plain_size
+        self.block = b""
+        self.offset = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self.offset >= len(self.block):
+            length = self.raw.read(BLOCK_LENGTH.size)
+            if len(length) < BLOCK_LENGTH.size:
+                return 0
+            self.block = self.decompress(self.raw.read(BLOCK_LENGTH.unpack(length)[0]))
+            self.offset = 0
+        count = min(len(buffer), len(self.block) - self.offset)
+        buffer[:count] = self.block[self.offset:self.offset + count]
+        self.offset += count
+        return count
+
+    def fileno(self):
+        return self.raw.fileno()
+
+    def close(self):
+        self.raw.close()
+        super().close()
+
+
+def read_header(f):
+    """Retourne (algorithme, taille du texte) d'une note compressée, None pour une note en clair"""
+    header = f.read(HEADER.size)
+    if len(header) == HEADER.size:
+        magic, version, codec_id, plain_size = HEADER.unpack(header)
+        if magic == MAGIC and version == VERSION and codec_id in CODEC_NAMES:
+            return CODEC_NAMES[codec_id], plain_size
+    f.seek(0)
+    return None
+
+
+def open_note_binary(path):
+    """Ouvre le texte d'une note (octets UTF-8), qu'elle soit compressée ou non"""
+    f = open(path, "rb")
+    try:
+        header = read_header(f)
+    except Exception:
+        f.close()
+        raise
+    if header is None:
+        return f
+    return io.BufferedReader(BlockReader(f, *header), BLOCK_SIZE)
+
+
+def open_note_text(path):
+    """Comme open(path, "r", encoding="utf-8"), pour une note compressée ou non"""
+    return io.TextIOWrapper(open_note_binary(path), encoding="utf-8")
+
+
+def content_length(f):
+    """Taille du texte d'une note ouverte par open_note_binary"""
+    raw = getattr(f, "raw", None)
+    if isinstance(raw, BlockReader):
+        return raw.plain_size
+    return os.fstat(f.fileno()).st_size
+
+
+def file_compression(path):
+    """Algorithme de compression d'une note (None si elle est en clair)"""
+    with open(path, "rb") as f:
+        header = read_header(f)
+    return header[0] if header else None
+
+
+def note_size(path):
+    """Taille du texte d'une note (et non de sa forme compressée sur disque)"""
+    with open(path, "rb") as f:
+        header = read_header(f)
+        return header[1] if header else os.fstat(f.fileno()).st_size
+
+
+def write_compressed(f, chunks, compression):
+    """Écrit des morceaux de texte (octets) compressés par blocs dans un fichier binaire"""
+    codec_id, compress, _ = CODECS[compression]
+    f.write(HEADER.pack(MAGIC, VERSION, codec_id, 0))
+    plain_size = 0
+    pending = b""
+    for chunk in chunks:
+        plain_size += len(chunk)
+        data = memoryview(pending + chunk if pending else chunk)
+        offset = 0
+        while len(data) - offset >= BLOCK_SIZE:
+            write_block(f, compress, data[offset:offset + BLOCK_SIZE])
+            offset += BLOCK_SIZE
+        pending = bytes(data[offset:])
+    if pending:
+        write_block(f, compress, pending)
+
+    # Taille du texte connue seulement à la fin (copie d'un flux): compléter l'en-tête
+    f.seek(0)
+    f.write(HEADER.pack(MAGIC, VERSION, codec_id, plain_size))
+    f.seek(0, io.SEEK_END)
+
+
+def write_block(f, compress, data):
+    block = compress(data)
+    f.write(BLOCK_LENGTH.pack(len(block)))
+    f.write(block)
@@ -0,0 +1,389 @@
+import io
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+
+from note_catalog import NoteRecord, NoteCatalog
+from note_index import NoteMetadataIndex
+from note_store import NoteStore, NoteStoreError
+from note_history import NoteHistory
+from save_worker import FSYNC_NEVER, FSYNC_FILE, FSYNC_FULL
+from note_watcher import RESCAN
+
+# Toutes les notes dans un seul fichier SQLite: contenu, date, taille et favori.
+# L'index notes_order couvre la liste du menu: elle est lue sans toucher au contenu.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    filename TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    favorite INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS notes_order ON notes (mtime DESC, filename, size);
+CREATE INDEX IF NOT EXISTS notes_favorite ON notes (favorite) WHERE favorite;
+"""
+
+# Niveau de synchronisation SQLite correspondant à chaque politique fsync. En mode WAL,
+# NORMAL ne synchronise qu'aux points de contrôle: une sauvegarde reste une transaction légère
+SYNCHRONOUS = {
+    FSYNC_NEVER: "OFF",
+    FSYNC_FILE: "NORMAL",
+    FSYNC_FULL: "FULL",
+}
+
+# Attente maximale (secondes) d'un verrou d'écriture tenu par un autre thread ou processus
+LOCK_TIMEOUT = 10.0
+
+# Résultat d'une écriture, aux mêmes attributs que os.stat pour l'index et l'interface
+NoteStat = namedtuple("NoteStat", ["st_mtime", "st_size"])
+
+
+class NoteBlob(io.BytesIO):
+    """Texte d'une note lu en une fois (open_binary), avec sa date de modification"""
+
+    def __init__(self, content, mtime):
+        super().__init__(content)
+        self.mtime = mtime
+
+
+class NoteDatabase:
+    """Connexions à la base des notes, une par thread (interface, sauvegarde, indexation)"""
+
+    def __init__(self, db_file, fsync_policy=FSYNC_FILE):
+        self.db_file = db_file
+        self.fsync_policy = fsync_policy
+        self.local = threading.local()
+        self.watchers = []  # DatabaseWatcher à prévenir des écritures de l'application
+        with self.connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def connect(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=LOCK_TIMEOUT)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={SYNCHRONOUS[self.fsync_policy]}")
+            self.local.conn = conn
+        return conn
+
+    def close(self):
+        """Ferme la connexion du thread appelant"""
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    def committed(self):
+        """À appeler après chaque transaction de l'application: ses surveillants ne la signalent pas"""
+        for watcher in self.watchers:
+            watcher.acknowledge()
+
+
+class DatabaseNoteIndex(NoteMetadataIndex):
+    """Métadonnées des notes lues dans la base: pas de fichier d'index ni de parcours de dossier"""
+
+    def __init__(self, database):
+        super().__init__(None, None)
+        self.database = database
+
+    def load(self):
+        """Charge la liste des notes, déjà dans l'ordre du menu (index notes_order)"""
+        rows = self.database.connect().execute("SELECT filename, mtime, size FROM notes ORDER BY mtime DESC")
+        self.entries = {filename: NoteRecord(filename, mtime, size) for filename, mtime, size in rows}
+        self.dirty = False
+        self.reordered = True
+
+    def save(self):
+        self.dirty = False  # Chaque écriture est déjà enregistrée dans la base
+
+    def refresh(self):
+        """Relit la liste des notes (modifications d'un autre processus), enregistrements mis à jour sur place"""
+        entries = {}
+        changed = False
+        rows = self.database.connect().execute("SELECT filename, mtime, size FROM notes ORDER BY mtime DESC")
+        for filename, mtime, size in rows:
+            record = self.entries.get(filename)
+            if record is None:
+                record = NoteRecord(filename, mtime, size)
+                changed = True
+            elif record.mtime != mtime or record.size != size:
+                record.set_stat(mtime, size)
+                changed = True
+            entries[filename] = record
+        if changed or len(entries) != len(self.entries):
+            self.reordered = True
+        self.entries = entries
+
+    def update(self, filename, st=None):
+        if st is None:
+            row = self.database.connect().execute(
+                "SELECT mtime, size FROM notes WHERE filename = ?", (filename,)
+            ).fetchone()
+            if row is None:
+                raise FileNotFoundError(f"Note introuvable: {filename}")
+            st = NoteStat(*row)
+        super().update(filename, st)
+
+
+class DatabaseNoteStore(NoteStore):
+    """Notes dans une base SQLite (mode WAL) au lieu d'un fichier par note
+
+    Même interface que NoteStore: l'interface, la ligne de commande, l'index de recherche
+    et l'export n'ont pas à connaître l'emplacement des notes. Les journaux d'édition
+    restent des fichiers dans journal_dir.
+    """
+
+    def __init__(self, db_file, journal_dir, fsync_policy=FSYNC_FILE, history_file=None):
+        self.notes_dir = None
+        self.favorites_file = None
+        self.journal_dir = journal_dir
+        self.fsync_policy = fsync_policy
+        self.compression = None  # Le contenu est stocké tel quel dans la base
+        self.database = NoteDatabase(db_file, fsync_policy)
+        self.note_index = DatabaseNoteIndex(self.database)
+        self.catalog = NoteCatalog(self.note_index)
+        self.favorites = set()
+        self.favorite_ids = {}  # Inutilisé: le favori est une colonne de la ligne de la note
+        self.favorites_dirty = False
+        self.history = NoteHistory(history_file) if history_file else None
+
+    def path(self, filename):
+        raise NoteStoreError("Les notes sont stockées dans une base SQLite, pas dans des fichiers")
+
+    def exists(self, filename):
+        return self.database.connect().execute(
+            "SELECT 1 FROM notes WHERE filename = ?", (filename,)
+        ).fetchone() is not None
+
+    def stat(self, filename):
+        row = self.database.connect().execute(
+            "SELECT mtime, size FROM notes WHERE filename = ?", (filename,)
+        ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"Note introuvable: {filename}")
+        return NoteStat(*row)
+
+    def scan(self):
+        rows = self.database.connect().execute("SELECT filename, mtime, size FROM notes")
+        return {filename: NoteStat(mtime, size) for filename, mtime, size in rows}
+
+    def load_index(self, refresh=True):
+        self.note_index.load()
+
+    def adopt_stray_notes(self):
+        return []
+
+    # --- Favoris (colonne favorite) ---
+
+    def load_favorites(self):
+        rows = self.database.connect().execute("SELECT filename FROM notes WHERE favorite")
+        self.favorites = {filename for filename, in rows}
+
+    def save_favorites(self):
+        """Enregistre l'ensemble des favoris (après un import) en une transaction"""
+        with self.database.connect() as conn:
+            conn.execute("UPDATE notes SET favorite = 0 WHERE favorite")
+            conn.executemany("UPDATE notes SET favorite = 1 WHERE filename = ?", [(f,) for f in self.favorites])
+        self.database.committed()
+
+    def relink_favorites(self):
+        """Les favoris suivent les lignes de la base: il suffit de les relire"""
+        favorites = self.favorites
+        self.load_favorites()
+        return self.favorites != favorites
+
+    def close(self):
+        self.database.close()
+        if self.history is not None:
+            self.history.close()
+
+    def set_favorite(self, filename, favorite):
+        if favorite:
+            self.favorites.add(filename)
+        else:
+            self.favorites.discard(filename)
+        with self.database.connect() as conn:
+            conn.execute("UPDATE notes SET favorite = ? WHERE filename = ?", (int(favorite), filename))
+        self.database.committed()
+        return favorite
+
+    # --- Contenu ---
+
+    def read(self, filename):
+        row = self.database.connect().execute(
+            "SELECT content FROM notes WHERE filename = ?", (filename,)
+        ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"Note introuvable: {filename}")
+        return row[0]
+
+    def preview(self, filename, size):
+        row = self.database.connect().execute(
+            "SELECT substr(content, 1, ?) FROM notes WHERE filename = ?", (size, filename)
+        ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"Note introuvable: {filename}")
+        return row[0]
+
+    def open_binary(self, filename):
+        row = self.database.connect().execute(
+            "SELECT content, mtime FROM notes WHERE filename = ?", (filename,)
+        ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"Note introuvable: {filename}")
+        return NoteBlob(row[0].encode("utf-8"), row[1])
+
+    def source_stat(self, source):
+        return len(source.getbuffer()), source.mtime
+
+    def content_size(self, filename):
+        return self.stat(filename).st_size
+
+    def iter_chunks(self, filename, chunk_size, first_chunk_size=None, use_mmap=False):
+        content = self.read(filename).replace("\r\n", "\n").replace("\r", "\n")
+        size = first_chunk_size or chunk_size
+        offset = 0
+        while offset < len(content):
+            yield content[offset:offset + size]
+            offset += size
+            size = chunk_size
+
+    def replace_content(self, filename, content, mtime=None):
+        """Une sauvegarde est une transaction (un seul ajout au journal WAL)"""
+        st = NoteStat(time.time() if mtime is None else mtime, len(content.encode("utf-8")))
+        with self.database.connect() as conn:
+            conn.execute(
+                "INSERT INTO notes (filename, content, mtime, size) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (filename) DO UPDATE SET content = excluded.content, "
+                "mtime = excluded.mtime, size = excluded.size",
+                (filename, content, st.st_mtime, st.st_size)
+            )
+        self.database.committed()
+        return st
+
+    def write(self, filename, content, mtime=None):
+        st = self.write_content(filename, content, mtime)
+        self.note_index.update(filename, st)
+        return st
+
+    def note_written(self, filename, st):
+        self.note_index.update(filename, st)
+
+    def write_from(self, filename, source, mtime=None):
+        return self.write(filename, source.read().decode("utf-8"), mtime)
+
+    def create_file(self, filename, content):
+        try:
+            with self.database.connect() as conn:
+                conn.execute(
+                    "INSERT INTO notes (filename, content, mtime, size) VALUES (?, ?, ?, ?)",
+                    (filename, content, time.time(), len(content.encode("utf-8")))
+                )
+            self.database.committed()
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def convert(self, filename, compression):
+        raise NoteStoreError("La compression ne s'applique qu'aux notes stockées dans des fichiers")
+
+    def relayout(self, layout, progress=None):
+        raise NoteStoreError("L'organisation en sous-dossiers ne s'applique qu'aux notes stockées dans des fichiers")
+
+    def rename(self, filename, new_name):
+        new_filename = self.validate_name(new_name)
+        if new_filename == filename:
+            return filename
+        try:
+            with self.database.connect() as conn:
+                cursor = conn.execute("UPDATE notes SET filename = ? WHERE filename = ?", (new_filename, filename))
+        except sqlite3.IntegrityError:
+            raise NoteStoreError("Ce nom de note existe déjà")
+        self.database.committed()
+        if cursor.rowcount == 0:
+            raise FileNotFoundError(f"Note introuvable: {filename}")
+
+        # Le favori et l'historique suivent la ligne renommée
+        self.note_index.rename(filename, new_filename)
+        if self.history is not None:
+            self.history.rename(filename, new_filename)
+        if filename in self.favorites:
+            self.favorites.remove(filename)
+            self.favorites.add(new_filename)
+        return new_filename
+
+    def delete(self, filename):
+        with self.database.connect() as conn:
+            cursor = conn.execute("DELETE FROM notes WHERE filename = ?", (filename,))
+        self.database.committed()
+        if cursor.rowcount == 0:
+            raise FileNotFoundError(f"Note introuvable: {filename}")
+        self.forget(filename)
+
+    def make_watcher(self, poll_interval):
+        watcher = DatabaseWatcher(self.database.db_file, poll_interval)
+        self.database.watchers.append(watcher)
+        return watcher
+
+
+class DatabaseWatcher:
+    """Détecte les écritures d'autres connexions dans la base (PRAGMA data_version)
+
+    Même interface que NoteWatcher; comme la base ne dit pas quelles notes ont changé,
+    drain() demande un réexamen complet (une seule requête sur l'index notes_order).
+    data_version change aussi après les écritures des autres connexions de l'application
+    (thread de sauvegarde): acknowledge() relève la version après chacune d'elles, pour
+    qu'une sauvegarde ne provoque pas de réexamen.
+    """
+
+    def __init__(self, db_file, poll_interval=2.0):
+        self.db_file = db_file
+        self.poll_interval = poll_interval
+        self.changed = set()
+        self.conn = None  # Connexion du thread de surveillance (partagée avec acknowledge, sous lock)
+        self.version = None
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.backend = "data_version"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def drain(self):
+        with self.lock:
+            changed = self.changed
+            self.changed = set()
+        return changed
+
+    def acknowledge(self):
+        """Écriture de l'application: la version actuelle n'est pas un changement extérieur
+
+        Une écriture d'un autre programme entre cette transaction et cet appel passe inaperçue
+        jusqu'à la suivante.
+        """
+        with self.lock:
+            if self.conn is not None:
+                self.version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def run(self):
+        with self.lock:
+            self.conn = sqlite3.connect(self.db_file, timeout=LOCK_TIMEOUT, check_same_thread=False)
+            self.version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        try:
+            while not self.stopped.wait(self.poll_interval):
+                with self.lock:
+                    current = self.conn.execute("PRAGMA data_version").fetchone()[0]
+                    if current != self.version:
+                        self.version = current
+                        self.changed.add(RESCAN)
+        finally:
+            with self.lock:
+                self.conn.close()
+                self.conn = None
@@ -0,0 +1,257 @@
+import os
+import re
+import zlib
+import random
+import sqlite3
+from array import array
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from edit_journal import content_hash
+
+# Détection des doublons: empreinte SHA-1 du texte pour les copies exactes, signatures MinHash
+# (sur les suites de mots) et LSH par bandes pour les notes presque identiques
+WORD_RE = re.compile(r"\w+")
+DEDUP_SHINGLE_WORDS = 3
+DEDUP_PERMUTATIONS = 64
+DEDUP_BANDS = 16  # 16 bandes de 4 valeurs: paires candidates dès ~50 % de similarité
+DEDUP_THRESHOLD = 0.8  # Similarité estimée minimale de deux notes presque identiques
+
+# Notes envoyées à un processus de calcul à la fois, et lots en cours par processus
+DEDUP_BATCH = 64
+DEDUP_BATCHES_PER_WORKER = 2
+
+# Permutations de MinHash: h -> (a * h + b) mod p. Graine fixe: les signatures du cache
+# restent comparables d'un lancement (et d'un processus) à l'autre
+MERSENNE_PRIME = (1 << 61) - 1
+DEDUP_SEED = 0x4E4F544553
+PERMUTATIONS = [
+    (rng.randrange(1, MERSENNE_PRIME), rng.randrange(MERSENNE_PRIME))
+    for rng in [random.Random(DEDUP_SEED)]
+    for _ in range(DEDUP_PERMUTATIONS)
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    filename TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT,
+    signature BLOB
+);
+"""
+
+
+def minhash(text):
+    """Signature MinHash des suites de DEDUP_SHINGLE_WORDS mots (casse ignorée)"""
+    words = WORD_RE.findall(text.lower())
+    count = DEDUP_SHINGLE_WORDS
+    shingles = {" ".join(words[i:i + count]) for i in range(max(1, len(words) - count + 1))}
+    # crc32 plutôt que hash(): identique dans tous les processus
+    hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles]
+    return array("Q", [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in PERMUTATIONS])
+
+
+def note_signatures(batch):
+    """Calcul dans un processus du pool: [(nom, empreinte, signature)] d'un lot de (nom, texte)
+
+    Une note vide (ou faite d'espaces) n'a ni empreinte ni signature: ce n'est pas une copie.
+    """
+    results = []
+    for filename, text in batch:
+        if text.strip():
+            results.append((filename, content_hash(text), minhash(text).tobytes()))
+        else:
+            results.append((filename, None, None))
+    return results
+
+
+def similarity(signature, other):
+    """Similarité de Jaccard estimée à partir de deux signatures (octets)"""
+    first, second = array("Q", signature), array("Q", other)
+    return sum(x == y for x, y in zip(first, second)) / len(first)
+
+
+def merge_texts(contents):
+    """Texte fusionné: le premier en entier, puis les lignes des suivants qu'il ne contient pas"""
+    merged = contents[0]
+    seen = set(merged.splitlines())
+    added = []
+    for content in contents[1:]:
+        for line in content.splitlines():
+            if line.strip() and line not in seen:
+                seen.add(line)
+                added.append(line)
+    if added:
+        if merged and not merged.endswith("\n"):
+            merged += "\n"
+        merged += "\n".join(added) + "\n"
+    return merged
+
+
+class DuplicateGroup:
+    """Notes identiques ou presque identiques
+
+    Un groupe de notes similaires peut contenir des copies exactes les unes des autres:
+    copies les relie à la plus récente de ces copies, la seule à garder.
+    """
+
+    __slots__ = ("filenames", "exact", "similarities", "copies")
+
+    def __init__(self, filenames, exact, similarities, copies):
+        self.filenames = filenames  # Plus récente d'abord: celle que l'on garde
+        self.exact = exact  # Toutes identiques
+        self.similarities = similarities  # Nom -> similarité estimée avec la première note
+        self.copies = copies  # Nom d'une copie exacte -> nom de la plus récente note identique
+
+
+class DuplicateFinder:
+    """Doublons exacts et notes presque identiques, avec un cache des signatures par date
+
+    Seules les notes ajoutées ou modifiées depuis le dernier appel sont relues; leurs
+    signatures sont calculées dans un pool de processus (repli dans le processus courant
+    si le pool ne peut pas démarrer).
+    """
+
+    def __init__(self, store, cache_file, processes=None):
+        self.store = store
+        self.cache_file = cache_file
+        self.processes = processes  # None: un processus par cœur
+        conn = sqlite3.connect(cache_file)
+        conn.executescript(SCHEMA)
+        conn.close()
+
+    def find(self, notes, progress=None):
+        """Groupes de doublons parmi notes ({nom: (mtime, taille)}), les plus grands d'abord
+
+        Peut être appelé depuis un thread de fond: notes est un instantané du catalogue.
+        progress(fait, total) est appelé après chaque lot de notes analysées.
+        """
+        conn = sqlite3.connect(self.cache_file)
+        try:
+            cached = {
+                filename: (mtime, size, digest, signature)
+                for filename, mtime, size, digest, signature in conn.execute("SELECT * FROM signatures")
+            }
+            stale = [
+                filename for filename, stat in notes.items()
+                if filename not in cached or cached[filename][:2] != tuple(stat)
+            ]
+            removed = [(filename,) for filename in cached.keys() - notes.keys()]
+            with conn:
+                conn.executemany("DELETE FROM signatures WHERE filename = ?", removed)
+
+            done = 0
+            for results in self.compute(stale):
+                rows = [
+                    (filename, notes[filename][0], notes[filename][1], digest, signature)
+                    for filename, digest, signature in results
+                ]
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO signatures VALUES (?, ?, ?, ?, ?)", rows)
+                for row in rows:
+                    cached[row[0]] = row[1:]
+                done += len(results)
+                if progress:
+                    progress(done, len(stale))
+        finally:
+            conn.close()
+
+        return self.group({filename: cached[filename] for filename in notes if filename in cached}, notes)
+
+    def batches(self, filenames):
+        """Lots de (nom, texte) lus par le stockage (dans ce processus: fichiers ou base SQLite)"""
+        batch = []
+        for filename in filenames:
+            try:
+                batch.append((filename, self.store.read(filename)))
+            except FileNotFoundError:
+                continue  # Supprimée depuis l'instantané
+            if len(batch) >= DEDUP_BATCH:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def compute(self, filenames):
+        """Génère les résultats de note_signatures, lot par lot
+
+        Le nombre de lots en cours est borné: les notes ne sont pas toutes lues en mémoire.
+        """
+        if not filenames:
+            return
+        try:
+            pool = ProcessPoolExecutor(self.processes)
+        except Exception as e:
+            # Pas de processus disponibles (environnement restreint): calcul sur place
+            for batch in self.batches(filenames):
+                yield note_signatures(batch)
+            return
+
+        with pool:
+            limit = (self.processes or os.cpu_count() or 1) * DEDUP_BATCHES_PER_WORKER
+            pending = deque()
+            for batch in self.batches(filenames):
+                pending.append(pool.submit(note_signatures, batch))
+                if len(pending) >= limit:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def group(self, cached, notes):
+        """Regroupe par empreinte, puis relie les empreintes dont les signatures sont proches"""
+        by_digest = defaultdict(list)
+        for filename, (_, _, digest, _) in cached.items():
+            if digest is not None:
+                by_digest[digest].append(filename)
+        digests = list(by_digest)
+        signatures = [cached[by_digest[digest][0]][3] for digest in digests]
+
+        parent = list(range(len(digests)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        # LSH: deux signatures partageant une bande entière sont candidates
+        width = len(signatures[0]) // DEDUP_BANDS if signatures else 0
+        buckets = defaultdict(list)
+        for i, signature in enumerate(signatures):
+            for band in range(DEDUP_BANDS):
+                buckets[band, signature[band * width:(band + 1) * width]].append(i)
+        for members in buckets.values():
+            for j in range(1, len(members)):
+                for i in members[:j]:
+                    a, b = find(i), find(members[j])
+                    if a != b and similarity(signatures[i], signatures[members[j]]) >= DEDUP_THRESHOLD:
+                        parent[b] = a
+
+        components = defaultdict(list)
+        for i in range(len(digests)):
+            components[find(i)].append(i)
+
+        groups = []
+        for members in components.values():
+            filenames = [filename for i in members for filename in by_digest[digests[i]]]
+            if len(filenames) < 2:
+                continue
+            filenames.sort(key=lambda filename: notes[filename][0], reverse=True)
+            first = cached[filenames[0]]
+            similarities = {
+                filename: 1.0 if cached[filename][2] == first[2] else similarity(cached[filename][3], first[3])
+                for filename in filenames
+            }
+            # Copies exactes, rattachées à la plus récente note de même empreinte
+            newest = {}
+            copies = {}
+            for filename in filenames:
+                digest = cached[filename][2]
+                if digest in newest:
+                    copies[filename] = newest[digest]
+                else:
+                    newest[digest] = filename
+            groups.append(DuplicateGroup(filenames, len(members) == 1, similarities, copies))
+        groups.sort(key=lambda group: (-len(group.filenames), group.filenames[0]))
+        return groups
@@ -0,0 +1,318 @@
+import time
+import zlib
+import json
+import sqlite3
+import threading
+from collections import namedtuple
+
+# Historique des versions des notes, dans une base SQLite à part (pour les deux stockages).
+# Chaque version est soit complète (point de reprise), soit un delta par lignes par rapport
+# à la version précédente de la même note; les deux sont compressées avec zlib.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS revisions (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL,
+    saved REAL NOT NULL,
+    kind INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS revisions_note ON revisions (filename, id);
+"""
+
+REVISION_FULL = 0
+REVISION_DELTA = 1
+
+# Version complète au moins toutes les HISTORY_CHECKPOINT_EVERY versions: reconstruire une
+# version relit au plus ce nombre de deltas. Un delta plus gros que la moitié du texte est
+# remplacé par une version complète
+HISTORY_CHECKPOINT_EVERY = 20
+
+# Rétention par note: toutes les versions des dernières 24 heures, puis une par heure
+# (la dernière de l'heure), au plus HISTORY_MAX_REVISIONS versions et HISTORY_MAX_BYTES octets
+# stockés. Le compactage ramène la note aux trois quarts de ces limites pour ne pas
+# se répéter à chaque sauvegarde
+HISTORY_KEEP_ALL_SECONDS = 24 * 3600
+HISTORY_THIN_SECONDS = 3600
+# Au-delà de la limite du nombre de versions, celles des dernières 24 heures sont espacées
+# (la dernière de chaque minute, puis de chaque dizaine de minutes, puis de chaque heure)
+# avant que les versions horaires plus anciennes ne partent
+HISTORY_BUSY_THIN_SECONDS = [60, 600, 3600]
+HISTORY_MAX_REVISIONS = 200
+HISTORY_MAX_BYTES = 4 * 1024 * 1024
+HISTORY_COMPACT_RATIO = 0.75
+
+# Attente maximale (secondes) du verrou d'écriture tenu par un autre thread ou processus
+LOCK_TIMEOUT = 10.0
+
+# Version listée par revisions(): size est la taille du texte, stored celle des données stockées
+Revision = namedtuple("Revision", ["id", "saved", "size", "stored", "kind"])
+
+
+def make_delta(old, new):
+    """Opérations transformant old en new: [début, fin] copie des lignes de old, texte inséré sinon
+
+    Les lignes communes au début et à la fin sont écartées avant difflib: une sauvegarde ne
+    touche en général qu'une petite partie de la note.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    limit = min(len(old_lines), len(new_lines))
+    prefix = 0
+    while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+        suffix += 1
+
+    ops = [[0, prefix]] if prefix else []
+    old_middle = old_lines[prefix:len(old_lines) - suffix]
+    new_middle = new_lines[prefix:len(new_lines) - suffix]
+    # Import différé: seule une sauvegarde en a besoin, pas le démarrage de la ligne de commande
+    import difflib
+    matcher = difflib.SequenceMatcher(None, old_middle, new_middle)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([prefix + i1, prefix + i2])
+        elif j2 > j1:
+            ops.append("".join(new_middle[j1:j2]))
+    if suffix:
+        ops.append([len(old_lines) - suffix, len(old_lines)])
+    return ops
+
+
+def apply_delta(old, ops):
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(old_lines[op[0]:op[1]])
+    return "".join(parts)
+
+
+def encode_revision(previous, content, chain):
+    """Retourne (type, données, longueur de la chaîne de deltas) d'une nouvelle version"""
+    encoded = content.encode("utf-8")
+    if previous is not None and chain < HISTORY_CHECKPOINT_EVERY:
+        delta = json.dumps(make_delta(previous, content), ensure_ascii=False).encode("utf-8")
+        if len(delta) < len(encoded) // 2:
+            return REVISION_DELTA, zlib.compress(delta), chain + 1
+    return REVISION_FULL, zlib.compress(encoded), 0
+
+
+def decode_revision(kind, data, previous):
+    if kind == REVISION_FULL:
+        return zlib.decompress(data).decode("utf-8")
+    return apply_delta(previous, json.loads(zlib.decompress(data)))
+
+
+def retained(saved_times, now):
+    """Indices (croissants) des versions gardées par la politique de rétention
+
+    Une longue séance d'édition (une version par sauvegarde) est espacée d'abord: les plus
+    anciennes versions ne partent que si les dernières 24 heures, gardées heure par heure,
+    dépassent encore la limite.
+    """
+    limit = int(HISTORY_MAX_REVISIONS * HISTORY_COMPACT_RATIO)
+    for recent_slot in [None] + HISTORY_BUSY_THIN_SECONDS:
+        keep = thinned(saved_times, now, recent_slot)
+        if len(keep) <= limit:
+            break
+    return sorted(keep[:limit])
+
+
+def thinned(saved_times, now, recent_slot=None):
+    """Indices des versions gardées, les plus récentes d'abord: la dernière de chaque tranche
+    de recent_slot secondes (toutes sans recent_slot) dans les dernières 24 heures, puis la
+    dernière de chaque heure
+    """
+    keep = []
+    last_slot = None
+    for i in range(len(saved_times) - 1, -1, -1):
+        saved = saved_times[i]
+        if now - saved < HISTORY_KEEP_ALL_SECONDS:
+            if recent_slot is None:
+                keep.append(i)
+                continue
+            slot = (recent_slot, int(saved // recent_slot))
+        else:
+            slot = (HISTORY_THIN_SECONDS, int(saved // HISTORY_THIN_SECONDS))
+        if slot != last_slot:
+            keep.append(i)
+            last_slot = slot
+    return keep
+
+
+class NoteHistory:
+    """Versions enregistrées de chaque note, stockées en deltas avec des points de reprise
+
+    record() est appelé par le thread d'écriture après chaque sauvegarde; rename() et remove()
+    par l'interface ou la ligne de commande. La dernière version écrite est gardée en mémoire:
+    le delta suivant ne relit pas la base.
+    """
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.latest = None  # (nom de fichier, id, contenu, longueur de la chaîne de deltas, date)
+        with self.connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def connect(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=LOCK_TIMEOUT)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def close(self):
+        """Ferme la connexion du thread appelant"""
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    # --- Consultation ---
+
+    def revisions(self, filename):
+        """Versions d'une note, de la plus récente à la plus ancienne"""
+        rows = self.connect().execute(
+            "SELECT id, saved, size, length(data), kind FROM revisions WHERE filename = ? ORDER BY id DESC",
+            (filename,)
+        )
+        return [Revision(*row) for row in rows]
+
+    def content(self, filename, revision_id):
+        """Texte d'une version: dernier point de reprise puis deltas jusqu'à cette version"""
+        content, _ = self.rebuild(self.connect(), filename, revision_id)
+        return content
+
+    def rebuild(self, conn, filename, revision_id):
+        rows = conn.execute(
+            "SELECT kind, data FROM revisions WHERE filename = ? AND id <= ? AND id >= ("
+            "SELECT MAX(id) FROM revisions WHERE filename = ? AND id <= ? AND kind = ?) ORDER BY id",
+            (filename, revision_id, filename, revision_id, REVISION_FULL)
+        ).fetchall()
+        if not rows:
+            raise KeyError(f"Version introuvable: {revision_id}")
+        content = None
+        for kind, data in rows:
+            content = decode_revision(kind, data, content)
+        return content, len(rows) - 1
+
+    # --- Enregistrement ---
+
+    def keep_original(self, filename, read, stat):
+        """Avant d'écrire une note, garde la version remplacée si elle n'est pas déjà la
+        dernière de l'historique (note sans historique, importée ou modifiée par un autre
+        programme)
+
+        Une version enregistrée porte la date de modification de la note écrite: la note
+        n'a pas changé depuis si sa date est celle de la dernière version.
+        """
+        try:
+            mtime = stat(filename).st_mtime
+        except FileNotFoundError:
+            return  # Nouvelle note
+        if self.latest is not None and self.latest[0] == filename:
+            saved = self.latest[4]
+        else:
+            row = self.connect().execute(
+                "SELECT saved FROM revisions WHERE filename = ? ORDER BY id DESC LIMIT 1", (filename,)
+            ).fetchone()
+            saved = row[0] if row else None
+        if saved == mtime:
+            return
+        try:
+            content = read(filename)
+        except FileNotFoundError:
+            return
+        self.record(filename, content, mtime)
+
+    def record(self, filename, content, saved=None):
+        """Ajoute une version (ignorée si identique à la précédente); retourne son id ou None"""
+        saved = time.time() if saved is None else saved
+        with self.lock:
+            conn = self.connect()
+            row = conn.execute(
+                "SELECT MAX(id), COUNT(*), SUM(length(data)) FROM revisions WHERE filename = ?", (filename,)
+            ).fetchone()
+            latest_id, count, stored = row
+            previous, chain = None, 0
+            if latest_id is not None:
+                if self.latest is not None and self.latest[:2] == (filename, latest_id):
+                    previous, chain = self.latest[2], self.latest[3]
+                else:
+                    previous, chain = self.rebuild(conn, filename, latest_id)
+                if previous == content:
+                    return None
+
+            kind, data, chain = encode_revision(previous, content, chain)
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO revisions (filename, saved, kind, size, data) VALUES (?, ?, ?, ?, ?)",
+                    (filename, saved, kind, len(content.encode("utf-8")), data)
+                )
+            self.latest = (filename, cursor.lastrowid, content, chain, saved)
+
+            if count + 1 > HISTORY_MAX_REVISIONS or (stored or 0) + len(data) > HISTORY_MAX_BYTES:
+                self.compact(conn, filename)
+            return cursor.lastrowid
+
+    def compact(self, conn, filename, now=None):
+        """Applique la rétention à une note: versions écartées, chaîne de deltas réécrite"""
+        rows = conn.execute(
+            "SELECT id, saved, kind, data FROM revisions WHERE filename = ? ORDER BY id", (filename,)
+        ).fetchall()
+        keep = [rows[i][0] for i in retained([row[1] for row in rows], time.time() if now is None else now)]
+
+        # Limite de taille: les versions les plus anciennes partent d'abord
+        budget = HISTORY_MAX_BYTES * HISTORY_COMPACT_RATIO
+        encoded = list(self.reencode(rows, set(keep)))
+        total = sum(len(data) for _, _, _, data in encoded)
+        start = 0
+        while total > budget and start < len(encoded) - 1:
+            total -= len(encoded[start][3])
+            start += 1
+        if start:
+            # La plus ancienne version gardée devient un point de reprise
+            encoded = list(self.reencode(rows, set(keep[start:])))
+
+        with conn:
+            conn.execute("DELETE FROM revisions WHERE filename = ?", (filename,))
+            conn.executemany(
+                "INSERT INTO revisions (filename, saved, kind, size, data) VALUES (?, ?, ?, ?, ?)",
+                [(filename, saved, kind, size, data) for saved, kind, size, data in encoded]
+            )
+        self.latest = None
+
+    def reencode(self, rows, keep):
+        """Relit la chaîne des versions et réencode celles gardées, chacune par rapport à la précédente gardée"""
+        content = None
+        kept = None
+        chain = 0
+        for revision_id, saved, kind, data in rows:
+            content = decode_revision(kind, data, content)
+            if revision_id in keep:
+                new_kind, new_data, chain = encode_revision(kept, content, chain)
+                yield saved, new_kind, len(content.encode("utf-8")), new_data
+                kept = content
+
+    # --- Renommage et suppression ---
+
+    def rename(self, filename, new_filename):
+        with self.lock:
+            with self.connect() as conn:
+                conn.execute("UPDATE revisions SET filename = ? WHERE filename = ?", (new_filename, filename))
+            self.latest = None
+
+    def remove(self, filename):
+        with self.lock:
+            with self.connect() as conn:
+                conn.execute("DELETE FROM revisions WHERE filename = ?", (filename,))
+            self.latest = None
@@ -0,0 +1,127 @@
+import os
+import json
+
+from note_catalog import NoteRecord
+from note_layout import LAYOUT_FLAT, note_path, scan_notes, adopt_stray_notes
+
+
+class NoteMetadataIndex:
+    """Index persistant des métadonnées des notes (mtime, taille, date, nom affiché)"""
+
+    def __init__(self, notes_dir, index_file, layout=LAYOUT_FLAT):
+        self.notes_dir = notes_dir
+        self.layout = layout
+        self.index_file = index_file
+        self.entries = {}  # nom de fichier -> NoteRecord
+        self.dirty = False
+
+        # Changements relevés par NoteCatalog pour tenir l'ordre du menu à jour sans tout retrier
+        self.changes = set()  # Notes ajoutées, modifiées, renommées ou supprimées une à une
+        self.reordered = True  # Liste remplacée (chargement, parcours du dossier): tri complet
+
+    def load(self):
+        """Charge l'index depuis le fichier (silencieusement vide en cas d'erreur)"""
+        try:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    self.entries = {
+                        filename: NoteRecord(filename, entry["mtime"], entry["size"], entry.get("date"))
+                        for filename, entry in json.load(f).items()
+                    }
+        except Exception as e:
+            # Index corrompu: il sera reconstruit par refresh()
+            self.entries = {}
+        self.dirty = False
+        self.reordered = True
+
+    def save(self):
+        """Enregistre l'index de façon atomique s'il a été modifié"""
+        if not self.dirty:
+            return
+        tmp_file = self.index_file + ".tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({
+                    filename: {"mtime": record.mtime, "size": record.size, "date": record.date, "name": record.name}
+                    for filename, record in self.entries.items()
+                }, f)
+            os.replace(tmp_file, self.index_file)
+            self.dirty = False
+        except Exception as e:
+            pass  # L'index n'est qu'un cache, il sera reconstruit au prochain lancement
+
+    def refresh(self):
+        """Synchronise l'index avec le dossier des notes (un passage os.scandir par dossier)
+
+        Les enregistrements existants sont mis à jour sur place: ceux que l'interface
+        conserve (note sélectionnée) restent valides. Les notes déposées à la racine d'un
+        dossier en sous-dossiers y sont d'abord rangées.
+        """
+        adopt_stray_notes(self.notes_dir, self.layout)
+        entries = {}
+        for entry in scan_notes(self.notes_dir, self.layout):
+            st = entry.stat()
+            record = self.entries.get(entry.name)
+            if record is None:
+                record = NoteRecord(entry.name, st.st_mtime, st.st_size)
+                self.dirty = True
+            elif record.mtime != st.st_mtime or record.size != st.st_size:
+                record.set_stat(st.st_mtime, st.st_size)
+                self.dirty = True
+            entries[entry.name] = record
+
+        if len(entries) != len(self.entries):
+            self.dirty = True
+        if self.dirty:
+            self.reordered = True
+        self.entries = entries
+
+    def update(self, filename, st=None):
+        """Met à jour (ou ajoute) l'entrée d'une note après une écriture"""
+        if st is None:
+            st = os.stat(note_path(self.notes_dir, self.layout, filename))
+        record = self.entries.get(filename)
+        if record is None:
+            self.entries[filename] = NoteRecord(filename, st.st_mtime, st.st_size)
+        else:
+            record.set_stat(st.st_mtime, st.st_size)
+        self.changes.add(filename)
+        self.dirty = True
+
+    def rename(self, old_filename, new_filename):
+        """Déplace l'entrée d'une note renommée (le mtime ne change pas)"""
+        record = self.entries.pop(old_filename, None)
+        if record is None:
+            self.update(new_filename)
+            return
+        record.filename = new_filename
+        self.entries[new_filename] = record
+        self.changes.update((old_filename, new_filename))
+        self.dirty = True
+
+    def remove(self, filename):
+        """Retire une note supprimée de l'index"""
+        if self.entries.pop(filename, None) is not None:
+            self.changes.add(filename)
+            self.dirty = True
+
+    def filenames(self):
+        """Retourne la liste des notes indexées"""
+        return list(self.entries)
+
+    def get(self, filename):
+        """Retourne les métadonnées d'une note, en les calculant si nécessaire"""
+        record = self.entries.get(filename)
+        if record is None:
+            self.update(filename)
+            record = self.entries[filename]
+        return record
+
+    def mtime(self, filename):
+        return self.get(filename).mtime
+
+    def date_str(self, filename):
+        return self.get(filename).date
+
+    def display_name(self, filename):
+        return self.get(filename).name
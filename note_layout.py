@@ -0,0 +1,108 @@
+import os
+import hashlib
+
+from storage_options import LAYOUT_FLAT, LAYOUT_SHARDED
+
+# Nombre de chiffres hexadécimaux du préfixe: 256 sous-dossiers
+SHARD_DIGITS = 2
+
+
+def shard_name(filename):
+    """Sous-dossier d'une note; indépendant de la casse (même note sur Windows et macOS)"""
+    return hashlib.sha1(filename.lower().encode("utf-8")).hexdigest()[:SHARD_DIGITS]
+
+
+def shard_names():
+    return [f"{shard:0{SHARD_DIGITS}x}" for shard in range(16 ** SHARD_DIGITS)]
+
+
+def note_path(notes_dir, layout, filename):
+    if layout == LAYOUT_SHARDED:
+        return os.path.join(notes_dir, shard_name(filename), filename)
+    return os.path.join(notes_dir, filename)
+
+
+def note_dirs(notes_dir, layout):
+    """Dossiers contenant des notes"""
+    if layout == LAYOUT_SHARDED:
+        return [os.path.join(notes_dir, shard) for shard in shard_names()]
+    return [notes_dir]
+
+
+def watch_dirs(notes_dir, layout):
+    """Dossiers à surveiller: ceux des notes et, avec LAYOUT_SHARDED, la racine où d'autres
+    programmes (scripts, synchronisation) peuvent déposer des notes"""
+    if layout == LAYOUT_SHARDED:
+        return [notes_dir] + note_dirs(notes_dir, layout)
+    return note_dirs(notes_dir, layout)
+
+
+def make_note_dirs(notes_dir, layout):
+    for directory in note_dirs(notes_dir, layout):
+        os.makedirs(directory, exist_ok=True)
+
+
+def scan_notes(notes_dir, layout):
+    """Génère les os.DirEntry des notes, un passage os.scandir par dossier"""
+    return scan_dirs(note_dirs(notes_dir, layout))
+
+
+def scan_dirs(directories):
+    for directory in directories:
+        try:
+            it = os.scandir(directory)
+        except FileNotFoundError:
+            continue
+        with it:
+            for entry in it:
+                if entry.name.endswith(".txt") and entry.is_file():
+                    yield entry
+
+
+def adopt_stray_notes(notes_dir, layout):
+    """Range dans leur sous-dossier les notes déposées à la racine (LAYOUT_SHARDED)
+
+    Retourne leurs noms. Une note dont le nom existe déjà dans son sous-dossier reste
+    à la racine (elle n'est pas listée).
+    """
+    if layout != LAYOUT_SHARDED:
+        return []
+    adopted = []
+    for entry in scan_dirs([notes_dir]):
+        target = note_path(notes_dir, layout, entry.name)
+        if os.path.exists(target):
+            continue
+        try:
+            os.rename(entry.path, target)
+        except OSError:
+            continue  # Supprimée ou déplacée entre-temps
+        adopted.append(entry.name)
+    return adopted
+
+
+def relayout_notes(notes_dir, layout, progress=None):
+    """Déplace toutes les notes vers l'organisation demandée; retourne le nombre de notes déplacées
+
+    Les notes sont cherchées dans les deux organisations: une migration interrompue peut
+    être relancée. Les sous-dossiers vidés sont supprimés en revenant à LAYOUT_FLAT.
+    """
+    make_note_dirs(notes_dir, layout)
+    entries = list(scan_notes(notes_dir, LAYOUT_FLAT)) + list(scan_notes(notes_dir, LAYOUT_SHARDED))
+    moved = 0
+    for done, entry in enumerate(entries, 1):
+        target = note_path(notes_dir, layout, entry.name)
+        if os.path.normcase(entry.path) != os.path.normcase(target):
+            if os.path.exists(target):
+                raise FileExistsError(f"Note en double: {entry.path} et {target}")
+            os.rename(entry.path, target)
+            moved += 1
+        if progress:
+            progress(done, len(entries))
+
+    if layout == LAYOUT_FLAT:
+        for directory in note_dirs(notes_dir, LAYOUT_SHARDED):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass  # Absent, ou contient d'autres fichiers
+    return moved
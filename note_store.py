@@ -0,0 +1,445 @@
+import os
+import json
+import time
+
+from note_index import NoteMetadataIndex
+from note_catalog import NoteCatalog
+from save_worker import write_atomic, copy_atomic, FSYNC_FILE, SaveWorker
+from edit_journal import remove_journals
+from note_codec import open_note_text, open_note_binary, note_size, file_compression, write_compressed, content_length
+from note_watcher import NoteWatcher
+from large_note import iter_note_chunks
+from note_layout import LAYOUT_FLAT, note_path, make_note_dirs, scan_notes, relayout_notes, adopt_stray_notes
+from note_history import NoteHistory
+from storage_options import STORAGE_DIRECTORY, STORAGE_SQLITE
+
+# Caractères interdits dans un nom de note (noms de fichiers Windows et Unix)
+INVALID_NAME_CHARS = ['/', '\\', ':', '*', '?', '"', '<', '>', '|']
+
+
+class NoteStoreError(Exception):
+    """Opération refusée: nom invalide, note existante ou introuvable"""
+
+
+def file_identity(st):
+    """Identité d'un fichier de note: (périphérique, inode, taille, mtime en ns)
+
+    L'inode seul ne suffit pas: il est réutilisé dès qu'un fichier est supprimé (chaque
+    écriture atomique en libère un). La taille et la date, conservées par un renommage,
+    évitent de prendre une autre note pour un favori disparu.
+    """
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def note_filename(name):
+    """Nom de fichier d'une note à partir de son nom affiché (ou de son nom de fichier)"""
+    return name if name.endswith(".txt") else f"{name}.txt"
+
+
+def open_note_store(storage, notes_dir, db_file, index_file, favorites_file, journal_dir,
+                    fsync_policy=FSYNC_FILE, compression=None, layout=LAYOUT_FLAT, history_file=None):
+    """Crée le stockage des notes choisi (STORAGE_DIRECTORY ou STORAGE_SQLITE)
+
+    Avec history_file, chaque écriture d'une note est gardée dans l'historique des versions
+    (celle d'une note importée seulement quand elle est remplacée, voir NoteStore.write_content).
+    """
+    if storage == STORAGE_SQLITE:
+        # Import différé: note_database dépend de ce module
+        from note_database import DatabaseNoteStore
+        return DatabaseNoteStore(db_file, journal_dir, fsync_policy, history_file)
+    if storage != STORAGE_DIRECTORY:
+        raise NoteStoreError(f"Stockage des notes inconnu: {storage}")
+    return NoteStore(
+        notes_dir, index_file, favorites_file, journal_dir, fsync_policy, compression, layout, history_file
+    )
+
+
+class NoteStore:
+    """Notes sur disque, sans interface: liste et ordre du menu, favoris, lecture et écriture,
+    création, renommage et suppression
+
+    L'index des métadonnées n'est chargé que par load_index(): les opérations sur une seule
+    note n'ont pas besoin de parcourir le dossier. C'est le stockage par défaut, un fichier
+    par note; DatabaseNoteStore (note_database.py) offre la même interface sur une base SQLite.
+    Les fichiers sont à la racine du dossier ou répartis en sous-dossiers (note_layout.py).
+    """
+
+    def __init__(self, notes_dir, index_file, favorites_file, journal_dir, fsync_policy=FSYNC_FILE,
+                 compression=None, layout=LAYOUT_FLAT, history_file=None):
+        make_note_dirs(notes_dir, layout)
+        self.notes_dir = notes_dir
+        self.layout = layout
+        self.favorites_file = favorites_file
+        self.journal_dir = journal_dir
+        self.fsync_policy = fsync_policy
+        self.compression = compression  # Format des notes écrites (None: texte brut)
+        self.note_index = NoteMetadataIndex(notes_dir, index_file, layout)
+        self.catalog = NoteCatalog(self.note_index)
+        self.favorites = set()  # Noms de fichiers des notes favorites (appartenance en O(1) pour le menu)
+        self.favorite_ids = {}  # Nom de fichier d'un favori -> file_identity()
+        self.favorites_dirty = False  # Identités changées par des sauvegardes, pas encore enregistrées
+        self.favorites_writer = None  # Thread d'écriture du fichier des favoris, créé au besoin
+        self.history = NoteHistory(history_file) if history_file else None  # Versions des notes
+
+    def path(self, filename):
+        return note_path(self.notes_dir, self.layout, filename)
+
+    def exists(self, filename):
+        return os.path.isfile(self.path(filename))
+
+    def stat(self, filename):
+        """mtime et taille d'une note (OSError si elle n'existe pas)"""
+        return os.stat(self.path(filename))
+
+    def scan(self):
+        """État de toutes les notes {nom de fichier: stat} (un passage os.scandir par dossier)"""
+        self.adopt_stray_notes()
+        return {entry.name: entry.stat() for entry in scan_notes(self.notes_dir, self.layout)}
+
+    def adopt_stray_notes(self):
+        """Range les notes déposées à la racine d'un dossier en sous-dossiers; retourne leurs noms"""
+        return adopt_stray_notes(self.notes_dir, self.layout)
+
+    def make_watcher(self, poll_interval):
+        """Surveillance des modifications faites par d'autres programmes"""
+        return NoteWatcher(self.notes_dir, poll_interval, self.layout)
+
+    def relayout(self, layout, progress=None):
+        """Déplace les fichiers des notes vers une autre organisation; retourne le nombre déplacé"""
+        moved = relayout_notes(self.notes_dir, layout, progress)
+        self.layout = self.note_index.layout = layout
+        return moved
+
+    # --- Index et favoris ---
+
+    def load_index(self, refresh=True):
+        """Charge l'index enregistré, puis le synchronise avec le dossier si demandé"""
+        self.note_index.load()
+        if refresh:
+            self.note_index.refresh()
+            self.note_index.save()
+
+    def load_favorites(self):
+        """Charge les notes favorites depuis le fichier
+
+        Les favoris y sont identifiés par file_identity(), avec le dernier nom connu: une note
+        renommée par un autre programme garde son inode, sa taille et sa date, et reste favorite.
+        Les anciens formats (liste de noms, ou inode sans taille ni date) sont encore acceptés;
+        leurs favoris ne sont retrouvés que par leur nom.
+        """
+        self.favorites = set()
+        self.favorite_ids = {}
+        self.favorites_dirty = False
+        try:
+            if os.path.exists(self.favorites_file):
+                with open(self.favorites_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, list):
+                    self.favorites = set(data)
+                else:
+                    for identity, value in data["favorites"].items():
+                        dev, ino = identity.split(":")
+                        if isinstance(value, str):
+                            filename, size, mtime_ns = value, None, None
+                        else:
+                            filename, size, mtime_ns = value
+                        self.favorites.add(filename)
+                        self.favorite_ids[filename] = (int(dev), int(ino), size, mtime_ns)
+        except Exception as e:
+            # En cas d'erreur, on commence avec une liste vide
+            self.favorites = set()
+            self.favorite_ids = {}
+        self.relink_favorites()
+
+    def relink_favorites(self):
+        """Met à jour l'identité des favoris et rattache ceux dont le nom a disparu
+
+        Un favori renommé hors de l'application est retrouvé par son identité complète: même
+        inode, même taille et même date (un seul parcours du dossier, seulement si un favori
+        manque). Un favori supprimé, ou dont l'inode a été repris par une autre note, est oublié.
+        Retourne True si les favoris ont changé (ils sont alors enregistrés).
+        """
+        changed = self.favorites_dirty
+        missing = set()  # Identités des favoris dont le nom a disparu
+        for filename in list(self.favorites):
+            try:
+                st = self.stat(filename)
+            except OSError:
+                identity = self.favorite_ids.pop(filename, None)
+                self.favorites.discard(filename)
+                if identity is not None and None not in identity:
+                    missing.add(identity)
+                changed = True
+                continue
+            if self.favorite_ids.get(filename) != file_identity(st):
+                self.favorite_ids[filename] = file_identity(st)
+                changed = True
+
+        if missing:
+            inodes = {identity[1] for identity in missing}
+            for entry in scan_notes(self.notes_dir, self.layout):
+                if entry.inode() not in inodes or entry.name in self.favorites:
+                    continue
+                identity = file_identity(entry.stat())
+                if identity in missing:
+                    missing.discard(identity)
+                    self.favorites.add(entry.name)
+                    self.favorite_ids[entry.name] = identity
+
+        if changed:
+            self.save_favorites()
+        return changed
+
+    def save_favorites(self):
+        """Demande l'enregistrement des favoris en arrière-plan
+
+        Les demandes rapprochées sont regroupées en une seule écriture atomique;
+        flush_favorites() attend la fin de l'écriture.
+        """
+        self.favorites_dirty = False
+        favorites = {}
+        for filename in self.favorites:
+            identity = self.favorite_ids.get(filename)
+            if identity is None:
+                # Favori ajouté directement à l'ensemble (import d'une archive)
+                try:
+                    st = self.stat(filename)
+                except OSError:
+                    continue
+                identity = self.favorite_ids[filename] = file_identity(st)
+            dev, ino, size, mtime_ns = identity
+            favorites[f"{dev}:{ino}"] = [filename, size, mtime_ns]
+        content = json.dumps({"version": 3, "favorites": favorites})
+
+        if self.favorites_writer is None:
+            self.favorites_writer = SaveWorker(
+                lambda path, content: write_atomic(path, content, self.fsync_policy)
+            )
+        self.favorites_writer.submit(self.favorites_file, content)
+        self.drain_favorites_results()
+
+    def flush_favorites(self):
+        """Attend l'enregistrement des favoris demandé par save_favorites"""
+        if self.favorites_writer is not None:
+            self.favorites_writer.flush()
+            self.drain_favorites_results()
+
+    def drain_favorites_results(self):
+        while not self.favorites_writer.results.empty():
+            self.favorites_writer.results.get()  # Erreurs ignorées: réessai à la prochaine demande
+
+    def close(self):
+        """Termine les écritures en attente (à appeler avant de quitter)"""
+        if self.favorites_dirty:
+            self.save_favorites()
+        self.flush_favorites()
+        if self.history is not None:
+            self.history.close()
+
+    def toggle_favorite(self, filename):
+        """Marque ou démarque une note comme favorite; retourne le nouvel état"""
+        return self.set_favorite(filename, filename not in self.favorites)
+
+    def set_favorite(self, filename, favorite):
+        if favorite:
+            self.favorites.add(filename)
+        else:
+            self.favorites.discard(filename)
+            self.favorite_ids.pop(filename, None)
+        self.save_favorites()
+        return favorite
+
+    # --- Contenu ---
+
+    def read(self, filename):
+        with open_note_text(self.path(filename)) as f:
+            return f.read()
+
+    def preview(self, filename, size):
+        """Lit le début d'une note (seul le premier bloc d'une note compressée est décompressé)"""
+        with open_note_text(self.path(filename)) as f:
+            return f.read(size)
+
+    def open_binary(self, filename):
+        """Ouvre le texte d'une note en lecture binaire (copie par blocs)"""
+        return open_note_binary(self.path(filename))
+
+    def source_stat(self, source):
+        """(taille du texte, mtime) d'une note ouverte par open_binary"""
+        return content_length(source), os.fstat(source.fileno()).st_mtime
+
+    def content_size(self, filename):
+        """Taille du texte d'une note, compressée ou non"""
+        return note_size(self.path(filename))
+
+    def iter_chunks(self, filename, chunk_size, first_chunk_size=None, use_mmap=False):
+        """Contenu d'une note par morceaux de texte (voir large_note.iter_note_chunks)"""
+        return iter_note_chunks(self.path(filename), chunk_size, first_chunk_size, use_mmap)
+
+    def write_content(self, filename, content, mtime=None):
+        """Écrit le contenu d'une note sans toucher à l'index (thread d'écriture); retourne son stat
+
+        Historique des versions: la version remplacée y est gardée si elle n'y est pas déjà
+        (NoteHistory.keep_original), puis le contenu écrit y est ajouté, daté comme la note.
+        Le contenu d'une note importée (mtime précisé) n'y est pas ajouté: il n'y entre que
+        s'il est remplacé à son tour, comme une modification faite par un autre programme.
+        """
+        if self.history is not None:
+            self.history.keep_original(filename, self.read, self.stat)
+        st = self.replace_content(filename, content, mtime)
+        if self.history is not None and mtime is None:
+            self.history.record(filename, content, st.st_mtime)
+        return st
+
+    def replace_content(self, filename, content, mtime=None):
+        # La date d'une note importée est appliquée ensuite par written()
+        return write_atomic(self.path(filename), content, self.fsync_policy, self.compression)
+
+    def write(self, filename, content, mtime=None):
+        """Remplace le contenu d'une note (écriture atomique); retourne son stat
+
+        mtime, si précisé, est appliqué à la note (import d'une archive). La version
+        remplacée est gardée dans l'historique; le contenu écrit n'y est ajouté que sans
+        mtime (voir write_content).
+        """
+        st = self.write_content(filename, content, mtime)
+        return self.written(filename, st, mtime)
+
+    def write_from(self, filename, source, mtime=None):
+        """Comme write, en copiant par blocs le contenu d'un fichier binaire ouvert
+
+        Même règle pour l'historique: version remplacée gardée, contenu copié ajouté
+        seulement sans mtime (relu après la copie).
+        """
+        if self.history is not None:
+            self.history.keep_original(filename, self.read, self.stat)
+        st = copy_atomic(self.path(filename), source, self.fsync_policy, self.compression)
+        if self.history is not None and mtime is None:
+            self.history.record(filename, self.read(filename), st.st_mtime)
+        return self.written(filename, st, mtime)
+
+    def written(self, filename, st, mtime):
+        if mtime is not None:
+            os.utime(self.path(filename), (mtime, mtime))
+            st = os.stat(self.path(filename))
+        self.note_written(filename, st)
+        return st
+
+    def note_written(self, filename, st):
+        """Prend en compte une note écrite, par l'application ou par un autre programme
+
+        Chaque écriture atomique remplace le fichier: un favori change alors d'identité.
+        Elle n'est enregistrée qu'avec le prochain changement des favoris ou à la fermeture,
+        pas à chaque sauvegarde.
+        """
+        self.note_index.update(filename, st)
+        if filename in self.favorites and self.favorite_ids.get(filename) != file_identity(st):
+            self.favorite_ids[filename] = file_identity(st)
+            self.favorites_dirty = True
+
+    def append(self, filename, text):
+        """Ajoute du texte à la fin d'une note, sur une nouvelle ligne"""
+        if not self.exists(filename):
+            raise NoteStoreError(f"Note introuvable: {filename.replace('.txt', '')}")
+        content = self.read(filename)
+        if content and not content.endswith("\n"):
+            content += "\n"
+        return self.write(filename, content + text)
+
+    # --- Création, renommage, suppression ---
+
+    def validate_name(self, name):
+        """Vérifie un nom de note saisi et retourne le nom de fichier correspondant"""
+        name = name.strip()
+        if not name:
+            raise NoteStoreError("Le nom ne peut pas être vide")
+        if any(char in name for char in INVALID_NAME_CHARS):
+            raise NoteStoreError("Nom contient des caractères invalides")
+        return f"{name}.txt"
+
+    def create(self, content="", name=None):
+        """Crée une note; sans nom, il est basé sur la date et l'heure. Retourne le nom de fichier"""
+        if name is not None:
+            filename = self.validate_name(name)
+            if not self.create_file(filename, content):
+                raise NoteStoreError("Ce nom de note existe déjà")
+        else:
+            # Format plus court mais toujours unique avec secondes pour éviter les doublons
+            timestamp = time.strftime("%m%d_%H%M%S")
+            filename = f"note_{timestamp}.txt"
+            counter = 1
+            while not self.create_file(filename, content):
+                filename = f"note_{timestamp}_{counter}.txt"
+                counter += 1
+
+        self.note_index.update(filename)
+        return filename
+
+    def create_file(self, filename, content):
+        """Création exclusive (jamais d'écrasement); False si la note existe déjà"""
+        try:
+            if self.compression:
+                with open(self.path(filename), "xb") as f:
+                    write_compressed(f, [content.encode("utf-8")], self.compression)
+            else:
+                with open(self.path(filename), "x", encoding="utf-8") as f:
+                    f.write(content)
+            return True
+        except FileExistsError:
+            return False
+
+    def convert(self, filename, compression):
+        """Réécrit une note dans un autre format (None: texte brut) sans changer sa date
+
+        Retourne False si la note était déjà dans ce format.
+        """
+        path = self.path(filename)
+        if file_compression(path) == compression:
+            return False
+        st = os.stat(path)
+        content = self.read(filename)
+        write_atomic(path, content, self.fsync_policy, compression)
+        self.written(filename, None, st.st_mtime)
+        return True
+
+    def rename(self, filename, new_name):
+        """Renomme une note (favoris compris); retourne le nouveau nom de fichier"""
+        new_filename = self.validate_name(new_name)
+        if new_filename == filename:
+            return filename
+        # Un simple changement de casse désigne le même fichier sur certains systèmes
+        if self.exists(new_filename) and not os.path.samefile(self.path(filename), self.path(new_filename)):
+            raise NoteStoreError("Ce nom de note existe déjà")
+
+        os.rename(self.path(filename), self.path(new_filename))
+        self.note_index.rename(filename, new_filename)
+        if self.history is not None:
+            self.history.rename(filename, new_filename)
+
+        # Mettre à jour les favoris si nécessaire (le renommage conserve l'inode)
+        if filename in self.favorites:
+            self.favorites.remove(filename)
+            self.favorites.add(new_filename)
+            identity = self.favorite_ids.pop(filename, None)
+            if identity is not None:
+                self.favorite_ids[new_filename] = identity
+            self.save_favorites()
+        return new_filename
+
+    def delete(self, filename):
+        """Supprime une note, ses journaux et son éventuel favori"""
+        os.remove(self.path(filename))
+        if self.forget(filename):
+            self.save_favorites()
+
+    def forget(self, filename):
+        """Oublie une note supprimée (journaux, historique, index, favori); retourne True si elle était favorite"""
+        remove_journals(self.journal_dir, filename)
+        if self.history is not None:
+            self.history.remove(filename)
+        self.note_index.remove(filename)
+        if filename in self.favorites:
+            self.favorites.remove(filename)
+            self.favorite_ids.pop(filename, None)
+            return True
+        return False
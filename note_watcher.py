@@ -0,0 +1,150 @@
+import os
+import sys
+import struct
+import select
+import threading
+
+from note_layout import LAYOUT_FLAT, watch_dirs, scan_dirs
+
+# Masques inotify (voir inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+# Nom spécial signalant qu'un réexamen complet du dossier est nécessaire
+RESCAN = None
+
+
+def load_inotify():
+    """Retourne libc si inotify est disponible (Linux), None sinon"""
+    if not sys.platform.startswith("linux"):
+        return None
+    # Import différé: ctypes.util charge subprocess, inutile tant que rien n'est surveillé
+    import ctypes
+    import ctypes.util
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class NoteWatcher:
+    """Surveille le dossier des notes et collecte les noms des notes ajoutées, supprimées ou modifiées
+
+    Les changements sont regroupés jusqu'au prochain appel à drain(); c'est à l'appelant
+    de consulter le disque pour savoir si chaque note existe encore et si elle a changé.
+    Avec LAYOUT_SHARDED, chaque sous-dossier est surveillé (les noms de notes sont uniques),
+    ainsi que la racine: une note qui y est déposée est signalée pour être rangée.
+    """
+
+    def __init__(self, notes_dir, poll_interval=2.0, layout=LAYOUT_FLAT):
+        self.notes_dir = notes_dir
+        self.layout = layout
+        self.poll_interval = poll_interval
+        self.changed = set()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.backend = None
+
+    def start(self):
+        libc = load_inotify()
+        fd = -1
+        if libc is not None:
+            fd = libc.inotify_init1(IN_CLOEXEC)
+            directories = watch_dirs(self.notes_dir, self.layout) if fd >= 0 else []
+            for directory in directories:
+                if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+                    # Limite de surveillances atteinte: repli sur la comparaison périodique
+                    os.close(fd)
+                    fd = -1
+                    break
+
+        if fd >= 0:
+            self.backend = "inotify"
+            self.thread = threading.Thread(target=self.run_inotify, args=(fd,), daemon=True)
+        else:
+            self.backend = "polling"
+            self.thread = threading.Thread(target=self.run_polling, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def notify(self, names):
+        with self.lock:
+            self.changed.update(names)
+
+    def drain(self):
+        """Retourne et vide l'ensemble des noms changés (RESCAN pour un réexamen complet)"""
+        with self.lock:
+            changed = self.changed
+            self.changed = set()
+        return changed
+
+    def run_inotify(self, fd):
+        """Boucle inotify: lecture des événements par lots, arrêt vérifié chaque seconde"""
+        try:
+            while not self.stopped.is_set():
+                ready, _, _ = select.select([fd], [], [], 1.0)
+                if not ready:
+                    continue
+                data = os.read(fd, 64 * 1024)
+
+                names = set()
+                offset = 0
+                while offset + EVENT_HEADER.size <= len(data):
+                    _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                    offset += EVENT_HEADER.size
+                    name = data[offset:offset + length].split(b"\0", 1)[0]
+                    offset += length
+
+                    if mask & (IN_Q_OVERFLOW | IN_DELETE_SELF):
+                        names.add(RESCAN)
+                    elif name.endswith(b".txt"):
+                        names.add(os.fsdecode(name))
+                if names:
+                    self.notify(names)
+        finally:
+            os.close(fd)
+
+    def snapshot(self):
+        """État du dossier en un seul passage os.scandir (stat gratuit sous Windows)"""
+        state = {}
+        for entry in scan_dirs(watch_dirs(self.notes_dir, self.layout)):
+            st = entry.stat()
+            state[entry.name] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    def run_polling(self):
+        """Solution de repli: comparaison périodique de deux instantanés du dossier"""
+        try:
+            previous = self.snapshot()
+        except OSError:
+            previous = {}
+        while not self.stopped.wait(self.poll_interval):
+            try:
+                current = self.snapshot()
+            except OSError:
+                continue
+            names = {
+                name for name in previous.keys() | current.keys()
+                if previous.get(name) != current.get(name)
+            }
+            if names:
+                self.notify(names)
+            previous = current
@@ -0,0 +1,308 @@
+"""Ligne de commande des notes, sans interface graphique (ni tkinter ni PIL)
+
+Exemples:
+    python notes_cli.py list --long
+    python notes_cli.py new "courses" -m "pain, lait"
+    date | python notes_cli.py append journal
+    python notes_cli.py cat courses
+    python notes_cli.py rename courses "courses samedi"
+    python notes_cli.py fav "courses samedi"
+    python notes_cli.py rm "courses samedi"
+    python notes_cli.py export notes.tar.gz
+    python notes_cli.py import notes.tar.gz
+    python notes_cli.py migrate lzma
+    python notes_cli.py layout sharded
+    python notes_cli.py history courses
+    python notes_cli.py history courses 42 --restore
+    python notes_cli.py dupes --delete
+    python notes_cli.py --storage directory export - | python notes_cli.py --storage sqlite import -
+
+Les noms de notes s'écrivent avec ou sans l'extension .txt.
+"""
+import sys
+import sqlite3
+import argparse
+import datetime
+
+from config import (
+    NOTES_DIR, INDEX_FILE, FAVORITES_FILE, JOURNAL_DIR, NOTES_DB_FILE, STORAGE_BACKEND, SAVE_FSYNC_POLICY,
+    NOTE_COMPRESSION, NOTES_LAYOUT, HISTORY_FILE,
+    DEDUP_CACHE_FILE
+)
+from storage_options import STORAGE_DIRECTORY, STORAGE_SQLITE, LAYOUT_FLAT, LAYOUT_SHARDED
+from note_store import open_note_store, NoteStoreError, note_filename
+
+# note_archive et note_dedup (pool de processus) sont importés par les commandes qui s'en
+# servent: une commande courte (list, cat...) ne paie pas leur chargement au démarrage
+
+
+def input_text(words):
+    """Texte passé en arguments, sinon lu sur l'entrée standard (si elle n'est pas un terminal)"""
+    if words:
+        return " ".join(words) + "\n"
+    if not sys.stdin.isatty():
+        return sys.stdin.read()
+    return ""
+
+
+def require_note(store, name):
+    filename = note_filename(name)
+    if not store.exists(filename):
+        raise NoteStoreError(f"Note introuvable: {name}")
+    return filename
+
+
+def command_list(store, args):
+    store.load_index()
+    store.load_favorites()
+    store.catalog.arrange(store.favorites)
+    records = store.catalog.favorite_records if args.favorites else store.catalog.visual
+    for record in records:
+        if args.long:
+            star = "★" if record.filename in store.favorites else " "
+            print(f"{record.date}  {record.size:>8}  {star} {record.name}")
+        else:
+            print(record.name)
+
+
+def command_cat(store, args):
+    for name in args.names:
+        sys.stdout.write(store.read(require_note(store, name)))
+
+
+def command_new(store, args):
+    content = input_text([args.message] if args.message is not None else [])
+    filename = store.create(content, args.name)
+    print(filename.replace(".txt", ""))
+
+
+def command_append(store, args):
+    store.append(require_note(store, args.name), input_text(args.text))
+
+
+def command_rename(store, args):
+    store.load_favorites()
+    filename = store.rename(require_note(store, args.name), args.new_name)
+    print(filename.replace(".txt", ""))
+
+
+def command_rm(store, args):
+    store.load_favorites()
+    for name in args.names:
+        store.delete(require_note(store, name))
+
+
+def command_fav(store, args):
+    store.load_favorites()
+    filename = require_note(store, args.name)
+    if args.state is None:
+        favorite = store.toggle_favorite(filename)
+    else:
+        favorite = store.set_favorite(filename, args.state == "on")
+    print("favori" if favorite else "non favori")
+
+
+def progress_reporter(label):
+    """Avancement affiché seulement dans un terminal (pas dans les journaux de cron)"""
+    from note_archive import ProgressReporter
+    return ProgressReporter(label, sys.stderr) if sys.stderr.isatty() else None
+
+
+def command_export(store, args):
+    from note_archive import export_notes, archive_format, is_compressed
+    archive = args.format or archive_format(args.archive)
+    progress = progress_reporter("export")
+    if args.archive == "-":
+        count = export_notes(store, sys.stdout.buffer, archive, args.gzip, progress)
+    else:
+        with open(args.archive, "wb") as f:
+            count = export_notes(store, f, archive, args.gzip or is_compressed(args.archive), progress)
+    if progress:
+        progress.finish()
+    print(f"{count} notes exportées", file=sys.stderr)
+
+
+def command_import(store, args):
+    from note_archive import import_notes, archive_format
+    archive = args.format or archive_format(args.archive)
+    progress = progress_reporter("import")
+    if args.archive == "-":
+        imported, skipped = import_notes(store, sys.stdin.buffer, archive, args.overwrite, progress)
+    else:
+        with open(args.archive, "rb") as f:
+            imported, skipped = import_notes(store, f, archive, args.overwrite, progress)
+    if progress:
+        progress.finish()
+    print(f"{imported} notes importées, {skipped} ignorées", file=sys.stderr)
+
+
+def command_migrate(store, args):
+    compression = None if args.compression == "none" else args.compression
+    store.load_index()
+    records = list(store.catalog)
+    progress = progress_reporter("migration")
+    converted = 0
+    for done, record in enumerate(records, 1):
+        if store.convert(record.filename, compression):
+            converted += 1
+        if progress:
+            progress(done, len(records))
+    store.note_index.save()
+    if progress:
+        progress.finish()
+    print(f"{converted} notes converties ({args.compression})", file=sys.stderr)
+    if compression != NOTE_COMPRESSION:
+        print(f"notes: pensez à régler NOTE_COMPRESSION = {compression!r} dans config.py", file=sys.stderr)
+
+
+def command_layout(store, args):
+    progress = progress_reporter("déplacement")
+    moved = store.relayout(args.layout, progress)
+    if progress:
+        progress.finish()
+    print(f"{moved} notes déplacées ({args.layout})", file=sys.stderr)
+    if args.layout != NOTES_LAYOUT:
+        print(f"notes: pensez à régler NOTES_LAYOUT = {args.layout!r} dans config.py", file=sys.stderr)
+
+
+def command_history(store, args):
+    filename = require_note(store, args.name)
+    revisions = store.history.revisions(filename)
+    if args.revision is None:
+        for revision in revisions:
+            saved = datetime.datetime.fromtimestamp(revision.saved).strftime("%d/%m/%Y %H:%M:%S")
+            print(f"{revision.id:>8}  {saved}  {revision.size:>8}  {revision.stored:>8}")
+        return
+
+    if args.revision not in {revision.id for revision in revisions}:
+        raise NoteStoreError(f"Version introuvable: {args.revision}")
+    content = store.history.content(filename, args.revision)
+    if args.restore:
+        # Le contenu remplacé est gardé dans l'historique comme toute écriture
+        store.write(filename, content)
+    else:
+        sys.stdout.write(content)
+
+
+def command_dupes(store, args):
+    from note_dedup import DuplicateFinder
+    store.load_index()
+    store.load_favorites()
+    notes = {record.filename: (record.mtime, record.size) for record in store.catalog}
+    progress = progress_reporter("analyse")
+    groups = DuplicateFinder(store, DEDUP_CACHE_FILE, args.jobs).find(notes, progress)
+    if progress:
+        progress.finish()
+    store.note_index.save()
+
+    deleted = 0
+    for group in groups:
+        # La plus récente d'abord: c'est celle qui est gardée
+        print("= identiques" if group.exact else "~ similaires")
+        for filename in group.filenames:
+            line = f"  {group.similarities[filename]:>4.0%}  {filename.replace('.txt', '')}"
+            if not group.exact and filename in group.copies:
+                line += f"  (= {group.copies[filename].replace('.txt', '')})"
+            print(line)
+        # Seules les copies exactes sont supprimées, même dans un groupe de notes similaires
+        if args.delete:
+            for filename in group.copies:
+                store.delete(filename)
+                deleted += 1
+    if args.delete:
+        store.note_index.save()
+        print(f"{deleted} copies supprimées", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="notes", description="Notes du terminal en ligne de commande")
+    parser.add_argument(
+        "--storage", choices=[STORAGE_DIRECTORY, STORAGE_SQLITE], default=STORAGE_BACKEND,
+        help="stockage des notes (par défaut celui de config.py)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parser_list = commands.add_parser("list", help="liste les notes dans l'ordre du menu")
+    parser_list.add_argument("-l", "--long", action="store_true", help="date, taille et favori")
+    parser_list.add_argument("-f", "--favorites", action="store_true", help="seulement les favoris")
+    parser_list.set_defaults(func=command_list)
+
+    parser_cat = commands.add_parser("cat", help="affiche le contenu de notes")
+    parser_cat.add_argument("names", nargs="+")
+    parser_cat.set_defaults(func=command_cat)
+
+    parser_new = commands.add_parser("new", help="crée une note (contenu lu sur l'entrée standard)")
+    parser_new.add_argument("name", nargs="?", help="nom de la note (horodaté par défaut)")
+    parser_new.add_argument("-m", "--message", help="contenu de la note")
+    parser_new.set_defaults(func=command_new)
+
+    parser_append = commands.add_parser("append", help="ajoute du texte à la fin d'une note")
+    parser_append.add_argument("name")
+    parser_append.add_argument("text", nargs="*", help="texte ajouté (entrée standard par défaut)")
+    parser_append.set_defaults(func=command_append)
+
+    parser_rename = commands.add_parser("rename", help="renomme une note")
+    parser_rename.add_argument("name")
+    parser_rename.add_argument("new_name")
+    parser_rename.set_defaults(func=command_rename)
+
+    parser_rm = commands.add_parser("rm", help="supprime des notes")
+    parser_rm.add_argument("names", nargs="+")
+    parser_rm.set_defaults(func=command_rm)
+
+    parser_fav = commands.add_parser("fav", help="bascule (ou fixe) le statut de favori d'une note")
+    parser_fav.add_argument("name")
+    parser_fav.add_argument("state", nargs="?", choices=["on", "off"])
+    parser_fav.set_defaults(func=command_fav)
+
+    parser_export = commands.add_parser("export", help="exporte toutes les notes dans une archive")
+    parser_export.add_argument("archive", help="fichier .tar, .tar.gz, .jsonl ou .jsonl.gz ('-': sortie standard)")
+    parser_export.add_argument("--format", choices=["tar", "jsonl"], help="format (déduit de l'extension)")
+    parser_export.add_argument("-z", "--gzip", action="store_true", help="compresser avec gzip")
+    parser_export.set_defaults(func=command_export)
+
+    parser_import = commands.add_parser("import", help="importe les notes d'une archive")
+    parser_import.add_argument("archive", help="archive produite par export ('-': entrée standard)")
+    parser_import.add_argument("--format", choices=["tar", "jsonl"], help="format (déduit de l'extension)")
+    parser_import.add_argument("--overwrite", action="store_true", help="remplacer les notes existantes")
+    parser_import.set_defaults(func=command_import)
+
+    parser_migrate = commands.add_parser("migrate", help="convertit toutes les notes (compressées ou en clair)")
+    parser_migrate.add_argument("compression", choices=["zlib", "lzma", "none"])
+    parser_migrate.set_defaults(func=command_migrate)
+
+    parser_layout = commands.add_parser("layout", help="range les fichiers des notes (à plat ou en sous-dossiers)")
+    parser_layout.add_argument("layout", choices=[LAYOUT_FLAT, LAYOUT_SHARDED])
+    parser_layout.set_defaults(func=command_layout)
+
+    parser_history = commands.add_parser("history", help="versions enregistrées d'une note")
+    parser_history.add_argument("name")
+    parser_history.add_argument("revision", nargs="?", type=int, help="version à afficher (liste par défaut)")
+    parser_history.add_argument("--restore", action="store_true", help="remplacer la note par cette version")
+    parser_history.set_defaults(func=command_history)
+
+    parser_dupes = commands.add_parser("dupes", help="liste les notes en double (identiques ou presque)")
+    parser_dupes.add_argument("--delete", action="store_true", help="supprimer les copies identiques (garde la plus récente)")
+    parser_dupes.add_argument("-j", "--jobs", type=int, help="processus de calcul (un par cœur par défaut)")
+    parser_dupes.set_defaults(func=command_dupes)
+
+    args = parser.parse_args(argv)
+    try:
+        store = open_note_store(
+            args.storage, NOTES_DIR, NOTES_DB_FILE, INDEX_FILE, FAVORITES_FILE, JOURNAL_DIR,
+            SAVE_FSYNC_POLICY, NOTE_COMPRESSION, NOTES_LAYOUT, HISTORY_FILE
+        )
+        try:
+            args.func(store, args)
+        finally:
+            store.close()  # Favoris enregistrés en arrière-plan
+    except BrokenPipeError:
+        pass  # Sortie fermée par le programme suivant (head, grep -m...)
+    except (NoteStoreError, OSError, sqlite3.Error) as e:
+        print(f"notes: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
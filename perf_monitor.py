@@ -0,0 +1,96 @@
+import os
+import json
+import time
+import threading
+import functools
+from collections import deque
+
+# Mesures conservées par opération: les plus anciennes sont remplacées (tampon circulaire)
+PERF_RING_SIZE = 512
+
+
+def percentile(ordered, fraction):
+    """Valeur au rang fraction (0 à 1) d'une liste triée non vide"""
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class PerfMonitor:
+    """Durées des chemins critiques de l'interface et compteurs d'événements (sauvegardes échouées)
+
+    Toujours actif: une mesure coûte deux appels à perf_counter et un ajout dans un deque.
+    Les threads de fond (aperçus, écritures) peuvent aussi enregistrer des mesures.
+    """
+
+    def __init__(self, capacity=PERF_RING_SIZE):
+        self.capacity = capacity
+        self.samples = {}  # opération -> deque des dernières durées (ms)
+        self.counters = {}  # événement -> nombre
+        self.lock = threading.Lock()
+        self.started = time.time()
+
+    def record(self, name, elapsed_ms):
+        with self.lock:
+            ring = self.samples.get(name)
+            if ring is None:
+                ring = self.samples[name] = deque(maxlen=self.capacity)
+            ring.append(elapsed_ms)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def wrap(self, name, func):
+        """Retourne func mesurée sous le nom name (fonctions passées aux threads de fond)"""
+        @functools.wraps(func)
+        def measured(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, (time.perf_counter() - start) * 1000)
+        return measured
+
+    def summary(self):
+        """{opération: {count, p50_ms, p95_ms, max_ms}} sur les mesures conservées"""
+        with self.lock:
+            samples = {name: sorted(ring) for name, ring in self.samples.items()}
+        return {
+            name: {
+                "count": len(ordered),
+                "p50_ms": round(percentile(ordered, 0.50), 3),
+                "p95_ms": round(percentile(ordered, 0.95), 3),
+                "max_ms": round(ordered[-1], 3),
+            }
+            for name, ordered in sorted(samples.items())
+        }
+
+    def export(self, path):
+        """Enregistre résumé, compteurs et mesures brutes dans un fichier JSON (écriture atomique)"""
+        with self.lock:
+            raw = {name: [round(value, 3) for value in ring] for name, ring in self.samples.items()}
+            counters = dict(self.counters)
+        data = {
+            "started": self.started,
+            "exported": time.time(),
+            "summary": self.summary(),
+            "counters": counters,
+            "samples_ms": raw,
+        }
+        tmp_file = path + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_file, path)
+
+
+def timed(name):
+    """Décorateur de méthode: mesure chaque appel dans self.perf"""
+    def decorate(method):
+        @functools.wraps(method)
+        def measured(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.perf.record(name, (time.perf_counter() - start) * 1000)
+        return measured
+    return decorate
@@ -0,0 +1,76 @@
+import time
+import queue
+import threading
+from collections import OrderedDict
+
+
+class PreviewCache:
+    """Cache LRU borné des aperçus de notes, alimenté par un thread de lecture en arrière-plan"""
+
+    def __init__(self, store, capacity=256, preview_size=800, perf=None):
+        self.store = store
+        self.perf = perf  # PerfMonitor optionnel: durée des lectures d'aperçus
+        self.capacity = capacity
+        self.preview_size = preview_size
+        self.entries = OrderedDict()  # (nom de fichier, mtime) -> (aperçu, erreur)
+        self.lock = threading.Lock()
+
+        # File LIFO: la demande la plus récente (la sélection courante) est servie en premier
+        self.requests = queue.LifoQueue()
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    def get(self, filename, mtime):
+        """Retourne (aperçu, erreur) si l'aperçu est en cache, None sinon"""
+        key = (filename, mtime)
+        with self.lock:
+            result = self.entries.get(key)
+            if result is not None:
+                self.entries.move_to_end(key)
+            return result
+
+    def request(self, filename, mtime):
+        """Demande le chargement d'un aperçu par le thread de lecture"""
+        with self.lock:
+            if (filename, mtime) in self.entries:
+                return
+        self.requests.put((filename, mtime))
+
+    def prefetch(self, notes):
+        """Précharge les aperçus d'une liste de (nom de fichier, mtime)"""
+        # Empilés à l'envers pour que le premier élément soit lu en premier
+        for filename, mtime in reversed(notes):
+            self.request(filename, mtime)
+
+    def invalidate(self, filename):
+        """Retire du cache toutes les versions d'une note"""
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == filename]:
+                del self.entries[key]
+
+    def read_preview(self, filename):
+        """Lit le début d'une note (exécuté dans le thread de lecture)"""
+        start = time.perf_counter()
+        try:
+            return self.store.preview(filename, self.preview_size), None
+        except Exception as e:
+            return None, str(e)
+        finally:
+            if self.perf:
+                self.perf.record("preview_read", (time.perf_counter() - start) * 1000)
+
+    def run(self):
+        """Boucle du thread de lecture"""
+        while True:
+            filename, mtime = self.requests.get()
+            with self.lock:
+                if (filename, mtime) in self.entries:
+                    continue
+
+            result = self.read_preview(filename)
+
+            with self.lock:
+                self.entries[(filename, mtime)] = result
+                self.entries.move_to_end((filename, mtime))
+                while len(self.entries) > self.capacity:
+                    self.entries.popitem(last=False)
@@ -0,0 +1,110 @@
+import os
+import queue
+import shutil
+import threading
+
+from note_codec import write_compressed, BLOCK_SIZE
+from storage_options import FSYNC_NEVER, FSYNC_FILE, FSYNC_FULL
+
+
+def write_atomic(path, content, fsync_policy=FSYNC_FILE, compression=None):
+    """Écrit dans un fichier temporaire puis le substitue au fichier cible avec os.replace
+
+    Avec compression ("zlib" ou "lzma"), la note est écrite au format de note_codec.
+    """
+    if compression:
+        return replace_file(
+            path, lambda f: write_compressed(f, [content.encode("utf-8")], compression), fsync_policy, binary=True
+        )
+    return replace_file(path, lambda f: f.write(content), fsync_policy)
+
+
+def copy_atomic(path, source, fsync_policy=FSYNC_FILE, compression=None):
+    """Comme write_atomic, en copiant par blocs un fichier binaire ouvert (mémoire constante)"""
+    if compression:
+        chunks = iter(lambda: source.read(BLOCK_SIZE), b"")
+        return replace_file(path, lambda f: write_compressed(f, chunks, compression), fsync_policy, binary=True)
+    return replace_file(path, lambda f: shutil.copyfileobj(source, f), fsync_policy, binary=True)
+
+
+def replace_file(path, write, fsync_policy=FSYNC_FILE, binary=False):
+    """Remplit un fichier temporaire avec write(f), puis le substitue au fichier cible"""
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{name}.tmp")
+    try:
+        with (open(tmp_path, "wb") if binary else open(tmp_path, "w", encoding="utf-8")) as f:
+            write(f)
+            if fsync_policy != FSYNC_NEVER:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if fsync_policy == FSYNC_FULL and hasattr(os, "O_DIRECTORY"):
+        # Rendre le renommage durable (non disponible sous Windows)
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    return os.stat(path)
+
+
+class SaveWorker:
+    """Thread d'écriture des notes: écritures atomiques et regroupement des sauvegardes
+
+    write(nom de fichier, contenu) écrit une note et retourne son stat (NoteStore.write_content).
+    """
+
+    def __init__(self, write):
+        self.write = write
+        self.pending = {}  # nom de fichier -> (dernier contenu demandé, jeton)
+        self.writing = False
+        self.cond = threading.Condition()
+
+        # Résultats (nom de fichier, stat ou None, erreur ou None, jeton) relevés par l'interface
+        self.results = queue.Queue()
+
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    def submit(self, filename, content, token=None):
+        """Demande l'écriture d'un contenu; remplace une demande en attente pour la même note
+
+        Le jeton est renvoyé tel quel avec le résultat de l'écriture.
+        """
+        with self.cond:
+            self.pending[filename] = (content, token)
+            self.cond.notify_all()
+
+    def is_busy(self):
+        with self.cond:
+            return bool(self.pending) or self.writing
+
+    def flush(self, timeout=None):
+        """Attend la fin de toutes les écritures en attente"""
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.pending and not self.writing, timeout)
+
+    def run(self):
+        """Boucle du thread d'écriture"""
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.pending)
+                batch = self.pending
+                self.pending = {}
+                self.writing = True
+
+            for filename, (content, token) in batch.items():
+                try:
+                    self.results.put((filename, self.write(filename, content), None, token))
+                except Exception as e:
+                    self.results.put((filename, None, e, token))
+
+            with self.cond:
+                self.writing = False
+                self.cond.notify_all()
@@ -0,0 +1,302 @@
+import re
+import math
+import queue
+import sqlite3
+import threading
+from array import array
+
+# Découpage des mots: lettres/chiffres unicode, insensible à la casse
+TOKEN_RE = re.compile(r"\w+")
+MAX_TERM_LENGTH = 64
+
+# Paramètres du classement BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Nombre de notes indexées entre deux validations de transaction
+COMMIT_EVERY = 200
+
+# Au-delà de ce nombre de notes pour le terme le plus rare, seules les meilleures
+# entrées de chaque terme (par impact) sont considérées comme candidates
+FULL_SCAN_LIMIT = 5000
+CANDIDATES_PER_TERM = 2000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    filename TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY,
+    df INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    note_id INTEGER NOT NULL,
+    impact REAL NOT NULL,
+    positions BLOB NOT NULL,
+    PRIMARY KEY (term, note_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_note ON postings (note_id);
+CREATE INDEX IF NOT EXISTS postings_impact ON postings (term, impact DESC);
+"""
+
+
+def tokenize(text):
+    """Retourne la liste des (terme, position) d'un texte"""
+    return [
+        (m.group().lower(), m.start())
+        for m in TOKEN_RE.finditer(text)
+        if len(m.group()) <= MAX_TERM_LENGTH
+    ]
+
+
+def query_terms(query):
+    """Retourne les termes distincts d'une requête"""
+    return sorted({term for term, _ in tokenize(query)})
+
+
+def make_snippet(store, filename, positions, terms, width=160):
+    """Extrait un passage autour de la première occurrence et les plages à surligner"""
+    first = min(positions) if positions else 0
+    start = max(0, first - width // 3)
+    text = store.preview(filename, start + width)
+    snippet = text[start:].replace("\n", " ")
+
+    # Plages (début, fin) des termes recherchés dans le passage
+    spans = [
+        (pos, pos + len(term))
+        for term, pos in tokenize(snippet)
+        if term in terms
+    ]
+    prefix = "..." if start > 0 else ""
+    spans = [(a + len(prefix), b + len(prefix)) for a, b in spans]
+    return prefix + snippet, spans
+
+
+class SearchResult:
+    __slots__ = ("filename", "score", "positions")
+
+    def __init__(self, filename, score, positions):
+        self.filename = filename
+        self.score = score
+        self.positions = positions  # Positions (en caractères) des termes trouvés
+
+
+class SearchIndex:
+    """Index inversé sur disque (terme -> note, positions) mis à jour en arrière-plan"""
+
+    def __init__(self, store, db_file):
+        self.store = store  # Lecture des notes depuis le thread d'indexation
+        self.db_file = db_file
+        self.reader = None  # Connexion de lecture, propre au thread de l'interface
+        self.busy = False
+
+        conn = self.connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        # Toutes les écritures passent par un thread dédié
+        self.requests = queue.Queue()
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_file)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 Mo: les index de l'index inversé sont volumineux
+        return conn
+
+    # --- Demandes de mise à jour (appelées depuis l'interface) ---
+
+    def sync(self, mtimes):
+        """Réindexe les notes modifiées et oublie les notes disparues ({nom: mtime})"""
+        self.requests.put(("sync", dict(mtimes)))
+
+    def update(self, filename, mtime):
+        self.requests.put(("update", filename, mtime))
+
+    def rename(self, old_filename, new_filename):
+        self.requests.put(("rename", old_filename, new_filename))
+
+    def remove(self, filename):
+        self.requests.put(("remove", filename))
+
+    def is_building(self):
+        """Indique si des mises à jour sont encore en attente"""
+        return self.busy or not self.requests.empty()
+
+    # --- Thread d'indexation ---
+
+    def run(self):
+        conn = self.connect()
+        self.load_totals(conn)
+        while True:
+            request = self.requests.get()
+            self.busy = True
+            try:
+                if request[0] == "sync":
+                    self.do_sync(conn, request[1])
+                elif request[0] == "update":
+                    self.index_note(conn, request[1], request[2])
+                elif request[0] == "rename":
+                    conn.execute(
+                        "UPDATE notes SET filename = ? WHERE filename = ?",
+                        (request[2], request[1])
+                    )
+                elif request[0] == "remove":
+                    self.remove_note(conn, request[1])
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                self.load_totals(conn)
+            finally:
+                self.busy = False
+
+    def load_totals(self, conn):
+        """Longueur totale des notes, pour la normalisation BM25 sans requête AVG par note"""
+        self.total_notes, self.total_length = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM notes"
+        ).fetchone()
+
+    def do_sync(self, conn, mtimes):
+        indexed = dict(conn.execute("SELECT filename, mtime FROM notes"))
+        for filename in indexed.keys() - mtimes.keys():
+            self.remove_note(conn, filename)
+
+        count = 0
+        for filename, mtime in mtimes.items():
+            if indexed.get(filename) == mtime:
+                continue
+            self.index_note(conn, filename, mtime)
+            count += 1
+            if count % COMMIT_EVERY == 0:
+                conn.commit()
+
+    def remove_postings(self, conn, note_id):
+        conn.execute(
+            "UPDATE terms SET df = df - 1 WHERE term IN (SELECT term FROM postings WHERE note_id = ?)",
+            (note_id,)
+        )
+        conn.execute("DELETE FROM postings WHERE note_id = ?", (note_id,))
+
+    def remove_note(self, conn, filename):
+        row = conn.execute("SELECT id, length FROM notes WHERE filename = ?", (filename,)).fetchone()
+        if row:
+            self.remove_postings(conn, row[0])
+            conn.execute("DELETE FROM notes WHERE id = ?", (row[0],))
+            self.total_notes -= 1
+            self.total_length -= row[1]
+
+    def index_note(self, conn, filename, mtime):
+        try:
+            text = self.store.read(filename)
+        except Exception as e:
+            # Note illisible ou disparue entre-temps
+            self.remove_note(conn, filename)
+            return
+
+        postings = {}
+        tokens = tokenize(text)
+        for term, pos in tokens:
+            postings.setdefault(term, array("I")).append(pos)
+
+        row = conn.execute("SELECT id, length FROM notes WHERE filename = ?", (filename,)).fetchone()
+        if row:
+            note_id = row[0]
+            self.remove_postings(conn, note_id)
+            conn.execute(
+                "UPDATE notes SET mtime = ?, length = ? WHERE id = ?",
+                (mtime, len(tokens), note_id)
+            )
+            self.total_length += len(tokens) - row[1]
+        else:
+            note_id = conn.execute(
+                "INSERT INTO notes (filename, mtime, length) VALUES (?, ?, ?)",
+                (filename, mtime, len(tokens))
+            ).lastrowid
+            self.total_notes += 1
+            self.total_length += len(tokens)
+
+        # Impact BM25 (sans l'IDF) figé à l'indexation, avec la longueur moyenne du moment
+        avg_length = self.total_length / self.total_notes or 1
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / avg_length)
+        conn.executemany(
+            "INSERT INTO postings (term, note_id, impact, positions) VALUES (?, ?, ?, ?)",
+            (
+                (term, note_id, len(pos) * (BM25_K1 + 1) / (len(pos) + norm), pos.tobytes())
+                for term, pos in postings.items()
+            )
+        )
+        conn.executemany(
+            "INSERT INTO terms (term, df) VALUES (?, 1) ON CONFLICT (term) DO UPDATE SET df = df + 1",
+            ((term,) for term in postings)
+        )
+
+    # --- Recherche (thread de l'interface) ---
+
+    def search(self, query, limit=50):
+        """Retourne les notes contenant tous les termes, classées par score BM25"""
+        terms = query_terms(query)
+        if not terms:
+            return []
+
+        if self.reader is None:
+            self.reader = self.connect()
+        conn = self.reader
+
+        n_docs = conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+        if not n_docs:
+            return []
+
+        # Poids IDF de chaque terme; un terme absent rend la requête vide
+        placeholders = ", ".join("?" for _ in terms)
+        dfs = dict(conn.execute(f"SELECT term, df FROM terms WHERE term IN ({placeholders})", terms))
+        if len(dfs) < len(terms) or not all(dfs.values()):
+            return []
+        weights = {
+            term: math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for term, df in dfs.items()
+        }
+
+        # Notes candidates: toutes celles du terme le plus rare s'il est assez rare,
+        # sinon les meilleures entrées de chaque terme (parcours de l'index par impact)
+        rarest = min(dfs, key=dfs.get)
+        if dfs[rarest] <= FULL_SCAN_LIMIT:
+            candidates = "SELECT note_id FROM postings WHERE term = ?"
+            candidate_params = [rarest]
+        else:
+            candidates = " UNION ".join(
+                "SELECT * FROM (SELECT note_id FROM postings WHERE term = ? ORDER BY impact DESC LIMIT ?)"
+                for _ in terms
+            )
+            candidate_params = [value for term in terms for value in (term, CANDIDATES_PER_TERM)]
+
+        case = "CASE p.term " + " ".join("WHEN ? THEN ?" for _ in terms) + " END"
+        sql = f"""
+            SELECT n.filename, p.note_id, SUM({case} * p.impact) AS score
+            FROM postings p JOIN notes n ON n.id = p.note_id
+            WHERE p.term IN ({placeholders})
+              AND p.note_id IN ({candidates})
+            GROUP BY p.note_id
+            HAVING COUNT(*) = ?
+            ORDER BY score DESC
+            LIMIT ?
+        """
+        params = [value for term in terms for value in (term, weights[term])]
+        params += terms + candidate_params + [len(terms), limit]
+        rows = conn.execute(sql, params).fetchall()
+
+        results = []
+        for filename, note_id, score in rows:
+            positions = array("I")
+            for (blob,) in conn.execute(
+                f"SELECT positions FROM postings WHERE note_id = ? AND term IN ({placeholders})",
+                [note_id] + terms
+            ):
+                positions.frombytes(blob)
+            results.append(SearchResult(filename, score, sorted(positions)))
+        return results
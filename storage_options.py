@@ -0,0 +1,16 @@
+# Valeurs possibles des réglages de stockage (config.py). Module sans dépendance:
+# config.py et la ligne de commande l'importent sans charger le code de stockage.
+
+# Stockages des notes: un fichier par note (par défaut) ou une seule base SQLite
+STORAGE_DIRECTORY = "directory"
+STORAGE_SQLITE = "sqlite"
+
+# Organisation du dossier des notes: tout à la racine, ou réparti dans des sous-dossiers
+# (préfixe de l'empreinte du nom) pour garder des répertoires de taille raisonnable
+LAYOUT_FLAT = "flat"
+LAYOUT_SHARDED = "sharded"
+
+# Politiques de synchronisation disque
+FSYNC_NEVER = "never"  # Laisser le système vider ses tampons
+FSYNC_FILE = "file"  # fsync du fichier temporaire avant le remplacement
+FSYNC_FULL = "full"  # fsync du fichier puis du dossier après le remplacement
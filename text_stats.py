@@ -0,0 +1,68 @@
+def format_reading_time(word_count):
+    """Formate le temps de lecture estimé (basé sur 200 mots par minute)"""
+    reading_time_minutes = word_count / 200
+
+    if reading_time_minutes < 1:
+        return f"{int(reading_time_minutes * 60)} sec"
+
+    minutes = int(reading_time_minutes)
+    seconds = int((reading_time_minutes - minutes) * 60)
+    if seconds > 0:
+        return f"{minutes} min {seconds} sec"
+    return f"{minutes} min"
+
+
+def word_delta(text, before, after):
+    """Variation du nombre de mots quand `text` est inséré entre les caractères `before` et `after`"""
+    if not text:
+        return 0
+
+    # Un mot n'est coupé ou fusionné qu'aux bords de l'insertion
+    joins_before = bool(before) and not before.isspace()
+    joins_after = bool(after) and not after.isspace()
+
+    delta = len(text.split())
+    if joins_before and not text[0].isspace():
+        delta -= 1
+    if joins_after and not text[-1].isspace():
+        delta -= 1
+    if joins_before and joins_after:
+        delta += 1
+    return delta
+
+
+class TextStatistics:
+    """Compteurs de mots et de caractères mis à jour à partir des modifications du texte"""
+
+    def __init__(self):
+        self.word_count = 0
+        self.length = 0  # Longueur totale du texte, espaces de fin compris
+        self.drifted = True  # Recomptage complet nécessaire avant la prochaine lecture
+
+    def reset(self, content):
+        """Recompte entièrement les statistiques d'un texte"""
+        self.word_count = len(content.split())
+        self.length = len(content)
+        self.drifted = False
+
+    def mark_drifted(self):
+        """Signale une modification non suivie: les compteurs ne sont plus fiables"""
+        self.drifted = True
+
+    def inserted(self, text, before, after):
+        """Prend en compte l'insertion de `text` entre `before` et `after`"""
+        self.word_count += word_delta(text, before, after)
+        self.length += len(text)
+
+    def deleted(self, text, before, after):
+        """Prend en compte la suppression de `text` situé entre `before` et `after`"""
+        self.word_count -= word_delta(text, before, after)
+        self.length -= len(text)
+
+    def summary(self, trailing_whitespace=0):
+        """Retourne les statistiques au format de la barre d'état"""
+        return {
+            "word_count": self.word_count,
+            "char_count": max(0, self.length - trailing_whitespace),
+            "reading_time": format_reading_time(self.word_count)
+        }